@@ -0,0 +1,119 @@
+"""Grids as nested Arrays against ARRAY2D: matrix multiply, flood fill,
+creating and copying, and memory use."""
+import time
+import tracemalloc
+from ecp.topython import ecp
+
+PROGRAM = """
+SUBROUTINE nestedGrid(rows, cols, fill)
+    grid := []
+    FOR i := 1 TO rows
+        row := []
+        FOR j := 1 TO cols
+            row.append(fill)
+        ENDFOR
+        grid.append(row)
+    ENDFOR
+    RETURN grid
+ENDSUBROUTINE
+
+SUBROUTINE multiply(a, b, c)
+    n := LEN(a)
+    m := LEN(b)
+    p := LEN(b[0])
+    FOR i := 0 TO n - 1
+        FOR j := 0 TO p - 1
+            total := 0.0
+            FOR k := 0 TO m - 1
+                total := total + a[i, k] * b[k, j]
+            ENDFOR
+            c[i, j] := total
+        ENDFOR
+    ENDFOR
+    RETURN c
+ENDSUBROUTINE
+
+SUBROUTINE floodFill(grid, row, col, colour)
+    rows := LEN(grid)
+    cols := LEN(grid[0])
+    old := grid[row, col]
+    queue := QUEUE([[row, col]])
+    grid[row, col] := colour
+    filled := 0
+    WHILE LEN(queue) > 0
+        cell := queue.dequeue()
+        r := cell[0]
+        c := cell[1]
+        filled := filled + 1
+        FOR d IN [[0, 1], [1, 0], [0, -1], [-1, 0]]
+            nr := r + d[0]
+            nc := c + d[1]
+            IF nr >= 0 AND nr < rows AND nc >= 0 AND nc < cols THEN
+                IF grid[nr, nc] = old THEN
+                    grid[nr, nc] := colour
+                    queue.enqueue([nr, nc])
+                ENDIF
+            ENDIF
+        ENDFOR
+    ENDWHILE
+    RETURN filled
+ENDSUBROUTINE
+
+SUBROUTINE walls(grid)
+    FOR i := 0 TO LEN(grid) - 1 STEP 4
+        FOR j := 0 TO LEN(grid[0]) - 2
+            grid[i, j] := 1
+        ENDFOR
+    ENDFOR
+    RETURN grid
+ENDSUBROUTINE
+"""
+
+
+def best(f, repeat=5):
+    f() # warm up
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def allocated(f) -> float:
+    tracemalloc.start()
+    result = f()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size / 2 ** 20
+
+
+p = ecp(PROGRAM, optimize=True)
+N = 120
+a_nested = [[(i * N + j) % 7 + 0.5 for j in range(N)] for i in range(N)]
+b_nested = [[(i + 2 * j) % 5 + 0.25 for j in range(N)] for i in range(N)]
+a_array, b_array = p.TO_ARRAY(a_nested), p.TO_ARRAY(b_nested)
+assert p.multiply(a_nested, b_nested, p.nestedGrid(N, N, 0.0)) == p.multiply(a_array, b_array, p.ARRAY2D(N, N, 0.0)) == p.MATRIX_MULTIPLY(a_array, b_array)
+print(f"matrix multiply {N}x{N}")
+print(f"  ECP loops, nested Arrays  {best(lambda: p.multiply(a_nested, b_nested, p.nestedGrid(N, N, 0.0)), 3) * 1000:8.1f}ms")
+print(f"  ECP loops, ARRAY2D        {best(lambda: p.multiply(a_array, b_array, p.ARRAY2D(N, N, 0.0)), 3) * 1000:8.1f}ms")
+print(f"  MATRIX_MULTIPLY, nested   {best(lambda: p.MATRIX_MULTIPLY(a_nested, b_nested)) * 1000:8.1f}ms")
+print(f"  MATRIX_MULTIPLY, ARRAY2D  {best(lambda: p.MATRIX_MULTIPLY(a_array, b_array)) * 1000:8.1f}ms")
+
+S = 400
+nested_walls = p.walls(p.nestedGrid(S, S, 0))
+array_walls = p.walls(p.ARRAY2D(S, S, 0))
+assert p.floodFill(p.COPY(nested_walls), 0, S - 1, 2) == p.floodFill(p.COPY(array_walls), 0, S - 1, 2)
+print(f"flood fill {S}x{S}")
+print(f"  nested Arrays             {best(lambda: p.floodFill(p.COPY(nested_walls), 0, S - 1, 2), 3) * 1000:8.1f}ms")
+print(f"  ARRAY2D                   {best(lambda: p.floodFill(p.COPY(array_walls), 0, S - 1, 2), 3) * 1000:8.1f}ms")
+
+S = 1000
+print(f"{S}x{S} grid of Reals")
+print(f"  create: ECP loops {best(lambda: p.nestedGrid(S, S, 0.5), 3) * 1000:.1f}ms, ARRAY2D {best(lambda: p.ARRAY2D(S, S, 0.5)) * 1000:.1f}ms")
+nested, grid = p.nestedGrid(S, S, 0.5), p.ARRAY2D(S, S, 0.5)
+print(f"  copy: nested {best(lambda: p.COPY(nested)) * 1000:.1f}ms, ARRAY2D {best(lambda: p.COPY(grid)) * 1000:.1f}ms")
+print(f"  fill: nested {best(lambda: p.FILL(nested, 1.5)) * 1000:.1f}ms, ARRAY2D {best(lambda: p.FILL(grid, 1.5)) * 1000:.1f}ms")
+print(f"  memory of distinct values: nested {allocated(lambda: [[i * 0.5 for i in range(S)] for _ in range(S)]):.1f} MiB, "
+      f"ARRAY2D {allocated(lambda: p.TO_ARRAY([[i * 0.5 for i in range(S)] for _ in range(S)])):.1f} MiB")
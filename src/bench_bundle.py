@@ -0,0 +1,52 @@
+"""Cold start of a precompiled bundle compared with `python -m ecp main.ecp`."""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from ecp.bundle import bundle
+
+RUNS = 20
+
+LIBRARY = """
+SUBROUTINE isPrime(n)
+    IF n < 2 THEN
+        RETURN False
+    ENDIF
+    FOR i := 2 TO Int(SQRT(n))
+        IF n MOD i = 0 THEN
+            RETURN False
+        ENDIF
+    ENDFOR
+    RETURN True
+ENDSUBROUTINE
+""" * 20
+
+MAIN = """IMPORT "/primes_lib" AS "lib"
+count := 0
+FOR i := 1 TO 100
+    IF lib.isPrime(i) THEN
+        count := count + 1
+    ENDIF
+ENDFOR
+OUTPUT count
+"""
+
+def cold_start(args, cwd):
+    start = time.perf_counter()
+    subprocess.run([sys.executable] + args, cwd=cwd, stdout=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start
+
+with tempfile.TemporaryDirectory() as d:
+    with open(os.path.join(d, "primes_lib.ecp"), "w") as f:
+        f.write(LIBRARY)
+    main = os.path.join(d, "main.ecp")
+    with open(main, "w") as f:
+        f.write(MAIN)
+    app = os.path.join(d, "app.pyz")
+    bundle(main, app)
+
+    src = os.path.dirname(os.path.abspath(__file__))
+    for label, args, cwd in [("python -m ecp main.ecp", ["-m", "ecp", main], src), ("python app.pyz", [app], d)]:
+        times = sorted(cold_start(args, cwd) for _ in range(RUNS))
+        print(f"{label:<24} min {times[0] * 1000:8.2f}ms  median {times[RUNS // 2] * 1000:8.2f}ms")
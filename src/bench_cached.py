@@ -0,0 +1,45 @@
+"""Naive recursion with CACHED SUBROUTINEs and the memoize pass."""
+import time
+from functools import lru_cache
+from ecp.topython import ecp
+
+PROGRAM = """
+{cached}SUBROUTINE fib(n)
+    IF n < 2 THEN
+        RETURN n
+    ENDIF
+    RETURN fib(n - 1) + fib(n - 2)
+ENDSUBROUTINE
+
+{cached}SUBROUTINE paths(rows, columns)
+    IF rows = 0 OR columns = 0 THEN
+        RETURN 1
+    ENDIF
+    RETURN paths(rows - 1, columns) + paths(rows, columns - 1)
+ENDSUBROUTINE
+"""
+
+
+def measure(label, program):
+    start = time.perf_counter()
+    result = program.fib(27), program.paths(11, 11)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22} {elapsed * 1000:9.2f}ms  {result}")
+
+
+measure("plain", ecp(PROGRAM.format(cached="")))
+measure("CACHED", ecp(PROGRAM.format(cached="CACHED ")))
+measure("CACHED(None)", ecp(PROGRAM.format(cached="CACHED(None) ")))
+measure("--passes memoize", ecp(PROGRAM.format(cached=""), optimize=["memoize"]))
+
+# cost of a cache hit compared to functools.lru_cache
+N = 1_000_000
+program = ecp(PROGRAM.format(cached="CACHED "))
+program.fib(20)
+reference = lru_cache(128)(lambda n: n)
+reference(20)
+for label, function in (("CACHED hit", program.fib), ("functools.lru_cache hit", reference)):
+    start = time.perf_counter()
+    for _ in range(N):
+        function(20)
+    print(f"{label:<24} {(time.perf_counter() - start) * 1e9 / N:6.1f}ns")
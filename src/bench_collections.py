@@ -0,0 +1,93 @@
+"""Breadth first search with Arrays (pop(0) and a search loop for membership)
+against QUEUE, SET and IN."""
+import random
+import time
+from ecp.topython import ecp
+
+PROGRAM = """
+SUBROUTINE contains(array, value)
+    FOR v IN array
+        IF v = value THEN
+            RETURN True
+        ENDIF
+    ENDFOR
+    RETURN False
+ENDSUBROUTINE
+
+SUBROUTINE bfsArrays(graph, start)
+    seen := [start]
+    queue := [start]
+    count := 0
+    WHILE LEN(queue) > 0
+        node := queue.pop(0)
+        count := count + 1
+        FOR neighbour IN graph[node]
+            IF NOT contains(seen, neighbour) THEN
+                seen.append(neighbour)
+                queue.append(neighbour)
+            ENDIF
+        ENDFOR
+    ENDWHILE
+    RETURN count
+ENDSUBROUTINE
+
+SUBROUTINE bfsArraysIn(graph, start)
+    seen := [start]
+    queue := [start]
+    count := 0
+    WHILE LEN(queue) > 0
+        node := queue.pop(0)
+        count := count + 1
+        FOR neighbour IN graph[node]
+            IF NOT neighbour IN seen THEN
+                seen.append(neighbour)
+                queue.append(neighbour)
+            ENDIF
+        ENDFOR
+    ENDWHILE
+    RETURN count
+ENDSUBROUTINE
+
+SUBROUTINE bfs(graph, start)
+    seen := SET([start])
+    queue := QUEUE([start])
+    count := 0
+    WHILE LEN(queue) > 0
+        node := queue.dequeue()
+        count := count + 1
+        FOR neighbour IN graph[node]
+            IF NOT neighbour IN seen THEN
+                seen.add(neighbour)
+                queue.enqueue(neighbour)
+            ENDIF
+        ENDFOR
+    ENDWHILE
+    RETURN count
+ENDSUBROUTINE
+"""
+
+
+def best(f, repeat=5):
+    f() # warm up
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def graph(n: int, degree: int = 3) -> dict:
+    random.seed(n)
+    return {i: [random.randrange(n) for _ in range(degree)] + [(i + 1) % n] for i in range(n)}
+
+
+p = ecp(PROGRAM, optimize=True)
+print(f"{'nodes':>7} {'Arrays':>10} {'Arrays, IN':>11} {'QUEUE, SET':>11}")
+for n in (1_000, 2_000, 4_000, 100_000):
+    g = graph(n)
+    assert p.bfs(g, 0) == n
+    small = n <= 4_000
+    arrays = f"{best(lambda: p.bfsArrays(g, 0), 1) * 1000:8.1f}ms" if small else f"{'':>10}"
+    arrays_in = f"{best(lambda: p.bfsArraysIn(g, 0), 1) * 1000:9.1f}ms" if small else f"{'':>11}"
+    print(f"{n:>7} {arrays} {arrays_in} {best(lambda: p.bfs(g, 0)) * 1000:9.1f}ms")
@@ -0,0 +1,71 @@
+"""File builtins against the PY() idioms they replace, on a 50 MB file."""
+import os
+import tempfile
+import time
+import tracemalloc
+from ecp.topython import ecp
+
+LINES = 1_000_000
+
+PROGRAMS = {
+    "readlines": """
+PY("f = open(path, encoding='utf-8')")
+total := 0
+FOR line IN f.readlines()
+    total := total + LEN(line)
+ENDFOR
+PY("f.close()")
+""",
+    "READ_LINES": """
+total := 0
+FOR line IN READ_LINES(path)
+    total := total + LEN(line)
+ENDFOR
+""",
+    "read()": """
+PY("f = open(path, encoding='utf-8')")
+total := LEN(f.read())
+PY("f.close()")
+""",
+    "READ_ALL": """
+total := LEN(READ_ALL(path))
+""",
+    "write+print": """
+PY("f = open(path2, 'w', encoding='utf-8')")
+FOR i := 1 TO 200000
+    print("row", i, file := f)
+ENDFOR
+PY("f.close()")
+total := 0
+""",
+    "WRITE_LINE": """
+f := OPEN_WRITE(path2)
+FOR i := 1 TO 200000
+    WRITE_LINE(f, "row", i)
+ENDFOR
+CLOSE(f)
+total := 0
+""",
+}
+
+directory = tempfile.mkdtemp()
+path = os.path.join(directory, "data.txt")
+path2 = os.path.join(directory, "out.txt")
+with open(path, "w", encoding="utf-8") as f:
+    f.write("".join(f"{i:>10} some text of the line number {i}\n" for i in range(LINES)))
+
+for label, program in PROGRAMS.items():
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        ecp(program, scope={"path": path, "path2": path2})
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    ecp(program, scope={"path": path, "path2": path2})
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{label:<12} {best * 1000:8.1f}ms  peak {peak / 2 ** 20:7.1f} MiB")
+
+os.remove(path)
+os.remove(path2)
+os.rmdir(directory)
@@ -0,0 +1,99 @@
+"""Loop idioms compiled as loops and as builtin calls (the idioms pass)."""
+import time
+from ecp.topython import ecp
+
+PROGRAM = """
+SUBROUTINE squares(n)
+    result := []
+    FOR i := 1 TO n
+        result.append(i * i)
+    ENDFOR
+    RETURN result
+ENDSUBROUTINE
+
+SUBROUTINE numbers(n)
+    result := []
+    FOR i := 1 TO n
+        result.append(i)
+    ENDFOR
+    RETURN result
+ENDSUBROUTINE
+
+SUBROUTINE flags(n)
+    bits := []
+    FOR i := 1 TO n
+        bits.append(True)
+    ENDFOR
+    RETURN bits
+ENDSUBROUTINE
+
+SUBROUTINE triangle(n)
+    total := 0
+    FOR i := 1 TO n
+        total := total + i
+    ENDFOR
+    RETURN total
+ENDSUBROUTINE
+
+SUBROUTINE countMultiples(n, k)
+    count := 0
+    FOR i := 1 TO n
+        IF i MOD k = 0 THEN
+            count := count + 1
+        ENDIF
+    ENDFOR
+    RETURN count
+ENDSUBROUTINE
+
+SUBROUTINE indexOf(items, target)
+    index := -1
+    FOR i := 0 TO LEN(items) - 1
+        IF items[i] = target THEN
+            index := i
+            BREAK
+        ENDIF
+    ENDFOR
+    RETURN index
+ENDSUBROUTINE
+"""
+
+N = 200_000
+items = list(range(N))
+
+
+SEARCH = """
+SUBROUTINE isPrime(n)
+    found := False
+    FOR i := 2 TO Int(SQRT(n))
+        IF n MOD i = 0 THEN
+            found := True
+            BREAK
+        ENDIF
+    ENDFOR
+    RETURN NOT found
+ENDSUBROUTINE
+"""
+
+CASES = [
+    ("squares", lambda p: p.squares(N)),
+    ("numbers", lambda p: p.numbers(N)),
+    ("flags", lambda p: p.flags(N)),
+    ("triangle", lambda p: p.triangle(N)),
+    ("countMultiples", lambda p: p.countMultiples(N, 3)),
+    ("indexOf", lambda p: p.indexOf(items, N - 1)),
+    ("isPrime", lambda p: p.isPrime(1_000_000_007)),
+]
+
+programs = {label: ecp(PROGRAM + SEARCH, optimize=optimize) for label, optimize in (("loop", []), ("idioms", ["idioms"]))}
+print(f"{'':<16} {'loop':>9} {'idioms':>9}")
+for name, call in CASES:
+    times = []
+    for program in programs.values():
+        call(program) # warm up
+        best = float("inf")
+        for _ in range(10):
+            start = time.perf_counter()
+            call(program)
+            best = min(best, time.perf_counter() - start)
+        times.append(best)
+    print(f"{name:<16} {times[0] * 1000:7.2f}ms {times[1] * 1000:7.2f}ms {times[0] / times[1]:6.2f}x")
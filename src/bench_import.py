@@ -0,0 +1,54 @@
+"""Start-up budget check based on `python -X importtime`.
+
+Fails if importing the package or running a trivial program takes longer than
+the budget, or if an optional component is imported when it is not needed.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+RUNS = 5
+# (command, module, budget in ms for all imports below the module or for every import if None)
+BUDGETS = [
+    (["-c", "import ecp"], "ecp", 5),
+    (["-m", "ecp", "--version"], None, 30),
+    (["-m", "ecp", "{program}"], "ecp.topython", 80),
+]
+# modules which only some command line options need
+OPTIONAL = ["tabulate", "astor", "traceback", "ecp.tracker"]
+
+def import_times(args):
+    """Return {module: cumulative microseconds} for one interpreter run, with the total under None"""
+    p = subprocess.run([sys.executable, "-X", "importtime"] + args, capture_output=True, text=True)
+    times = {None: 0}
+    for line in p.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+        if not name.startswith("  ") and name.strip() not in ("site", "encodings"):
+            times[None] += int(cumulative) # top level import
+    return times
+
+with tempfile.TemporaryDirectory() as d:
+    program = os.path.join(d, "hello.ecp")
+    with open(program, "w") as f:
+        f.write('OUTPUT "hello"\n')
+
+    failed = False
+    for args, module, budget in BUDGETS:
+        args = [a.format(program=program) for a in args]
+        runs = [import_times(args) for _ in range(RUNS)]
+        best = min(r.get(module, 0) for r in runs) / 1000
+        status = "ok" if best <= budget else "OVER BUDGET"
+        print(f"{' '.join(args[:2]):<16} {module or '(all)':<14} {best:8.2f}ms (budget {budget}ms) {status}")
+        failed |= best > budget
+
+        loaded = [m for m in OPTIONAL if m in runs[0]]
+        if loaded:
+            print(f"  optional modules imported: {', '.join(loaded)}")
+            failed = True
+
+if failed:
+    raise Exception("Start-up budget exceeded.")
@@ -0,0 +1,47 @@
+"""primes.ecp style code with small helper SUBROUTINEs, with and without the inline pass."""
+import time
+from ecp.topython import ecp
+
+PROGRAM = """
+SUBROUTINE divides(d, n)
+    RETURN n MOD d = 0
+ENDSUBROUTINE
+
+SUBROUTINE square(x)
+    RETURN x * x
+ENDSUBROUTINE
+
+SUBROUTINE isPrime(n)
+    IF n < 2 THEN
+        RETURN False
+    ENDIF
+    i := 2
+    WHILE square(i) <= n
+        IF divides(i, n) THEN
+            RETURN False
+        ENDIF
+        i := i + 1
+    ENDWHILE
+    RETURN True
+ENDSUBROUTINE
+
+SUBROUTINE countPrimes(limit)
+    count := 0
+    FOR k := 1 TO limit
+        IF isPrime(k) THEN
+            count := count + 1
+        ENDIF
+    ENDFOR
+    RETURN count
+ENDSUBROUTINE
+"""
+
+for passes in ([], ["inline"]):
+    program = ecp(PROGRAM, optimize=passes)
+    program.countPrimes(1000) # warm up
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        result = program.countPrimes(100_000)
+        best = min(best, time.perf_counter() - start)
+    print(f"{'+'.join(passes) or 'none':<8} {best * 1000:8.1f}ms (result {result})")
@@ -0,0 +1,50 @@
+"""Reading 200k Integers, one per line: input(), USERINPUT, USERINPUT_INT and READ_INTS."""
+import os
+import sys
+import tempfile
+import time
+from ecp.topython import ecp
+
+N = 200_000
+
+PROGRAMS = {
+    "input()": """
+total := 0
+FOR i := 1 TO n
+    total := total + Int(input())
+ENDFOR
+""",
+    "USERINPUT": """
+total := 0
+FOR i := 1 TO n
+    total := total + Int(USERINPUT)
+ENDFOR
+""",
+    "USERINPUT_INT": """
+total := 0
+FOR i := 1 TO n
+    total := total + USERINPUT_INT
+ENDFOR
+""",
+    "READ_INTS": """
+total := sum(READ_INTS(n))
+""",
+}
+
+with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+    f.write("".join(f"{i}\n" for i in range(N)))
+stdin = sys.stdin
+results = dict.fromkeys(PROGRAMS, float("inf"))
+try:
+    for _ in range(5):
+        for label, program in PROGRAMS.items():
+            with open(f.name, encoding="utf-8") as sys.stdin:
+                start = time.perf_counter()
+                total = ecp(program, scope={"n": N}).total
+                results[label] = min(results[label], time.perf_counter() - start)
+            assert total == N * (N - 1) // 2
+finally:
+    sys.stdin = stdin
+    os.unlink(f.name)
+for label, best in results.items():
+    print(f"{label:<14} {best * 1000:8.1f}ms")
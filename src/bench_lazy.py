@@ -0,0 +1,43 @@
+"""Time to first call of a SUBROUTINE in a large library, with eager and lazy compilation.
+
+Parsing is eager in both modes, so it is timed separately from compiling and running.
+"""
+import time
+from ecp import topython
+from ecp.topython import parse_ecp, make_lazy
+
+SUBROUTINES = 500
+RUNS = 5
+
+library = "".join(f"""
+SUBROUTINE f{i}(a, b)
+    total := 0
+    FOR j := a TO b
+        IF j MOD 3 = 0 THEN
+            total := total + j * {i}
+        ELSE
+            total := total - j
+        ENDIF
+    ENDFOR
+    WHILE total > 100
+        total := total DIV 2
+    ENDWHILE
+    RETURN total
+ENDSUBROUTINE
+""" for i in range(SUBROUTINES))
+program = library + "\nresult := f7(1, 10) + f300(1, 10)\n"
+
+def first_call(lazy):
+    """Return (parse time, time from the end of parsing to the first call returning)"""
+    start = time.perf_counter()
+    tree = parse_ecp(program)
+    parsed = time.perf_counter()
+    scope = dict(vars(topython))
+    if lazy:
+        tree = make_lazy(tree, scope, "<bench>")
+    exec(compile(tree, "<bench>", "exec"), scope)
+    return parsed - start, time.perf_counter() - parsed
+
+for lazy in (False, True):
+    parsing, after = map(min, zip(*[first_call(lazy) for _ in range(RUNS)]))
+    print(f"{'lazy' if lazy else 'eager'}: parse {parsing * 1000:8.2f}ms, compile and first call {after * 1000:6.2f}ms ({SUBROUTINES} SUBROUTINEs, 2 used)")
@@ -0,0 +1,95 @@
+"""Run time of the example programs and of loop heavy SUBROUTINEs with and without the licm pass."""
+import os
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from ecp.topython import parse_ecp, run_optimizer
+from ecp import runtime
+
+EXAMPLES = "../examples"
+REPEAT = 50
+
+KERNELS = """
+SUBROUTINE eratosthenes(n)
+    bits := []
+    FOR i := 1 TO n
+        bits.append(True)
+    ENDFOR
+    lim := Int(SQRT(n))
+    FOR index := 1 TO lim
+        IF bits[index-1] THEN
+            FOR i := 2 * (index+1) TO n STEP index+1
+                bits[i-1] := False
+            ENDFOR
+        ENDIF
+    ENDFOR
+    primes := []
+    FOR i := 1 TO n-1
+        IF bits[i] THEN
+            primes.append(i+1)
+        ENDIF
+    ENDFOR
+    RETURN LEN(primes)
+ENDSUBROUTINE
+
+SUBROUTINE countPrimes(n)
+    count := 0
+    FOR i := 2 TO n
+        found := False
+        j := 2
+        WHILE j <= Int(SQRT(i)) AND NOT found
+            IF i MOD j = 0 THEN
+                found := True
+            ENDIF
+            j := j + 1
+        ENDWHILE
+        IF NOT found THEN
+            count := count + 1
+        ENDIF
+    ENDFOR
+    RETURN count
+ENDSUBROUTINE
+
+SUBROUTINE run()
+    RETURN [eratosthenes(300000), countPrimes(30000)]
+ENDSUBROUTINE
+
+OUTPUT run()
+"""
+
+
+def timed(code, repeat):
+    start = time.perf_counter()
+    with redirect_stdout(StringIO()):
+        for _ in range(repeat):
+            exec(code, dict(vars(runtime)))
+    return (time.perf_counter() - start) / repeat
+
+
+def compare(name, source, repeat):
+    times = []
+    for optimize in (None, ["licm"]):
+        tree = parse_ecp(source)
+        if optimize:
+            tree = run_optimizer(tree, optimize)
+        code = compile(tree, name, "exec")
+        try:
+            times.append(timed(code, repeat))
+        except Exception as e:
+            print(f"{name:<24} skipped: {type(e).__name__}")
+            return
+    print(f"{name:<24} {times[0] * 1000:9.3f}ms {times[1] * 1000:9.3f}ms {times[0] / times[1]:6.2f}x")
+
+
+print(f"{'program':<24} {'plain':>11} {'licm':>11}")
+for f in sorted(os.listdir(EXAMPLES)):
+    if f.endswith(".ecp"):
+        with open(os.path.join(EXAMPLES, f), encoding="utf-8") as file:
+            source = file.read()
+        if "USERINPUT" in source or "IMPORT" in source:
+            continue
+        try:
+            compare(f, source, REPEAT)
+        except Exception as e:
+            print(f"{f:<24} skipped: {type(e).__name__}")
+compare("kernels", KERNELS, 3)
@@ -0,0 +1,44 @@
+"""Printing many lines: print, unbuffered OUTPUT and buffered OUTPUT to text and binary streams."""
+import os
+import sys
+import time
+from ecp.runtime import EcpOutput
+from ecp.topython import ecp
+
+PROGRAM = """
+SUBROUTINE run(n)
+    FOR i := 1 TO n
+        OUTPUT i
+        OUTPUT "line", i
+    ENDFOR
+ENDSUBROUTINE
+"""
+
+
+class PrintOutput(EcpOutput):
+    """OUTPUT as it was: print every line"""
+    def __init__(self):
+        super().__init__()
+        self.write = print
+
+
+text = open(os.devnull, "w")
+binary = open(os.devnull, "wb")
+sys.stdout, stdout = text, sys.stdout
+outputs = {
+    "print": PrintOutput(),
+    "unbuffered": EcpOutput(buffer_size=0),
+    "buffered": EcpOutput(),
+    "binary": EcpOutput(binary),
+}
+programs = {label: ecp(PROGRAM, output=output) for label, output in outputs.items()}
+results = dict.fromkeys(outputs, float("inf"))
+for _ in range(7): # interleaved, so that all of them see the same noise
+    for label, program in programs.items():
+        start = time.perf_counter()
+        program.run(100_000)
+        outputs[label].flush()
+        results[label] = min(results[label], time.perf_counter() - start)
+sys.stdout = stdout
+for label, best in results.items():
+    print(f"{label:<12} {best * 1000:8.1f}ms")
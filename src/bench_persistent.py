@@ -0,0 +1,84 @@
+"""Dictionary against PersistentDictionary: building a lookup table, reading
+it back with and without the cache, iterating, and the memory kept."""
+import os
+import tempfile
+import time
+import tracemalloc
+from ecp.topython import ecp
+
+PROGRAM = """
+SUBROUTINE build(table, n)
+    FOR i := 0 TO n - 1
+        table["key" + String(i)] := i * 3
+    ENDFOR
+    RETURN table
+ENDSUBROUTINE
+
+SUBROUTINE lookups(table, keys)
+    total := 0
+    FOR key IN keys
+        total := total + table[key]
+    ENDFOR
+    RETURN total
+ENDSUBROUTINE
+
+SUBROUTINE count(table)
+    n := 0
+    FOR key IN table
+        n := n + 1
+    ENDFOR
+    RETURN n
+ENDSUBROUTINE
+"""
+
+
+def timed(f):
+    start = time.perf_counter()
+    result = f()
+    return result, time.perf_counter() - start
+
+
+def allocated(f) -> float:
+    tracemalloc.start()
+    result = f()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size / 2 ** 20
+
+
+p = ecp(PROGRAM, optimize=True)
+N = 200_000
+path = os.path.join(tempfile.gettempdir(), "ecp_bench_persistent.db")
+
+
+def fresh(**options):
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    return p.PersistentDictionary(path, **options)
+
+
+plain, t_dict = timed(lambda: p.build({}, N))
+table, t_table = timed(lambda: (lambda t: (p.build(t, N), t.flush()))(fresh())[0])
+table.close()
+loaded, t_bulk = timed(lambda: fresh(items=plain.items()))
+print(f"build {N} entries: Dictionary {t_dict * 1000:.0f}ms, PersistentDictionary {t_table * 1000:.0f}ms, "
+      f"bulk update {t_bulk * 1000:.0f}ms")
+
+hot = [f"key{i}" for i in range(1000)] * 100
+cold = [f"key{i * 7919 % N}" for i in range(100_000)]
+expected = p.lookups(plain, cold)
+assert p.lookups(loaded, cold) == expected and p.count(loaded) == N
+print(f"100k lookups of 1000 keys (cached): Dictionary {timed(lambda: p.lookups(plain, hot))[1] * 1000:.0f}ms, "
+      f"PersistentDictionary {timed(lambda: p.lookups(loaded, hot))[1] * 1000:.0f}ms")
+small = p.PersistentDictionary(path, cache_size=1000)
+print(f"100k lookups of spread keys (cache of 1000): Dictionary {timed(lambda: p.lookups(plain, cold))[1] * 1000:.0f}ms, "
+      f"PersistentDictionary {timed(lambda: p.lookups(small, cold))[1] * 1000:.0f}ms")
+print(f"FOR key IN: Dictionary {timed(lambda: p.count(plain))[1] * 1000:.0f}ms, "
+      f"PersistentDictionary {timed(lambda: p.count(loaded))[1] * 1000:.0f}ms")
+loaded.close()
+small.close()
+print(f"memory while building: Dictionary {allocated(lambda: p.build({}, N)):.1f} MiB, "
+      f"PersistentDictionary with a cache of 1000 {allocated(lambda: p.build(fresh(cache_size=1000), N)):.1f} MiB, "
+      f"file {os.path.getsize(path) / 2 ** 20:.1f} MiB")
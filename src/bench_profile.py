@@ -0,0 +1,41 @@
+"""Optimizing with and without a recorded profile of the program."""
+import time
+from ecp.topython import ecp
+from ecp.passes import Optimizer
+from ecp.profiler import Profile
+
+PROGRAM = """
+SUBROUTINE mix(a, b)
+    RETURN (a * 31 + b * 17 + (a MOD 7) * (b MOD 5) + (a + b) MOD 11 + (a * b) MOD 13 + (a - b) * (a - b) MOD 19) MOD 1000003
+ENDSUBROUTINE
+
+SUBROUTINE weigh(values, factor, offset)
+    total := 0
+    FOR i := 0 TO LEN(values) - 1
+        total := total + Int(factor) * values[i] + Int(offset)
+    ENDFOR
+    RETURN total
+ENDSUBROUTINE
+
+SUBROUTINE run(limit)
+    h := 0
+    values := [1, 2, 3, 4, 5, 6, 7, 8]
+    FOR k := 1 TO limit
+        h := mix(h, weigh(values, k MOD 10, k))
+    ENDFOR
+    RETURN h
+ENDSUBROUTINE
+"""
+
+profile = Profile()
+ecp(PROGRAM, profile=profile).run(200)
+
+for label, optimize in (("-O", True), ("-O profile", Optimizer(profile=profile))):
+    program = ecp(PROGRAM, optimize=optimize)
+    program.run(1000) # warm up
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        result = program.run(30_000)
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<12} {best * 1000:8.1f}ms (result {result})")
@@ -0,0 +1,39 @@
+"""PY() in a loop: inlined literal, cached compile of a run time string, and plain exec."""
+import time
+from ecp.topython import ecp
+
+PROGRAMS = {
+    "literal": """
+SUBROUTINE run(n)
+    FOR i := 1 TO n
+        PY("assert i > 0")
+    ENDFOR
+ENDSUBROUTINE
+""",
+    "cached": """
+SUBROUTINE run(n)
+    code := "assert i > 0"
+    FOR i := 1 TO n
+        PY(code)
+    ENDFOR
+ENDSUBROUTINE
+""",
+    "exec": """
+SUBROUTINE run(n)
+    code := "assert i > 0"
+    FOR i := 1 TO n
+        exec(code)
+    ENDFOR
+ENDSUBROUTINE
+""",
+}
+
+for label, text in PROGRAMS.items():
+    program = ecp(text)
+    program.run(100) # warm up
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        program.run(20_000)
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<8} {best * 1000:8.1f}ms")
@@ -0,0 +1,93 @@
+"""Repeated lookups in an Array of RECORDs: FOR loops against FIND_BY, WHERE
+and ORDER_BY, on an Array and on a RecordArray."""
+import time
+from ecp.topython import ecp
+
+PROGRAM = """
+RECORD Student
+    id : Integer
+    form : String
+    points : Integer
+ENDRECORD
+
+SUBROUTINE makeStudents(n)
+    students := []
+    FOR i := 0 TO n - 1
+        students.append(Student(i, "form" + String(i MOD 40), i * 7919 MOD 1000))
+    ENDFOR
+    RETURN students
+ENDSUBROUTINE
+
+SUBROUTINE findLoop(students, id)
+    FOR student IN students
+        IF student.id = id THEN
+            RETURN student
+        ENDIF
+    ENDFOR
+    RETURN None
+ENDSUBROUTINE
+
+SUBROUTINE lookupsLoop(students, ids)
+    total := 0
+    FOR id IN ids
+        total := total + findLoop(students, id).points
+    ENDFOR
+    RETURN total
+ENDSUBROUTINE
+
+SUBROUTINE lookups(students, ids)
+    total := 0
+    FOR id IN ids
+        total := total + FIND_BY(students, "id", id).points
+    ENDFOR
+    RETURN total
+ENDSUBROUTINE
+
+SUBROUTINE topLoop(students, minimum)
+    top := []
+    FOR student IN students
+        IF student.points >= minimum THEN
+            top.append(student)
+        ENDIF
+    ENDFOR
+    RETURN top
+ENDSUBROUTINE
+"""
+
+
+def best(f, repeat=5):
+    f() # warm up
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+p = ecp(PROGRAM, optimize=True)
+N = 100_000
+students = p.makeStudents(N)
+columns = p.RecordArray(p.Student, students)
+ids = [i * 7919 % N for i in range(100)]
+assert p.lookupsLoop(students, ids) == p.lookups(students, ids) == p.lookups(columns, ids)
+assert p.topLoop(students, 990) == p.WHERE(students, "points", ">=", 990) == p.WHERE(columns, "points", ">=", 990).records()
+
+print(f"{N} records")
+print(f"  100 lookups by id: FOR loops {best(lambda: p.lookupsLoop(students, ids), 3) * 1000:.1f}ms, "
+      f"FIND_BY on the Array {best(lambda: p.lookups(students, ids)) * 1000:.2f}ms, "
+      f"on a RecordArray {best(lambda: p.lookups(columns, ids)) * 1000:.3f}ms")
+print(f"  records with points >= 990: FOR loop {best(lambda: p.topLoop(students, 990)) * 1000:.2f}ms, "
+      f"WHERE on the Array {best(lambda: p.WHERE(students, 'points', '>=', 990)) * 1000:.2f}ms, "
+      f"on a RecordArray {best(lambda: p.WHERE(columns, 'points', '>=', 990)) * 1000:.3f}ms")
+print(f"  sorted copy: SORT_BY {best(lambda: p.SORT_BY(list(students), 'points')) * 1000:.1f}ms, "
+      f"ORDER_BY {best(lambda: p.ORDER_BY(students, 'points')) * 1000:.1f}ms")
+print(f"  GROUP_BY form {best(lambda: p.GROUP_BY(students, 'form')) * 1000:.1f}ms")
+
+
+def changed():
+    students[0].points = students[0].points # invalidates the indexes over points
+    return p.WHERE(students, "points", ">=", 990)
+
+
+print(f"  WHERE after every change of a field (index rebuilt) {best(changed) * 1000:.1f}ms")
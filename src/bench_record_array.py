@@ -0,0 +1,98 @@
+"""Arrays of RECORDs against RecordArray: memory use, scanning a field,
+summing, filtering and sorting."""
+import time
+import tracemalloc
+from ecp.topython import ecp
+
+PROGRAM = """
+RECORD Car
+    make : String
+    year : Integer
+    price : Real
+ENDRECORD
+
+SUBROUTINE makeCars(n)
+    cars := []
+    FOR i := 0 TO n - 1
+        cars.append(Car("make" + String(i MOD 50), 1990 + i MOD 30, (i * 7919 MOD 10007) + 0.5))
+    ENDFOR
+    RETURN cars
+ENDSUBROUTINE
+
+SUBROUTINE totalPrice(cars)
+    total := 0.0
+    FOR car IN cars
+        total := total + car.price
+    ENDFOR
+    RETURN total
+ENDSUBROUTINE
+
+SUBROUTINE isCheap(price)
+    RETURN price < 2000
+ENDSUBROUTINE
+
+SUBROUTINE cheapCars(cars)
+    cheap := []
+    FOR car IN cars
+        IF car.price < 2000 THEN
+            cheap.append(car)
+        ENDIF
+    ENDFOR
+    RETURN cheap
+ENDSUBROUTINE
+"""
+
+
+def best(f, repeat=5):
+    f() # warm up
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def allocated(f) -> float:
+    tracemalloc.start()
+    result = f()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size / 2 ** 20
+
+
+p = ecp(PROGRAM, optimize=True)
+N = 200_000
+records = p.makeCars(N)
+columns = p.RecordArray(p.Car, records)
+assert columns.records() == records
+assert p.totalPrice(records) == p.totalPrice(columns) == columns.sum("price")
+assert p.cheapCars(records) == columns.filter("price", p.isCheap).records()
+assert p.SORT_BY(list(records), "price") == p.RecordArray(p.Car, records).sort("price").records()
+
+print(f"{N} records of 3 fields")
+print(f"  memory: Array {allocated(lambda: p.makeCars(N)):.1f} MiB, "
+      f"RecordArray {allocated(lambda: p.RecordArray(p.Car, p.makeCars(N))):.1f} MiB (records freed after loading)")
+print(f"  ECP loop summing a field (the idioms pass makes it a sum()): Array {best(lambda: p.totalPrice(records)) * 1000:.1f}ms, "
+      f"RecordArray rows {best(lambda: p.totalPrice(columns)) * 1000:.1f}ms")
+print(f"  python sum over the Array {best(lambda: sum(car.price for car in records)) * 1000:.1f}ms, "
+      f"RecordArray.sum {best(lambda: columns.sum('price')) * 1000:.1f}ms")
+print(f"  filter: ECP loop {best(lambda: p.cheapCars(records)) * 1000:.1f}ms, "
+      f"RecordArray.filter with a SUBROUTINE {best(lambda: columns.filter('price', p.isCheap)) * 1000:.1f}ms, "
+      f"with a value {best(lambda: columns.filter('make', 'make7')) * 1000:.1f}ms")
+
+
+def sorting(make, repeat=3):
+    """Best time of sorting an unsorted copy by price, without the time of copying"""
+    times = []
+    for _ in range(repeat):
+        values = make()
+        start = time.perf_counter()
+        p.SORT_BY(values, "price") if isinstance(values, list) else values.sort("price")
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+print(f"  sort: SORT_BY {sorting(lambda: list(records)) * 1000:.1f}ms, "
+      f"RecordArray.sort {sorting(lambda: p.RecordArray(p.Car, records)) * 1000:.1f}ms")
@@ -0,0 +1,40 @@
+"""Memory use and field access speed of large arrays of RECORDs."""
+import time
+import tracemalloc
+from ecp.topython import ecp
+
+N = 200_000
+
+records = ecp("""
+RECORD Car
+    make : String
+    price : Real
+    doors : Integer
+ENDRECORD
+
+CONSTANT RECORD FixedCar
+    make : String
+    price : Real
+    doors : Integer
+ENDRECORD
+""")
+
+class DictCar:
+    """What RECORD used to compile to: a plain class with an instance __dict__"""
+    def __init__(self, make, price, doors):
+        self.make = make
+        self.price = price
+        self.doors = doors
+
+for label, record in [("dict", DictCar), ("RECORD", records.Car), ("CONSTANT RECORD", records.FixedCar)]:
+    tracemalloc.start()
+    cars = [record("Ford", float(i), 5) for i in range(N)]
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    total = 0
+    for car in cars:
+        total += car.price
+    access = time.perf_counter() - start
+    print(f"{label:<16} {memory / N:6.1f} bytes/record  {access * 1e9 / N:6.1f}ns per field read  ({N} records)")
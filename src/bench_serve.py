@@ -0,0 +1,56 @@
+"""Request-to-first-output latency of `ecp serve` compared with a cold `python -m ecp` run."""
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from ecp.server import request
+
+RUNS = 200
+PROGRAM = 'OUTPUT "hello"\n'
+
+def percentiles(samples):
+    samples = sorted(samples)
+    p50 = samples[len(samples) // 2]
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return p50 * 1000, p99 * 1000
+
+def time_to_first_output(path):
+    start = time.perf_counter()
+    for event in request(PROGRAM, path=path):
+        if event["event"] == "output":
+            return time.perf_counter() - start
+    raise Exception("no output received")
+
+def cold_time_to_first_output(file):
+    start = time.perf_counter()
+    p = subprocess.Popen([sys.executable, "-m", "ecp", file], stdout=subprocess.PIPE)
+    p.stdout.readline()
+    elapsed = time.perf_counter() - start
+    p.wait()
+    return elapsed
+
+with tempfile.TemporaryDirectory() as d:
+    sock = os.path.join(d, "ecp.sock")
+    server = subprocess.Popen([sys.executable, "-m", "ecp", "serve", "--socket", sock], stderr=subprocess.DEVNULL)
+    try:
+        while True: # the socket file exists before the server listens on it
+            try:
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                    probe.connect(sock)
+                break
+            except (FileNotFoundError, ConnectionRefusedError):
+                time.sleep(0.01)
+        warm = [time_to_first_output(sock) for _ in range(RUNS)]
+    finally:
+        server.terminate()
+        server.wait()
+
+    file = os.path.join(d, "main.ecp")
+    with open(file, "w") as f:
+        f.write(PROGRAM)
+    cold = [cold_time_to_first_output(file) for _ in range(RUNS // 10)]
+
+print(f"ecp serve:     p50 {percentiles(warm)[0]:8.2f}ms  p99 {percentiles(warm)[1]:8.2f}ms  ({RUNS} requests)")
+print(f"python -m ecp: p50 {percentiles(cold)[0]:8.2f}ms  p99 {percentiles(cold)[1]:8.2f}ms  ({RUNS // 10} runs)")
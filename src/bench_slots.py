@@ -0,0 +1,48 @@
+"""Memory use and attribute access of ECP objects with and without inferred __slots__."""
+import time
+import tracemalloc
+from ecp.topython import ecp
+
+N = 200_000
+
+PROGRAM = """
+CLASS Particle
+    SUBROUTINE __init__(self, x, y)
+        self.x := x
+        self.y := y
+        self.speed := 0
+    ENDSUBROUTINE
+
+    SUBROUTINE move(self)
+        self.x := self.x + self.speed
+        self.y := self.y + self.speed
+    ENDSUBROUTINE
+ENDCLASS
+
+SUBROUTINE make(n)
+    particles := []
+    FOR i := 1 TO n
+        particles.append(Particle(i, -i))
+    ENDFOR
+    RETURN particles
+ENDSUBROUTINE
+
+SUBROUTINE step(particles)
+    FOR p IN particles
+        p.move()
+    ENDFOR
+ENDSUBROUTINE
+"""
+
+for optimize in (None, ["slots"]):
+    program = ecp(PROGRAM, optimize=optimize)
+    tracemalloc.start()
+    particles = program.make(N)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    program.step(particles)
+    elapsed = time.perf_counter() - start
+    label = "__slots__" if hasattr(program.Particle, "__slots__") else "__dict__"
+    print(f"{label:<10} {memory / N:6.1f} bytes/object  {elapsed * 1e9 / N:6.1f}ns per move()  ({N} objects)")
@@ -0,0 +1,187 @@
+"""Algorithms written as ECP loops against the ecp.stdlib builtins."""
+import random
+import time
+from ecp.topython import ecp
+
+PROGRAM = """
+RECORD Person
+    name: String
+    age: Integer
+ENDRECORD
+
+SUBROUTINE bubbleSort(a)
+    n := LEN(a)
+    FOR i := 0 TO n - 2
+        swapped := False
+        FOR j := 0 TO n - i - 2
+            IF a[j] > a[j + 1] THEN
+                temp := a[j]
+                a[j] := a[j + 1]
+                a[j + 1] := temp
+                swapped := True
+            ENDIF
+        ENDFOR
+        IF NOT swapped THEN
+            BREAK
+        ENDIF
+    ENDFOR
+    RETURN a
+ENDSUBROUTINE
+
+SUBROUTINE insertionSortByAge(people)
+    FOR i := 1 TO LEN(people) - 1
+        p := people[i]
+        j := i - 1
+        WHILE j >= 0 AND people[j].age > p.age
+            people[j + 1] := people[j]
+            j := j - 1
+        ENDWHILE
+        people[j + 1] := p
+    ENDFOR
+    RETURN people
+ENDSUBROUTINE
+
+SUBROUTINE linearSearches(a, targets)
+    found := 0
+    FOR t IN targets
+        FOR i := 0 TO LEN(a) - 1
+            IF a[i] = t THEN
+                found := found + 1
+                BREAK
+            ENDIF
+        ENDFOR
+    ENDFOR
+    RETURN found
+ENDSUBROUTINE
+
+SUBROUTINE binarySearches(a, targets)
+    found := 0
+    FOR t IN targets
+        IF BINARY_SEARCH(a, t) != -1 THEN
+            found := found + 1
+        ENDIF
+    ENDFOR
+    RETURN found
+ENDSUBROUTINE
+
+SUBROUTINE euclid(a, b)
+    WHILE b != 0
+        temp := b
+        b := a MOD b
+        a := temp
+    ENDWHILE
+    RETURN a
+ENDSUBROUTINE
+
+SUBROUTINE gcds(n, gcd)
+    total := 0
+    FOR i := 1 TO n
+        total := total + gcd(i * 7919, i * 104729 + 12)
+    ENDFOR
+    RETURN total
+ENDSUBROUTINE
+
+SUBROUTINE squareAndMultiply(base, exponent, modulus)
+    result := 1
+    base := base MOD modulus
+    WHILE exponent > 0
+        IF exponent MOD 2 = 1 THEN
+            result := result * base MOD modulus
+        ENDIF
+        base := base * base MOD modulus
+        exponent := exponent DIV 2
+    ENDWHILE
+    RETURN result
+ENDSUBROUTINE
+
+SUBROUTINE modpows(n, modpow)
+    total := 0
+    FOR i := 1 TO n
+        total := total + modpow(i, 1000003, 1000000007)
+    ENDFOR
+    RETURN total
+ENDSUBROUTINE
+
+SUBROUTINE smallestFirst(values)
+    queue := []
+    FOR v IN values
+        queue.append(v)
+    ENDFOR
+    result := []
+    WHILE LEN(queue) > 0
+        smallest := 0
+        FOR i := 1 TO LEN(queue) - 1
+            IF queue[i] < queue[smallest] THEN
+                smallest := i
+            ENDIF
+        ENDFOR
+        result.append(queue.pop(smallest))
+    ENDWHILE
+    RETURN result
+ENDSUBROUTINE
+
+SUBROUTINE heapOrder(values)
+    heap := []
+    FOR v IN values
+        HEAP_PUSH(heap, v)
+    ENDFOR
+    result := []
+    WHILE LEN(heap) > 0
+        result.append(HEAP_POP(heap))
+    ENDWHILE
+    RETURN result
+ENDSUBROUTINE
+
+SUBROUTINE loopStatistics(a)
+    smallest := a[0]
+    largest := a[0]
+    total := 0
+    FOR v IN a
+        IF v < smallest THEN
+            smallest := v
+        ENDIF
+        IF v > largest THEN
+            largest := v
+        ENDIF
+        total := total + v
+    ENDFOR
+    RETURN [smallest, largest, total]
+ENDSUBROUTINE
+
+SUBROUTINE statistics(a)
+    RETURN [MIN(a), MAX(a), SUM(a)]
+ENDSUBROUTINE
+"""
+
+
+def best(f, repeat=5):
+    f() # warm up
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+random.seed(1)
+p = ecp(PROGRAM, optimize=True)
+values = [random.randrange(1_000_000) for _ in range(2_000)]
+people = [p.Person(str(i), random.randrange(100)) for i in range(2_000)]
+ordered = sorted(random.sample(range(1_000_000), 10_000))
+targets = [random.choice(ordered) for _ in range(500)]
+large = [random.randrange(1_000_000) for _ in range(200_000)]
+
+CASES = [
+    ("sort 2000", lambda: p.bubbleSort(list(values)), lambda: p.SORT(list(values))),
+    ("sort records", lambda: p.insertionSortByAge(list(people)), lambda: p.SORT_BY(list(people), "age")),
+    ("search 500", lambda: p.linearSearches(ordered, targets), lambda: p.binarySearches(ordered, targets)),
+    ("gcd 20000", lambda: p.gcds(20_000, p.euclid), lambda: p.gcds(20_000, p.GCD)),
+    ("modpow 5000", lambda: p.modpows(5_000, p.squareAndMultiply), lambda: p.modpows(5_000, p.MODPOW)),
+    ("queue 2000", lambda: p.smallestFirst(values), lambda: p.heapOrder(values)),
+    ("min/max/sum", lambda: p.loopStatistics(large), lambda: p.statistics(large)),
+]
+print(f"{'':<14} {'ECP loops':>10} {'stdlib':>10}")
+for label, loops, builtin in CASES:
+    assert loops() == builtin(), label
+    print(f"{label:<14} {best(loops, 3) * 1000:8.1f}ms {best(builtin) * 1000:8.2f}ms")
@@ -0,0 +1,89 @@
+"""Building Strings with s := s + x against the strings pass, and copying
+substrings against views of them."""
+import time
+from ecp.topython import ecp
+
+PROGRAM = """
+SUBROUTINE csv(n)
+    line := ""
+    FOR i := 1 TO n
+        line := line + String(i) + ","
+    ENDFOR
+    RETURN line
+ENDSUBROUTINE
+
+SUBROUTINE caesar(text, shift)
+    result := ""
+    FOR i := 0 TO LEN(text) - 1
+        c := CHAR_TO_CODE(text[i])
+        IF c >= 97 AND c <= 122 THEN
+            c := (c - 97 + shift) MOD 26 + 97
+        ENDIF
+        result := result + CODE_TO_CHAR(c)
+    ENDFOR
+    RETURN result
+ENDSUBROUTINE
+
+SUBROUTINE occurrences(text, word, substring)
+    found := 0
+    rest := text
+    p := POSITION(rest, word)
+    WHILE p != -1
+        found := found + 1
+        rest := substring(p + 1, LEN(rest) - 1, rest)
+        p := POSITION(rest, word)
+    ENDWHILE
+    RETURN found
+ENDSUBROUTINE
+
+SUBROUTINE misses(text, words, position)
+    missing := 0
+    FOR w IN words
+        IF position(text, w) = -1 THEN
+            missing := missing + 1
+        ENDIF
+    ENDFOR
+    RETURN missing
+ENDSUBROUTINE
+"""
+
+TEXT = "the quick brown fox jumps over the lazy dog " * 2000
+WORDS = ["cat", "dog", "bird", "fish"] * 5000
+
+
+def best(f, repeat=5):
+    f() # warm up
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+plain = ecp(PROGRAM)
+optimized = ecp(PROGRAM, optimize=["strings"])
+for label, run in (
+    ("csv 20000", lambda p: p.csv(20_000)),
+    ("csv 100000", lambda p: p.csv(100_000)),
+    ("caesar", lambda p: p.caesar(TEXT, 3)),
+):
+    assert run(plain) == run(optimized)
+    print(f"{label:<12} s := s + x {best(lambda: run(plain)) * 1000:8.1f}ms   StringBuilder {best(lambda: run(optimized)) * 1000:8.1f}ms")
+
+results = {}
+for label, substring in (("SUBSTRING", plain.SUBSTRING), ("SUBSTRING_VIEW", plain.SUBSTRING_VIEW)):
+    results[label] = plain.occurrences(TEXT, "fox", substring)
+    print(f"{label:<14} {best(lambda: plain.occurrences(TEXT, 'fox', substring)) * 1000:8.1f}ms")
+assert len(set(results.values())) == 1
+
+
+def index_position(string, to_match):
+    # POSITION before it used str.find
+    try:
+        return string.index(to_match)
+    except:
+        return -1
+
+for label, position in (("str.index", index_position), ("str.find", plain.POSITION)):
+    print(f"POSITION {label:<9} {best(lambda: plain.misses(TEXT[:200], WORDS, position)) * 1000:8.1f}ms")
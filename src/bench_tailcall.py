@@ -0,0 +1,49 @@
+"""Deep self-recursion in ECP with and without the tailcall pass."""
+import sys
+import time
+from ecp.topython import ecp
+
+PROGRAM = """
+SUBROUTINE total(items, i, acc)
+    IF i = LEN(items) THEN
+        RETURN acc
+    ENDIF
+    RETURN total(items, i + 1, acc + items[i])
+ENDSUBROUTINE
+
+SUBROUTINE gcd(a, b)
+    IF b = 0 THEN
+        RETURN a
+    ENDIF
+    RETURN gcd(b, a MOD b)
+ENDSUBROUTINE
+"""
+
+REPEAT = 20
+
+for depth in (900, 100_000):
+    items = list(range(depth))
+    for optimize in (None, ["tailcall"]):
+        program = ecp(PROGRAM, optimize=optimize)
+        label = "+".join(optimize or ["none"])
+        start = time.perf_counter()
+        try:
+            for _ in range(REPEAT):
+                result = program.total(items, 0, 0)
+        except RecursionError:
+            print(f"{label:<9} depth {depth:>7}: RecursionError (limit {sys.getrecursionlimit()})")
+            continue
+        elapsed = (time.perf_counter() - start) / REPEAT
+        print(f"{label:<9} depth {depth:>7}: {elapsed * 1000:8.2f}ms per call (result {result})")
+
+# Fibonacci neighbours are the worst case for Euclid's algorithm
+a, b = 1, 1
+for _ in range(300):
+    a, b = b, a + b
+for optimize in (None, ["tailcall"]):
+    program = ecp(PROGRAM, optimize=optimize)
+    start = time.perf_counter()
+    for _ in range(2000):
+        program.gcd(b, a)
+    elapsed = (time.perf_counter() - start) / 2000
+    print(f"{'+'.join(optimize or ['none']):<9} gcd of 300th Fibonacci numbers: {elapsed * 1e6:8.1f}us")
@@ -0,0 +1,43 @@
+"""Speed of annotated ECP code with and without the types / typecheck passes."""
+import time
+from ecp.topython import ecp
+
+PROGRAM = """
+SUBROUTINE isPrime(n: Integer)
+    IF n < 2 THEN
+        RETURN False
+    ENDIF
+    FOR i := 2 TO Int(SQRT(n))
+        IF n MOD i = 0 THEN
+            RETURN False
+        ENDIF
+    ENDFOR
+    RETURN True
+ENDSUBROUTINE
+
+SUBROUTINE digitSum(n: Integer)
+    total := 0
+    WHILE n > 0
+        total := total + n MOD 10
+        n := n DIV 10
+    ENDWHILE
+    RETURN Int(total)
+ENDSUBROUTINE
+
+SUBROUTINE run(limit: Integer)
+    count := 0
+    FOR i := 1 TO limit
+        IF isPrime(i) THEN
+            count := count + digitSum(i)
+        ENDIF
+    ENDFOR
+    RETURN count
+ENDSUBROUTINE
+"""
+
+for passes in (None, ["types"], ["types", "typecheck"]):
+    program = ecp(PROGRAM, optimize=passes)
+    start = time.perf_counter()
+    result = program.run(200_000)
+    elapsed = time.perf_counter() - start
+    print(f"{'+'.join(passes or ['none']):<16} {elapsed * 1000:8.1f}ms (result {result})")
@@ -4,5 +4,25 @@ An implementation of the ECP programming language. Includes a Lexer and Parser f
 ECP code.
 """
 __version__ = "1.5.0"
-from .lexer import EcpLexer
-from .topython import EcpParser, ecp, parse_ecp, to_py_source, _dump, get_more
\ No newline at end of file
+
+# the compiler is imported on first use so that `import ecp` stays cheap
+_LAZY = {
+    "EcpLexer": "lexer",
+    "EcpParser": "topython",
+    "ecp": "topython",
+    "parse_ecp": "topython",
+    "to_py_source": "topython",
+    "_dump": "topython",
+    "get_more": "topython",
+}
+
+def __getattr__(name):
+    if name in _LAZY:
+        from importlib import import_module
+        value = getattr(import_module("." + _LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY))
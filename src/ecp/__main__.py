@@ -1,13 +1,35 @@
-from sys import exc_info
-from .lexer import *
-from .topython import *
-from . import __version__, _dump
+from . import __version__
 import argparse
-from .tracker import Tracker
-from traceback import print_exc
 import os
+import sys
+
+def serve(args):
+    from .server import serve, DEFAULT_SOCKET
+    parser = argparse.ArgumentParser("ecp serve", description="Run ECP programs sent over a unix socket in pre-forked workers")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="path of the unix socket to listen on")
+    options = parser.parse_args(args)
+    print(f"ECP {__version__} serving on {options.socket}", file=sys.stderr)
+    serve(options.socket)
+
+def bundle(args):
+    from .bundle import bundle
+    parser = argparse.ArgumentParser("ecp bundle", description="Precompile an ECP program and the modules it imports into a single runnable zipapp")
+    parser.add_argument("inputfile")
+    parser.add_argument("-o", "--output", help="path of the bundle to write (default: inputfile with .pyz extension)")
+    parser.add_argument("--python", default="/usr/bin/env python3", help="interpreter line of the bundle")
+    options = parser.parse_args(args)
+    output = options.output or os.path.splitext(options.inputfile)[0] + ".pyz"
+    bundle(options.inputfile, output, interpreter=options.python)
+
+COMMANDS = {
+    "serve": serve,
+    "bundle": bundle,
+}
 
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        return COMMANDS[sys.argv[1]](sys.argv[2:])
+
     parser = argparse.ArgumentParser("ecp", description="ECP interpreter")
     parser.add_argument("inputfile", type=argparse.FileType("r", encoding="utf-8"), nargs="?")
     parser.add_argument("--debug", action="store_true", help="show debug information like token list")
@@ -15,6 +37,14 @@ def main():
     parser.add_argument("--trace", action="store", nargs="*", default=[], help="space seperated names of the variables to be traced")
     parser.add_argument("--tracecompact", action="store_true", help="trace compactly")
     parser.add_argument("--topython", action="store_true", help="Try to convert the ECP program to python source code")
+    parser.add_argument("--lazy", action="store_true", help="compile each SUBROUTINE when it is first called")
+    parser.add_argument("-O", "--optimize", action="store_true", help="run the default optimization passes")
+    parser.add_argument("--passes", help="comma seperated names of the optimization passes to run")
+    parser.add_argument("--opt-report", action="store_true", help="print what the optimization passes changed")
+    parser.add_argument("--record-profile", nargs="?", const="", metavar="PATH", help="count SUBROUTINE calls, argument types and loop iterations while running and write them to PATH (default: inputfile with .profile.json extension)")
+    parser.add_argument("--use-profile", metavar="PATH", help="optimize using a profile written by --record-profile")
+    parser.add_argument("--output-buffer", type=int, metavar="SIZE", help="number of characters of OUTPUT collected before they are written (default: 65536)")
+    parser.add_argument("--unbuffered", action="store_true", help="write OUTPUT immediately")
     parser.add_argument("--pause", action="store_true", help="pause on completion")
     parser.add_argument('--version', action='version', version='%(prog)s v'+__version__)
 
@@ -27,7 +57,10 @@ def main():
         name = os.path.basename(options.inputfile.name)
         options.inputfile.close()
 
+        from .topython import ecp, to_py_source
+
         def debugOutput(result):
+            from tabulate import tabulate
             table = []
             for i in result.tokens:
                 table.append([i.value, i.type])
@@ -37,16 +70,41 @@ def main():
             pass
             #debugOutput(result)
         sys.path.insert(0, loc)
+        from .profiler import Profile, default_path
+        optimizer = None
+        profile = None
+        if options.record_profile is not None:
+            if options.optimize or options.passes or options.use_profile:
+                parser.error("--record-profile can not be combined with optimization")
+            profile = Profile()
+            profile_path = options.record_profile or default_path(options.inputfile.name)
+        if options.optimize or options.passes or options.use_profile:
+            from .passes import Optimizer
+            optimizer = Optimizer(
+                options.passes.split(",") if options.passes else None,
+                profile=Profile.load(options.use_profile) if options.use_profile else None
+            )
+        from .runtime import DEFAULT_OUTPUT_BUFFER, EcpOutput # after parsing, so that --version does not load it
+        buffer_size = DEFAULT_OUTPUT_BUFFER if options.output_buffer is None else options.output_buffer
+        output = EcpOutput(buffer_size=0 if options.unbuffered else buffer_size)
         if options.topython:
-            print(to_py_source(string))
+            print(to_py_source(string, optimize=optimizer))
         else:
             #print(_dump(parse_ecp(string), indent=2, include_attributes=True)) # DEBUG
-            ecp(string, name=name, scope=globals(), trace=options.trace, tracecompact=options.tracecompact, showAST=options.showast)
+            try:
+                ecp(string, name=name, scope=globals(), trace=options.trace, tracecompact=options.tracecompact, showAST=options.showast, lazy=options.lazy, optimize=optimizer, profile=profile, output=output)
+            finally:
+                if profile is not None:
+                    profile.save(profile_path)
+            if optimizer and options.opt_report:
+                print(optimizer.format_report(), file=sys.stderr)
         if options.pause:
             input("Press enter to exit...")
 
     else:
         # Live console
+        from .topython import ecp, get_more
+        from traceback import print_exc
         print(f"ECP {__version__}")
         string = ""
         prompt = "ECP> "
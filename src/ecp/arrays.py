@@ -0,0 +1,135 @@
+"""Multi-dimensional Arrays of numbers stored compactly.
+
+``ARRAY2D(rows, cols, fill)`` creates a grid which is indexed like an Array of
+Arrays, as ``grid[i][j]`` or ``grid[i, j]``. When ``fill`` is given as an
+Integer or a Real each row is a NumberRow: an ``array.array`` holding the numbers in one
+block of memory, 8 bytes each, instead of a list of pointers to number
+objects. Rows are created, copied and filled by copying memory. The rows are
+kept in a plain Array, so ``grid[i][j]`` takes two subscripts implemented in
+C, like it does for nested Arrays.
+
+A NumberRow only holds numbers of the type of ``fill``: Integers must fit in
+64 bits and Integers stored in a grid of Reals become Reals. Grids of other
+values (Bool, String...) are nested Arrays, as are grids without a ``fill``,
+which start as 0 and can hold anything.
+
+ARRAYND(dimensions, fill) creates an Array with any number of dimensions, and
+TO_ARRAY converts nested Arrays. FILL, COPY, COLUMN and MATRIX_MULTIPLY work
+on these and on nested Arrays alike.
+"""
+from array import array
+from operator import itemgetter, mul
+
+__all__ = ["NumberRow", "ARRAY2D", "ARRAYND", "TO_ARRAY", "FILL", "COPY", "COLUMN", "MATRIX_MULTIPLY"]
+
+# array.array type codes of the numbers which can be stored in a NumberRow
+TYPECODES = {int: "q", float: "d"}
+
+
+class NumberRow(array):
+    """An array.array which prints and compares like an Array"""
+    __slots__ = ()
+
+    def __repr__(self):
+        return repr(self.tolist())
+
+    def __eq__(self, other):
+        if isinstance(other, list):
+            return self.tolist() == other
+        return array.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __copy__(self):
+        return NumberRow(self.typecode, self)
+
+    def __reduce__(self):
+        return NumberRow, (self.typecode, self.tolist())
+
+
+def _row(values, typecode: str = None):
+    """A NumberRow of ``values`` if they can be stored in one, otherwise an Array"""
+    values = values if isinstance(values, (list, array)) else list(values)
+    if typecode is None:
+        typecode = TYPECODES.get(type(values[0])) if len(values) else None
+    if typecode is not None:
+        try:
+            return NumberRow(typecode, values)
+        except (TypeError, OverflowError):
+            pass
+    return list(values)
+
+
+_NO_FILL = object() # no fill was given: nested Arrays of 0
+
+
+def ARRAYND(dimensions, fill=_NO_FILL):
+    """Array with the sizes ``dimensions`` (e.g. [depth, rows, cols]), every value ``fill``"""
+    *outer, size = dimensions
+    typecode = TYPECODES.get(type(fill))
+    if fill is _NO_FILL:
+        fill = 0
+    if typecode is not None:
+        template = NumberRow(typecode, [fill]) * size
+        make = lambda: NumberRow(typecode, template)
+    else:
+        template = [fill] * size
+        make = template.copy
+
+    def build(sizes):
+        if not sizes:
+            return make()
+        return [build(sizes[1:]) for _ in range(sizes[0])]
+    return build(outer)
+
+
+def ARRAY2D(rows: int, cols: int, fill=_NO_FILL):
+    """Grid of ``rows`` rows of ``cols`` values, indexed as grid[row, col]"""
+    return ARRAYND((rows, cols), fill)
+
+
+def TO_ARRAY(values):
+    """Store the numbers of nested Arrays in NumberRows"""
+    if len(values) and isinstance(values[0], (list, array)):
+        return [TO_ARRAY(v) for v in values]
+    return _row(values)
+
+
+def FILL(values, value):
+    """Set every value of a (nested) Array to ``value``"""
+    if len(values) and isinstance(values[0], (list, array)):
+        for v in values:
+            FILL(v, value)
+    elif isinstance(values, array):
+        values[:] = array(values.typecode, [value]) * len(values)
+    else:
+        values[:] = [value] * len(values)
+
+
+def COPY(values):
+    """Copy of a (nested) Array, so that changing it does not change ``values``"""
+    if isinstance(values, NumberRow):
+        return NumberRow(values.typecode, values)
+    if len(values) and isinstance(values[0], (list, array)):
+        return [COPY(v) for v in values]
+    return values.copy() if isinstance(values, list) else values[:]
+
+
+def COLUMN(grid, col: int) -> list:
+    """The values of column ``col`` of a grid as an Array"""
+    return list(map(itemgetter(col), grid))
+
+
+def MATRIX_MULTIPLY(a, b):
+    """Matrix product of the grids ``a`` (n x m) and ``b`` (m x p)"""
+    if len(a) and len(a[0]) != len(b):
+        raise ValueError(f"can not multiply a {len(a)}x{len(a[0])} matrix by a {len(b)}x{len(b[0]) if len(b) else 0} matrix")
+    columns = list(zip(*b))
+    numbers = len(a) and len(b) and isinstance(a[0], NumberRow) and isinstance(b[0], NumberRow)
+    # numbers are taken out of the NumberRows once instead of for every product
+    rows = [row.tolist() if isinstance(row, array) else row for row in a]
+    products = ([sum(map(mul, row, column)) for column in columns] for row in rows)
+    return [_row(values) for values in products] if numbers else list(products)
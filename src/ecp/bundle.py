@@ -0,0 +1,178 @@
+"""Single file deployable bundles of precompiled ECP programs."""
+from __future__ import annotations # keep typing out of the bundle's start-up
+import marshal
+import os
+import sys
+from importlib.util import MAGIC_NUMBER
+
+# the archive holds __main__.py, the ecp package, the python modules the program
+# imports from its directory and BUNDLE_DIR with the manifest and marshalled code
+BUNDLE_DIR = "__ecp__"
+
+BOOTSTRAP = """import sys
+from ecp.bundle import run_bundle
+sys.exit(run_bundle(__loader__))
+"""
+
+
+def _find_imports(tree):
+    """Yield the locations of the IMPORT statements in ``tree`` with a constant location"""
+    from ast import walk, Call, Name, Constant
+    for node in walk(tree):
+        if isinstance(node, Call) and isinstance(node.func, Name) and node.func.id == "_ECP_IMPORT":
+            location = node.args[0]
+            if isinstance(location, Constant) and isinstance(location.value, str):
+                yield location.value
+            else:
+                print(f"warning: IMPORT at line {node.lineno} does not use a constant location and will not be bundled", file=sys.stderr)
+
+
+def _python_imports(tree):
+    """Yield the top level names of the python modules imported by ``tree`` and its PY() code"""
+    from ast import Import, ImportFrom
+    from .passes.analysis import walk_all
+    for node in walk_all(tree):
+        if isinstance(node, Import):
+            yield from (alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ImportFrom) and node.level == 0 and node.module:
+            yield node.module.split(".")[0]
+
+
+def _local_module(name: str, directory: str):
+    """The file or package of the python module ``name`` in ``directory``, or None"""
+    for path in (os.path.join(directory, name + ".py"), os.path.join(directory, name, "__init__.py")):
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _resolve(location: str, search_path: list[str]) -> str:
+    """Find the file an IMPORT of ``location`` loads, the same way _ECP_IMPORT does"""
+    for p in search_path:
+        if os.path.exists(p + location + ".ecp"):
+            return p + location + ".ecp"
+    raise ImportError(f"cannot bundle IMPORT {location!r}: no such ECP module", name=location)
+
+
+def compile_program(file: str, search_path: list[str] = None) -> tuple[dict[str, bytes], dict, dict[str, str]]:
+    """Compile ``file`` and every module it imports.
+
+    Returns the marshalled code of each module keyed by module name, the manifest
+    and the python modules imported from the directories of the ECP modules.
+    """
+    from ast import parse
+    from .topython import parse_ecp
+
+    if search_path is None:
+        search_path = [os.path.dirname(os.path.abspath(file))] + sys.path
+    modules = {}
+    imports = {}
+    names = {} # resolved path -> module name
+    python = {} # name of a python module -> its file or package directory
+
+    def add_python(tree, directory: str):
+        for module in _python_imports(tree):
+            path = _local_module(module, directory)
+            if path is None or module in python:
+                continue
+            python[module] = path if path.endswith(module + ".py") else os.path.dirname(path)
+            # modules imported by the module, next to it
+            sources = [path] if os.path.isfile(python[module]) else [
+                os.path.join(root, f) for root, _, files in os.walk(python[module]) for f in files if f.endswith(".py")
+            ]
+            for source in sources:
+                with open(source, "rb") as f:
+                    add_python(parse(f.read()), directory)
+
+    def add(path: str) -> str:
+        path = os.path.abspath(path)
+        if path in names:
+            return names[path]
+        name = base = os.path.splitext(os.path.basename(path))[0]
+        i = 1
+        while name in modules:
+            name = f"{base}_{i}"
+            i += 1
+        names[path] = name
+        modules[name] = b""
+
+        with open(path, encoding="utf-8") as f:
+            tree = parse_ecp(f.read())
+        # dont_inherit: the annotations of the program must not become strings
+        modules[name] = marshal.dumps(compile(tree, os.path.basename(path), "exec", dont_inherit=True))
+        add_python(tree, os.path.dirname(path))
+        for location in _find_imports(tree):
+            if location not in imports:
+                imports[location] = add(_resolve(location, search_path))
+        return name
+
+    main = add(file)
+    return modules, {"magic": MAGIC_NUMBER, "main": main, "imports": imports}, python
+
+
+def bundle(file: str, output: str, *, interpreter: str = "/usr/bin/env python3"):
+    """Write a zipapp to ``output`` which runs the ECP program ``file``"""
+    import compileall
+    import zipapp
+    import shutil
+    from tempfile import TemporaryDirectory
+
+    modules, manifest, python = compile_program(file)
+    package = os.path.dirname(os.path.abspath(__file__))
+    with TemporaryDirectory() as d:
+        shutil.copytree(package, os.path.join(d, "ecp"), ignore=shutil.ignore_patterns("__pycache__", "*.gram"))
+        # zipimport cannot write bytecode caches, so ship them next to the sources
+        compileall.compile_dir(os.path.join(d, "ecp"), quiet=1, legacy=True)
+        for module, path in python.items():
+            if module == "ecp" or module == "__main__":
+                raise ValueError(f"cannot bundle the python module {path}: its name is used by the bundle")
+            if os.path.isdir(path):
+                shutil.copytree(path, os.path.join(d, module), ignore=shutil.ignore_patterns("__pycache__"))
+            else:
+                shutil.copy(path, os.path.join(d, module + ".py"))
+        os.mkdir(os.path.join(d, BUNDLE_DIR))
+        for name, code in modules.items():
+            with open(os.path.join(d, BUNDLE_DIR, name + ".ecpc"), "wb") as f:
+                f.write(code)
+        with open(os.path.join(d, BUNDLE_DIR, "manifest"), "wb") as f:
+            f.write(marshal.dumps(manifest))
+        with open(os.path.join(d, "__main__.py"), "w", encoding="utf-8") as f:
+            f.write(BOOTSTRAP)
+        zipapp.create_archive(d, output, interpreter=interpreter)
+
+
+def run_bundle(loader) -> int:
+    """Run the main program of the bundle ``loader`` (a zipimporter) was loaded from"""
+    from . import runtime
+
+    def load(name: str):
+        return marshal.loads(loader.get_data(os.path.join(loader.archive, BUNDLE_DIR, name)))
+
+    manifest = load("manifest")
+    if manifest["magic"] != MAGIC_NUMBER:
+        print("This bundle was compiled for a different python version, please rebuild it", file=sys.stderr)
+        return 1
+
+    def run(name: str, scope: dict):
+        code = load(name + ".ecpc")
+        runtime.load_builtins(code, scope)
+        exec(code, scope)
+
+    def new_scope() -> dict:
+        scope = dict(vars(runtime))
+        scope["_ECP_IMPORT"] = _ECP_IMPORT
+        return scope
+
+    def _ECP_IMPORT(location: str, target: str, scope=None):
+        if location not in manifest["imports"]:
+            raise ImportError(f"ECP module {location!r} is not part of this bundle", name=location)
+        module = new_scope()
+        run(manifest["imports"][location], module)
+        scope[target] = runtime.Namespace(**module)
+
+    with runtime._STANDARD_OUTPUT.ordered_stdout():
+        try:
+            run(manifest["main"], new_scope())
+        finally:
+            runtime._STANDARD_OUTPUT.flush()
+    return 0
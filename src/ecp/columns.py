@@ -0,0 +1,240 @@
+"""Arrays of RECORDs stored by column.
+
+An Array of records is a list of objects which each hold their fields, so
+going through one field of a million records touches a million objects.
+``RecordArray(Car)`` keeps every field of the RECORD Car in a column of its
+own instead: fields declared as ``: Integer`` or ``: Real`` in an
+``array.array`` of 8 byte numbers, other fields in a list.
+
+    cars := RecordArray(Car, [Car("Ford", 1399.99), Car("Fiat", 999.5)])
+    cars.append(Car("Audi", 4999.0))
+    OUTPUT cars[0].make, cars.sum("price")
+    cheap := cars.filter("price", isCheap)
+    cars.sort("price")
+
+``cars[i]`` and FOR loops give rows: small objects with the index of the row,
+whose fields read and change the columns. A row refers to a position, so
+after ``sort`` it shows the record now at that position. The operations on a
+whole column (sum, min, max, filter, sort) run over the column in C without
+creating rows or records.
+
+Integer columns only hold Integers which fit in 64 bits, and Integers stored
+in a Real column become Reals.
+"""
+from array import array
+from itertools import compress
+from operator import attrgetter, eq
+
+__all__ = ["RecordArray", "RecordRow"]
+
+# array.array type codes of the columns of fields declared with these types
+COLUMN_TYPES = {"Integer": "q", "Int": "q", "Real": "d"}
+
+
+def _fields(record) -> tuple:
+    return tuple(record._fields if hasattr(record, "_fields") else record.__slots__)
+
+
+class RecordRow:
+    """Row of a RecordArray. Subclasses made by RecordArray have a property per field."""
+    __slots__ = ("_index",)
+    _array = None
+
+    def __init__(self, index: int):
+        self._index = index
+
+    def _values(self) -> tuple:
+        i = self._index
+        return tuple(column[i] for column in self._array._columns.values())
+
+    def __eq__(self, other):
+        if isinstance(other, RecordRow):
+            return self._array.fields == other._array.fields and self._values() == other._values()
+        if isinstance(other, self._array.record):
+            return self._values() == tuple(getattr(other, field) for field in self._array.fields)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        values = ", ".join(f"{f}={v!r}" for f, v in zip(self._array.fields, self._values()))
+        return f"{self._array.record.__name__}({values})"
+
+
+class _ColumnView:
+    """The values of one field of a RecordArray, returned by ``column``.
+    Changing them changes the RecordArray and drops its indexes."""
+    __slots__ = ("_array", "_values")
+
+    def __init__(self, array: "RecordArray", values):
+        self._array = array
+        self._values = values
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __getitem__(self, index):
+        return self._values[index]
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            value = list(value)
+            if len(range(*index.indices(len(self._values)))) != len(value):
+                raise ValueError("the columns of a RecordArray can not change their length")
+        self._values[index] = value
+        self._array._indexes = None
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __contains__(self, value) -> bool:
+        return value in self._values
+
+    def __eq__(self, other):
+        return self._values == (other._values if isinstance(other, _ColumnView) else other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self._values)
+
+
+class RecordArray:
+    """Records of the RECORD type ``record``, stored by column"""
+
+    def __init__(self, record, records=()):
+        self.record = record
+        self.fields = _fields(record)
+        types = getattr(record, "__annotations__", {})
+        self._columns = {field: self._empty(types.get(field)) for field in self.fields}
+        self._row = self._row_type()
+        self._indexes = None # built by the query builtins of ecp.queries
+        self.extend(records)
+
+    @staticmethod
+    def _empty(typename):
+        typecode = COLUMN_TYPES.get(typename)
+        return [] if typecode is None else array(typecode)
+
+    def _row_type(self) -> type:
+        """The RecordRow class of this array, reading and changing the columns directly"""
+        namespace = {"__slots__": (), "_array": self}
+        mutable = not hasattr(self.record, "_fields") # CONSTANT RECORDs are tuples
+        for field, column in self._columns.items():
+            def set(row, value, column=column):
+                column[row._index] = value
+                self._indexes = None
+            namespace[field] = property(lambda row, column=column: column[row._index], set if mutable else None)
+        return type(f"{self.record.__name__}Row", (RecordRow,), namespace)
+
+    # changing the rows
+
+    def append(self, record):
+        self.extend((record,))
+
+    def extend(self, records):
+        """Add the records of an Array, or the rows of another RecordArray"""
+        records = records if isinstance(records, (list, tuple)) else list(records)
+        if not records:
+            return
+        if isinstance(records[0], RecordRow):
+            records = [row._array.record_at(row._index) for row in records]
+        # build every column before changing any, so that a wrong value changes nothing
+        added = []
+        for field, column in self._columns.items():
+            values = map(attrgetter(field), records)
+            added.append(array(column.typecode, values) if isinstance(column, array) else list(values))
+        for column, values in zip(self._columns.values(), added):
+            column.extend(values)
+        self._indexes = None
+
+    def __setitem__(self, index: int, record):
+        index = self._position(index)
+        for field, column in self._columns.items():
+            column[index] = getattr(record, field)
+        self._indexes = None
+
+    def pop(self, index: int = -1):
+        """Remove the row at ``index`` and return it as a record"""
+        record = self.record_at(index)
+        index = self._position(index)
+        for column in self._columns.values():
+            del column[index]
+        self._indexes = None
+        return record
+
+    # reading the rows
+
+    def _position(self, index: int) -> int:
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("RecordArray index out of range")
+        return index
+
+    def __len__(self) -> int:
+        return len(next(iter(self._columns.values()), ()))
+
+    def __getitem__(self, index: int) -> RecordRow:
+        return self._row(self._position(index))
+
+    def __iter__(self):
+        return map(self._row, range(len(self)))
+
+    def record_at(self, index: int):
+        """The row at ``index`` as a record of the RECORD type"""
+        index = self._position(index)
+        return self.record(*[column[index] for column in self._columns.values()])
+
+    def records(self) -> list:
+        """Every row as a record, in an Array"""
+        return list(map(self.record, *self._columns.values())) if self.fields else [self.record() for _ in range(len(self))]
+
+    def __repr__(self):
+        return repr(list(self))
+
+    # operations on columns
+
+    def column(self, field: str) -> _ColumnView:
+        """The values of ``field``. Changing them changes the RecordArray."""
+        return _ColumnView(self, self._column(field))
+
+    def _column(self, field: str):
+        try:
+            return self._columns[field]
+        except KeyError:
+            raise AttributeError(f"{self.record.__name__} has no field {field!r}") from None
+
+    def sum(self, field: str):
+        return sum(self._column(field))
+
+    def min(self, field: str):
+        return min(self._column(field))
+
+    def max(self, field: str):
+        return max(self._column(field))
+
+    def _take(self, indexes) -> "RecordArray":
+        result = RecordArray(self.record)
+        for column, taken in zip(self._columns.values(), result._columns.values()):
+            taken.extend(map(column.__getitem__, indexes))
+        return result
+
+    def filter(self, field: str, test) -> "RecordArray":
+        """New RecordArray of the rows whose ``field`` passes ``test``: a
+        SUBROUTINE returning True or False, or a value the field must equal."""
+        column = self._column(field)
+        passed = map(test, column) if callable(test) else map(eq, column, [test] * len(column))
+        return self._take(list(compress(range(len(column)), passed)))
+
+    def sort(self, field: str, reverse: bool = False) -> "RecordArray":
+        """Sort the rows by ``field`` in place (stable) and return the RecordArray"""
+        keys = self._column(field)
+        keys = keys.tolist() if isinstance(keys, array) else keys # the numbers are boxed once
+        order = sorted(range(len(keys)), key=keys.__getitem__, reverse=reverse)
+        for column in self._columns.values():
+            values = map(column.__getitem__, order)
+            column[:] = array(column.typecode, values) if isinstance(column, array) else list(values)
+        self._indexes = None
+        return self
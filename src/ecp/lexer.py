@@ -1,7 +1,8 @@
 from typing import *
 from parsergen.lexer import *
-from tabulate import tabulate
 import codecs
+import itertools
+import re
 
 def use_name(name, *rules):
     """Helper function for crating tokens which return their type as value
@@ -17,25 +18,47 @@ def use_name(name, *rules):
 
     return token(*rules)(modifier)
 
+def keyword(*words):
+    """Rules matching whole words only, so that names starting with a keyword
+    (INSERT, ORDER...) are not split into the keyword and the rest of the name"""
+    return tuple(word + r"\b" for word in words)
+
+def build_lexer_table(lexer: Type[Lexer]) -> Tuple[str, Dict[str, str]]:
+    """Combine every rule of ``lexer`` into a single regex.
+
+    Returns the master pattern, with one named group per rule regex in the
+    order the Lexer would try them, and a map of group name to token type.
+    Alternation picks the first alternative that matches, so the master
+    pattern matches exactly what trying each rule in turn would.
+    """
+    groups = []
+    tokens = {}
+    for token_name, rule in itertools.chain(lexer._rules.items(), lexer._ignores.items()):
+        for regex in rule.match:
+            group = f"_{len(tokens)}"
+            groups.append(f"(?P<{group}>{regex})")
+            tokens[group] = token_name
+    return "|".join(groups), tokens
+
 class EcpLexer(Lexer):
     # symbols
     ASSIGN  = r"←", r":="
     EQ      = use_name("EQ",      r"="           )
     ADD     = use_name("ADD",     r"\+"          )
-    POW     = use_name("POW",     r"\*\*", r"POW")
+    POW     = use_name("POW",     r"\*\*", r"POW\b")
     MUL     = use_name("MUL",     r"\*"          )
     SUB     = use_name("SUB",     r"\-",   r"–"  )
-    INT_DIV = use_name("INT_DIV", r"DIV"         )
-    MOD     = use_name("MOD",     r"%",    r"MOD")
+    INT_DIV = use_name("INT_DIV", r"DIV\b"       )
+    MOD     = use_name("MOD",     r"%",    r"MOD\b")
     DIV     = use_name("DIV",     r"/"           )
     NE      = use_name("NE",      r"!=",   r"≠"  )
     LE      = use_name("LE",      r"<=",   r"≤"  )
     GE      = use_name("GE",      r">=",   r"≥"  )
     LT      = use_name("LT",      r"<"           )
     GT      = use_name("GT",      r">"           )
-    NOT     = use_name("NOT",     r"NOT"         )
-    OR      = use_name("OR",      r"OR"          )
-    AND     = use_name("AND",     r"AND"         )
+    NOT     = use_name("NOT",     r"NOT\b"       )
+    OR      = use_name("OR",      r"OR\b"        )
+    AND     = use_name("AND",     r"AND\b"       )
     
     @token(r"\n")
     def NEWLINE(self, t):
@@ -63,7 +86,7 @@ class EcpLexer(Lexer):
         int(t.value)
         return t
     
-    BOOLEAN = r"True", r"False"
+    BOOLEAN = keyword("True", "False")
 
     @token(r"(\"|')")
     def STRING(self, t):
@@ -91,33 +114,59 @@ class EcpLexer(Lexer):
                 raise Exception("No end of string")
     
     
-    NONE = r"None"
+    NONE = keyword("None")
 
     DOT = r"\."
     
     # keywords
-    SUBROUTINE = r"SUBROUTINE",
-    END = r"ENDSUBROUTINE", r"ENDIF", r"ENDWHILE", r"ENDFOR", r"ENDRECORD", r"ENDTRY", r"ENDCLASS", r"END"
-    MAGIC = r"RETURN", r"CONTINUE", r"BREAK", r"OUTPUT", r"USERINPUT"
-    IF = r"IF"
-    THEN = r"THEN"
-    ELSE = r"ELSE"
-    WHILE = r"WHILE"
-    REPEAT = r"REPEAT"
-    UNTIL = r"UNTIL"
-    FOR = r"FOR"
-    TO = r"TO"
-    IN = r"IN"
-    STEP = r"STEP"
-    RECORD = r"RECORD"
-    CONSTANT = r"CONSTANT"
-    TRY = r"TRY"
-    CATCH = r"CATCH"
-    CLASS = r"CLASS"
-    IMPORT = r"IMPORT"
-    AS = r"AS"
+    SUBROUTINE = keyword("SUBROUTINE")
+    END = keyword("ENDSUBROUTINE", "ENDIF", "ENDWHILE", "ENDFOR", "ENDRECORD", "ENDTRY", "ENDCLASS", "END")
+    MAGIC = keyword("RETURN", "CONTINUE", "BREAK", "OUTPUT", "USERINPUT_INT", "USERINPUT")
+    IF = keyword("IF")
+    THEN = keyword("THEN")
+    ELSE = keyword("ELSE")
+    WHILE = keyword("WHILE")
+    REPEAT = keyword("REPEAT")
+    UNTIL = keyword("UNTIL")
+    FOR = keyword("FOR")
+    TO = keyword("TO")
+    IN = keyword("IN")
+    STEP = keyword("STEP")
+    RECORD = keyword("RECORD")
+    CONSTANT = keyword("CONSTANT")
+    CACHED = keyword("CACHED")
+    TRY = keyword("TRY")
+    CATCH = keyword("CATCH")
+    CLASS = keyword("CLASS")
+    IMPORT = keyword("IMPORT")
+    AS = keyword("AS")
 
     ID = r"[a-zA-Z_][a-zA-Z0-9_]*"
 
     ignore = " \t"
-    ignore_comment = r"#.*"
\ No newline at end of file
+    ignore_comment = r"#.*"
+
+    _master = None
+
+    def getToken(self) -> Token:
+        # match all the rules at once with the precomputed master pattern
+        if EcpLexer._master is None:
+            EcpLexer._master = re.compile(_PATTERN)
+        r = EcpLexer._master.match(self.source)
+        if r is None:
+            raise LexError(
+                f"Found Unexpected character '{self.source[0]}' while tokenizing!",
+                self.lineno, self.column, self.current_line + self.source[0]
+            )
+        token_name = _TOKENS[r.lastgroup]
+        rule = self._rules.get(token_name) or self._ignores[token_name]
+        self.step_source(r.end())
+        rv = self.Token(token_name, r.group())
+        if rule.modifier:
+            rv = rule.modifier(self, rv)
+        return rv if not token_name.startswith("ignore_") else None
+
+try:
+    from .lexer_table import PATTERN as _PATTERN, TOKENS as _TOKENS
+except ImportError: # table has not been generated by regen_parser.py
+    _PATTERN, _TOKENS = build_lexer_table(EcpLexer)
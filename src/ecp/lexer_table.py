@@ -0,0 +1,3 @@
+# Code @generated by regen_parser.py from EcpLexer; do not edit!
+PATTERN = '(?P<_0>←)|(?P<_1>:=)|(?P<_2>=)|(?P<_3>\\+)|(?P<_4>\\*\\*)|(?P<_5>POW\\b)|(?P<_6>\\*)|(?P<_7>\\-)|(?P<_8>–)|(?P<_9>DIV\\b)|(?P<_10>%)|(?P<_11>MOD\\b)|(?P<_12>/)|(?P<_13>!=)|(?P<_14>≠)|(?P<_15><=)|(?P<_16>≤)|(?P<_17>>=)|(?P<_18>≥)|(?P<_19><)|(?P<_20>>)|(?P<_21>NOT\\b)|(?P<_22>OR\\b)|(?P<_23>AND\\b)|(?P<_24>\\n)|(?P<_25>\\()|(?P<_26>\\))|(?P<_27>\\[)|(?P<_28>\\])|(?P<_29>\\{)|(?P<_30>\\})|(?P<_31>,)|(?P<_32>\\:)|(?P<_33>(\\d*\\.\\d+))|(?P<_34>(\\d+\\.\\d*))|(?P<_35>\\d+)|(?P<_36>True\\b)|(?P<_37>False\\b)|(?P<_38>(\\"|\'))|(?P<_39>None\\b)|(?P<_40>\\.)|(?P<_41>SUBROUTINE\\b)|(?P<_42>ENDSUBROUTINE\\b)|(?P<_43>ENDIF\\b)|(?P<_44>ENDWHILE\\b)|(?P<_45>ENDFOR\\b)|(?P<_46>ENDRECORD\\b)|(?P<_47>ENDTRY\\b)|(?P<_48>ENDCLASS\\b)|(?P<_49>END\\b)|(?P<_50>RETURN\\b)|(?P<_51>CONTINUE\\b)|(?P<_52>BREAK\\b)|(?P<_53>OUTPUT\\b)|(?P<_54>USERINPUT_INT\\b)|(?P<_55>USERINPUT\\b)|(?P<_56>IF\\b)|(?P<_57>THEN\\b)|(?P<_58>ELSE\\b)|(?P<_59>WHILE\\b)|(?P<_60>REPEAT\\b)|(?P<_61>UNTIL\\b)|(?P<_62>FOR\\b)|(?P<_63>TO\\b)|(?P<_64>IN\\b)|(?P<_65>STEP\\b)|(?P<_66>RECORD\\b)|(?P<_67>CONSTANT\\b)|(?P<_68>CACHED\\b)|(?P<_69>TRY\\b)|(?P<_70>CATCH\\b)|(?P<_71>CLASS\\b)|(?P<_72>IMPORT\\b)|(?P<_73>AS\\b)|(?P<_74>[a-zA-Z_][a-zA-Z0-9_]*)|(?P<_75>#.*)'
+TOKENS = {'_0': 'ASSIGN', '_1': 'ASSIGN', '_2': 'EQ', '_3': 'ADD', '_4': 'POW', '_5': 'POW', '_6': 'MUL', '_7': 'SUB', '_8': 'SUB', '_9': 'INT_DIV', '_10': 'MOD', '_11': 'MOD', '_12': 'DIV', '_13': 'NE', '_14': 'NE', '_15': 'LE', '_16': 'LE', '_17': 'GE', '_18': 'GE', '_19': 'LT', '_20': 'GT', '_21': 'NOT', '_22': 'OR', '_23': 'AND', '_24': 'NEWLINE', '_25': 'LPAREN', '_26': 'RPAREN', '_27': 'LS_PAREN', '_28': 'RS_PAREN', '_29': 'LC_BRACE', '_30': 'RC_BRACE', '_31': 'COMMA', '_32': 'COLON', '_33': 'FLOAT', '_34': 'FLOAT', '_35': 'INT', '_36': 'BOOLEAN', '_37': 'BOOLEAN', '_38': 'STRING', '_39': 'NONE', '_40': 'DOT', '_41': 'SUBROUTINE', '_42': 'END', '_43': 'END', '_44': 'END', '_45': 'END', '_46': 'END', '_47': 'END', '_48': 'END', '_49': 'END', '_50': 'MAGIC', '_51': 'MAGIC', '_52': 'MAGIC', '_53': 'MAGIC', '_54': 'MAGIC', '_55': 'MAGIC', '_56': 'IF', '_57': 'THEN', '_58': 'ELSE', '_59': 'WHILE', '_60': 'REPEAT', '_61': 'UNTIL', '_62': 'FOR', '_63': 'TO', '_64': 'IN', '_65': 'STEP', '_66': 'RECORD', '_67': 'CONSTANT', '_68': 'CACHED', '_69': 'TRY', '_70': 'CATCH', '_71': 'CLASS', '_72': 'IMPORT', '_73': 'AS', '_74': 'ID', '_75': 'ignore_comment'}
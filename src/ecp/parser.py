@@ -139,7 +139,7 @@ class EcpParser(GeneratedParser):
     def assignment_statement(self):
         pos = self.mark()
         """
-        target=variable (COLON ID)? ASSIGN value=expr { PyECP_Assign(target, value, self.loc) };
+        target=variable annotation=(COLON ID)? ASSIGN value=expr { PyECP_Assign(target, value, annotation, self.loc) };
         """
         parts = []
         for _ in range(1):
@@ -165,8 +165,9 @@ class EcpParser(GeneratedParser):
             parts.append(part)
             # match:
             target = parts[0]
+            annotation = parts[1]
             value = parts[3]
-            return PyECP_Assign(target, value, self.loc)
+            return PyECP_Assign(target, value, annotation, self.loc)
         self.goto(pos)
         
         return None
@@ -493,7 +494,7 @@ class EcpParser(GeneratedParser):
     def subscript_index(self):
         pos = self.mark()
         """
-        LS_PAREN i=expr RS_PAREN { "subscript", i };
+        LS_PAREN i=expr others=(COMMA expr)* RS_PAREN { "subscript", [i] + [e for _, e in others] };
         """
         parts = []
         for _ in range(1):
@@ -507,6 +508,11 @@ class EcpParser(GeneratedParser):
                 self.fail()
                 break
             parts.append(part)
+            part = self._loop_15()
+            if not self.match(part):
+                self.fail()
+                break
+            parts.append(part)
             part = self.expect('RS_PAREN')
             if not self.match(part):
                 self.fail()
@@ -514,11 +520,45 @@ class EcpParser(GeneratedParser):
             parts.append(part)
             # match:
             i = parts[1]
-            return "subscript", i
+            others = parts[2]
+            return "subscript", [i] + [e for _, e in others]
         self.goto(pos)
         
         return None
         
+    def _loop_15(self):
+        """
+        (COMMA expr)*
+        """
+        children = []
+        while True:
+            pos = self.mark()
+            part = self._expr_list_16()
+            if self.match(part): children.append(part)
+            else:
+                self.goto(pos)
+                break
+        return children
+    def _expr_list_16(self):
+        """
+        (COMMA expr)
+        """
+        pos = self.mark()
+        parts = []
+        for _ in range(1):
+            part = self.expect('COMMA')
+            if not self.match(part):
+                self.fail()
+                break
+            parts.append(part)
+            part = self.expr()
+            if not self.match(part):
+                self.fail()
+                break
+            parts.append(part)
+            return parts
+        self.goto(pos)
+        return None
     @memoize
     def call(self):
         pos = self.mark()
@@ -563,7 +603,7 @@ class EcpParser(GeneratedParser):
         """
         parts = []
         for _ in range(1):
-            part = self._loop_15()
+            part = self._loop_17()
             if not self.match(part):
                 self.fail()
                 break
@@ -575,27 +615,27 @@ class EcpParser(GeneratedParser):
         
         return None
         
-    def _loop_15(self):
+    def _loop_17(self):
         """
         (attr_index | subscript_index | call)*
         """
         children = []
         while True:
             pos = self.mark()
-            part = self._expr_list_16()
+            part = self._expr_list_18()
             if self.match(part): children.append(part)
             else:
                 self.goto(pos)
                 break
         return children
-    def _expr_list_16(self):
+    def _expr_list_18(self):
         """
         (attr_index | subscript_index | call)
         """
         pos = self.mark()
         parts = []
         for _ in range(1):
-            part = self._or_17()
+            part = self._or_19()
             if not self.match(part):
                 self.fail()
                 break
@@ -603,7 +643,7 @@ class EcpParser(GeneratedParser):
             return parts
         self.goto(pos)
         return None
-    def _or_17(self):
+    def _or_19(self):
         """
         attr_index | subscript_index | call
         """
@@ -653,7 +693,7 @@ class EcpParser(GeneratedParser):
         """
         parts = []
         for _ in range(1):
-            part = self._or_18()
+            part = self._or_20()
             if not self.match(part):
                 self.fail()
                 break
@@ -693,7 +733,7 @@ class EcpParser(GeneratedParser):
         """
         parts = []
         for _ in range(1):
-            part = self._or_19()
+            part = self._or_21()
             if not self.match(part):
                 self.fail()
                 break
@@ -708,7 +748,7 @@ class EcpParser(GeneratedParser):
         """
         parts = []
         for _ in range(1):
-            part = self._or_20()
+            part = self._or_22()
             if not self.match(part):
                 self.fail()
                 break
@@ -726,7 +766,7 @@ class EcpParser(GeneratedParser):
         
         return None
         
-    def _or_18(self):
+    def _or_20(self):
         """
         INT | FLOAT | BOOLEAN | STRING | NONE
         """
@@ -748,7 +788,7 @@ class EcpParser(GeneratedParser):
         self.goto(pos)
         self.fail()
         return None
-    def _or_19(self):
+    def _or_21(self):
         """
         array | dictionary | tuple | magic_function | variable
         """
@@ -770,7 +810,7 @@ class EcpParser(GeneratedParser):
         self.goto(pos)
         self.fail()
         return None
-    def _or_20(self):
+    def _or_22(self):
         """
         PLUS | SUB | NOT
         """
@@ -819,7 +859,7 @@ class EcpParser(GeneratedParser):
                 self.fail()
                 break
             parts.append(part)
-            part = self._loop_21()
+            part = self._loop_23()
             if not self.match(part):
                 self.fail()
                 break
@@ -847,14 +887,14 @@ class EcpParser(GeneratedParser):
         
         return None
         
-    def _loop_21(self):
+    def _loop_23(self):
         """
         (OR op_and)+
         """
         children = []
         while True:
             pos = self.mark()
-            part = self._expr_list_22()
+            part = self._expr_list_24()
             if self.match(part): children.append(part)
             else:
                 if len(children) == 0:
@@ -862,7 +902,7 @@ class EcpParser(GeneratedParser):
                 self.goto(pos)
                 break
         return children if len(children) > 0 else None
-    def _expr_list_22(self):
+    def _expr_list_24(self):
         """
         (OR op_and)
         """
@@ -895,7 +935,7 @@ class EcpParser(GeneratedParser):
                 self.fail()
                 break
             parts.append(part)
-            part = self._loop_23()
+            part = self._loop_25()
             if not self.match(part):
                 self.fail()
                 break
@@ -923,14 +963,14 @@ class EcpParser(GeneratedParser):
         
         return None
         
-    def _loop_23(self):
+    def _loop_25(self):
         """
         (AND inversion)+
         """
         children = []
         while True:
             pos = self.mark()
-            part = self._expr_list_24()
+            part = self._expr_list_26()
             if self.match(part): children.append(part)
             else:
                 if len(children) == 0:
@@ -938,7 +978,7 @@ class EcpParser(GeneratedParser):
                 self.goto(pos)
                 break
         return children if len(children) > 0 else None
-    def _expr_list_24(self):
+    def _expr_list_26(self):
         """
         (AND inversion)
         """
@@ -1003,7 +1043,7 @@ class EcpParser(GeneratedParser):
     def comparison(self):
         pos = self.mark()
         """
-        base=sum others=(LT | GT | LE | GE | EQ | NE sum)+ { PyECP_Comparison(base, others, self.loc) };
+        base=sum others=(LT | GT | LE | GE | EQ | NE | IN sum)+ { PyECP_Comparison(base, others, self.loc) };
         """
         parts = []
         for _ in range(1):
@@ -1012,7 +1052,7 @@ class EcpParser(GeneratedParser):
                 self.fail()
                 break
             parts.append(part)
-            part = self._loop_25()
+            part = self._loop_27()
             if not self.match(part):
                 self.fail()
                 break
@@ -1040,14 +1080,14 @@ class EcpParser(GeneratedParser):
         
         return None
         
-    def _loop_25(self):
+    def _loop_27(self):
         """
-        (LT | GT | LE | GE | EQ | NE sum)+
+        (LT | GT | LE | GE | EQ | NE | IN sum)+
         """
         children = []
         while True:
             pos = self.mark()
-            part = self._expr_list_26()
+            part = self._expr_list_28()
             if self.match(part): children.append(part)
             else:
                 if len(children) == 0:
@@ -1055,14 +1095,14 @@ class EcpParser(GeneratedParser):
                 self.goto(pos)
                 break
         return children if len(children) > 0 else None
-    def _expr_list_26(self):
+    def _expr_list_28(self):
         """
-        (LT | GT | LE | GE | EQ | NE sum)
+        (LT | GT | LE | GE | EQ | NE | IN sum)
         """
         pos = self.mark()
         parts = []
         for _ in range(1):
-            part = self._or_27()
+            part = self._or_29()
             if not self.match(part):
                 self.fail()
                 break
@@ -1075,9 +1115,9 @@ class EcpParser(GeneratedParser):
             return parts
         self.goto(pos)
         return None
-    def _or_27(self):
+    def _or_29(self):
         """
-        LT | GT | LE | GE | EQ | NE
+        LT | GT | LE | GE | EQ | NE | IN
         """
         pos = self.mark()
         part = self.expect('LT')
@@ -1098,6 +1138,9 @@ class EcpParser(GeneratedParser):
         part = self.expect('NE')
         if self.match(part): return part
         self.goto(pos)
+        part = self.expect('IN')
+        if self.match(part): return part
+        self.goto(pos)
         self.fail()
         return None
     @memoize_left_rec
@@ -1113,7 +1156,7 @@ class EcpParser(GeneratedParser):
                 self.fail()
                 break
             parts.append(part)
-            part = self._or_28()
+            part = self._or_30()
             if not self.match(part):
                 self.fail()
                 break
@@ -1147,7 +1190,7 @@ class EcpParser(GeneratedParser):
         
         return None
         
-    def _or_28(self):
+    def _or_30(self):
         """
         ADD | SUB
         """
@@ -1173,7 +1216,7 @@ class EcpParser(GeneratedParser):
                 self.fail()
                 break
             parts.append(part)
-            part = self._or_29()
+            part = self._or_31()
             if not self.match(part):
                 self.fail()
                 break
@@ -1207,7 +1250,7 @@ class EcpParser(GeneratedParser):
         
         return None
         
-    def _or_29(self):
+    def _or_31(self):
         """
         MUL | DIV | INT_DIV | MOD
         """
@@ -1234,7 +1277,7 @@ class EcpParser(GeneratedParser):
         """
         parts = []
         for _ in range(1):
-            part = self._or_30()
+            part = self._or_32()
             if not self.match(part):
                 self.fail()
                 break
@@ -1267,7 +1310,7 @@ class EcpParser(GeneratedParser):
         
         return None
         
-    def _or_30(self):
+    def _or_32(self):
         """
         ADD | SUB
         """
@@ -1357,7 +1400,7 @@ class EcpParser(GeneratedParser):
     def param_definition(self):
         pos = self.mark()
         """
-        name=ID (COLON ID)? { arg(arg=name.value, annotation=None, **self.loc) };
+        name=ID annotation=(COLON ID)? { PyECP_Param(name, annotation, self.loc) };
         """
         parts = []
         for _ in range(1):
@@ -1366,28 +1409,29 @@ class EcpParser(GeneratedParser):
                 self.fail()
                 break
             parts.append(part)
-            part = self._maybe_31()
+            part = self._maybe_33()
             if not self.match(part):
                 self.fail()
                 break
             parts.append(part)
             # match:
             name = parts[0]
-            return arg(arg=name.value, annotation=None, **self.loc)
+            annotation = parts[1]
+            return PyECP_Param(name, annotation, self.loc)
         self.goto(pos)
         
         return None
         
-    def _maybe_31(self):
+    def _maybe_33(self):
         """
         (COLON ID)?
         """
         pos = self.mark()
-        part = self._expr_list_32()
+        part = self._expr_list_34()
         if self.match(part): return part
         self.goto(pos)
         return Filler()
-    def _expr_list_32(self):
+    def _expr_list_34(self):
         """
         (COLON ID)
         """
@@ -1411,10 +1455,15 @@ class EcpParser(GeneratedParser):
     def suboroutine_definition(self):
         pos = self.mark()
         """
-        SUBROUTINE name=ID LPAREN params=(param_definition (COMMA param_definition)* COMMA?)? RPAREN block=compound END { PyECP_SubroutineDef(name, params, block, self.loc) };
+        cached=(CACHED call?)? SUBROUTINE name=ID LPAREN params=(param_definition (COMMA param_definition)* COMMA?)? RPAREN block=compound END { PyECP_SubroutineDef(name, params, cached, block, self.loc) };
         """
         parts = []
         for _ in range(1):
+            part = self._maybe_35()
+            if not self.match(part):
+                self.fail()
+                break
+            parts.append(part)
             part = self.expect('SUBROUTINE')
             if not self.match(part):
                 self.fail()
@@ -1430,7 +1479,7 @@ class EcpParser(GeneratedParser):
                 self.fail()
                 break
             parts.append(part)
-            part = self._maybe_33()
+            part = self._maybe_36()
             if not self.match(part):
                 self.fail()
                 break
@@ -1451,24 +1500,63 @@ class EcpParser(GeneratedParser):
                 break
             parts.append(part)
             # match:
-            name = parts[1]
-            params = parts[3]
-            block = parts[5]
-            return PyECP_SubroutineDef(name, params, block, self.loc)
+            cached = parts[0]
+            name = parts[2]
+            params = parts[4]
+            block = parts[6]
+            return PyECP_SubroutineDef(name, params, cached, block, self.loc)
         self.goto(pos)
         
         return None
         
-    def _maybe_33(self):
+    def _maybe_35(self):
+        """
+        (CACHED call?)?
+        """
+        pos = self.mark()
+        part = self._expr_list_37()
+        if self.match(part): return part
+        self.goto(pos)
+        return Filler()
+    def _expr_list_37(self):
+        """
+        (CACHED call?)
+        """
+        pos = self.mark()
+        parts = []
+        for _ in range(1):
+            part = self.expect('CACHED')
+            if not self.match(part):
+                self.fail()
+                break
+            parts.append(part)
+            part = self._maybe_38()
+            if not self.match(part):
+                self.fail()
+                break
+            parts.append(part)
+            return parts
+        self.goto(pos)
+        return None
+    def _maybe_38(self):
+        """
+        call?
+        """
+        pos = self.mark()
+        part = self.call()
+        if self.match(part): return part
+        self.goto(pos)
+        return Filler()
+    def _maybe_36(self):
         """
         (param_definition (COMMA param_definition)* COMMA?)?
         """
         pos = self.mark()
-        part = self._expr_list_34()
+        part = self._expr_list_39()
         if self.match(part): return part
         self.goto(pos)
         return Filler()
-    def _expr_list_34(self):
+    def _expr_list_39(self):
         """
         (param_definition (COMMA param_definition)* COMMA?)
         """
@@ -1480,12 +1568,12 @@ class EcpParser(GeneratedParser):
                 self.fail()
                 break
             parts.append(part)
-            part = self._loop_35()
+            part = self._loop_40()
             if not self.match(part):
                 self.fail()
                 break
             parts.append(part)
-            part = self._maybe_36()
+            part = self._maybe_41()
             if not self.match(part):
                 self.fail()
                 break
@@ -1493,20 +1581,20 @@ class EcpParser(GeneratedParser):
             return parts
         self.goto(pos)
         return None
-    def _loop_35(self):
+    def _loop_40(self):
         """
         (COMMA param_definition)*
         """
         children = []
         while True:
             pos = self.mark()
-            part = self._expr_list_37()
+            part = self._expr_list_42()
             if self.match(part): children.append(part)
             else:
                 self.goto(pos)
                 break
         return children
-    def _expr_list_37(self):
+    def _expr_list_42(self):
         """
         (COMMA param_definition)
         """
@@ -1526,7 +1614,7 @@ class EcpParser(GeneratedParser):
             return parts
         self.goto(pos)
         return None
-    def _maybe_36(self):
+    def _maybe_41(self):
         """
         COMMA?
         """
@@ -1588,7 +1676,7 @@ class EcpParser(GeneratedParser):
                 self.fail()
                 break
             parts.append(part)
-            part = self._maybe_38()
+            part = self._maybe_43()
             if not self.match(part):
                 self.fail()
                 break
@@ -1602,23 +1690,23 @@ class EcpParser(GeneratedParser):
         
         return None
         
-    def _maybe_38(self):
+    def _maybe_43(self):
         """
         (elseif_statement | else_statement)?
         """
         pos = self.mark()
-        part = self._expr_list_39()
+        part = self._expr_list_44()
         if self.match(part): return part
         self.goto(pos)
         return Filler()
-    def _expr_list_39(self):
+    def _expr_list_44(self):
         """
         (elseif_statement | else_statement)
         """
         pos = self.mark()
         parts = []
         for _ in range(1):
-            part = self._or_40()
+            part = self._or_45()
             if not self.match(part):
                 self.fail()
                 break
@@ -1626,7 +1714,7 @@ class EcpParser(GeneratedParser):
             return parts
         self.goto(pos)
         return None
-    def _or_40(self):
+    def _or_45(self):
         """
         elseif_statement | else_statement
         """
@@ -1834,7 +1922,7 @@ class EcpParser(GeneratedParser):
                 self.fail()
                 break
             parts.append(part)
-            part = self._maybe_41()
+            part = self._maybe_46()
             if not self.match(part):
                 self.fail()
                 break
@@ -1851,16 +1939,16 @@ class EcpParser(GeneratedParser):
         
         return None
         
-    def _maybe_41(self):
+    def _maybe_46(self):
         """
         (expr COLON expr (COMMA expr COLON expr)* COMMA?)?
         """
         pos = self.mark()
-        part = self._expr_list_42()
+        part = self._expr_list_47()
         if self.match(part): return part
         self.goto(pos)
         return Filler()
-    def _expr_list_42(self):
+    def _expr_list_47(self):
         """
         (expr COLON expr (COMMA expr COLON expr)* COMMA?)
         """
@@ -1882,12 +1970,12 @@ class EcpParser(GeneratedParser):
                 self.fail()
                 break
             parts.append(part)
-            part = self._loop_43()
+            part = self._loop_48()
             if not self.match(part):
                 self.fail()
                 break
             parts.append(part)
-            part = self._maybe_44()
+            part = self._maybe_49()
             if not self.match(part):
                 self.fail()
                 break
@@ -1895,20 +1983,20 @@ class EcpParser(GeneratedParser):
             return parts
         self.goto(pos)
         return None
-    def _loop_43(self):
+    def _loop_48(self):
         """
         (COMMA expr COLON expr)*
         """
         children = []
         while True:
             pos = self.mark()
-            part = self._expr_list_45()
+            part = self._expr_list_50()
             if self.match(part): children.append(part)
             else:
                 self.goto(pos)
                 break
         return children
-    def _expr_list_45(self):
+    def _expr_list_50(self):
         """
         (COMMA expr COLON expr)
         """
@@ -1938,7 +2026,7 @@ class EcpParser(GeneratedParser):
             return parts
         self.goto(pos)
         return None
-    def _maybe_44(self):
+    def _maybe_49(self):
         """
         COMMA?
         """
@@ -1985,7 +2073,7 @@ class EcpParser(GeneratedParser):
                 self.fail()
                 break
             parts.append(part)
-            part = self._maybe_46()
+            part = self._maybe_51()
             if not self.match(part):
                 self.fail()
                 break
@@ -2053,16 +2141,16 @@ class EcpParser(GeneratedParser):
         
         return None
         
-    def _maybe_46(self):
+    def _maybe_51(self):
         """
         (STEP expr)?
         """
         pos = self.mark()
-        part = self._expr_list_47()
+        part = self._expr_list_52()
         if self.match(part): return part
         self.goto(pos)
         return Filler()
-    def _expr_list_47(self):
+    def _expr_list_52(self):
         """
         (STEP expr)
         """
@@ -2086,10 +2174,15 @@ class EcpParser(GeneratedParser):
     def record_definition(self):
         pos = self.mark()
         """
-        RECORD name=ID values=(variable (COLON ID)?)* END { PyECP_Record(name, values, self.loc) };
+        constant=CONSTANT? RECORD name=ID values=(variable (COLON ID)?)* END { PyECP_Record(name, values, constant, self.loc) };
         """
         parts = []
         for _ in range(1):
+            part = self._maybe_53()
+            if not self.match(part):
+                self.fail()
+                break
+            parts.append(part)
             part = self.expect('RECORD')
             if not self.match(part):
                 self.fail()
@@ -2100,7 +2193,7 @@ class EcpParser(GeneratedParser):
                 self.fail()
                 break
             parts.append(part)
-            part = self._loop_48()
+            part = self._loop_54()
             if not self.match(part):
                 self.fail()
                 break
@@ -2111,27 +2204,37 @@ class EcpParser(GeneratedParser):
                 break
             parts.append(part)
             # match:
-            name = parts[1]
-            values = parts[2]
-            return PyECP_Record(name, values, self.loc)
+            constant = parts[0]
+            name = parts[2]
+            values = parts[3]
+            return PyECP_Record(name, values, constant, self.loc)
         self.goto(pos)
         
         return None
         
-    def _loop_48(self):
+    def _maybe_53(self):
+        """
+        CONSTANT?
+        """
+        pos = self.mark()
+        part = self.expect('CONSTANT')
+        if self.match(part): return part
+        self.goto(pos)
+        return Filler()
+    def _loop_54(self):
         """
         (variable (COLON ID)?)*
         """
         children = []
         while True:
             pos = self.mark()
-            part = self._expr_list_49()
+            part = self._expr_list_55()
             if self.match(part): children.append(part)
             else:
                 self.goto(pos)
                 break
         return children
-    def _expr_list_49(self):
+    def _expr_list_55(self):
         """
         (variable (COLON ID)?)
         """
@@ -2143,7 +2246,7 @@ class EcpParser(GeneratedParser):
                 self.fail()
                 break
             parts.append(part)
-            part = self._maybe_50()
+            part = self._maybe_56()
             if not self.match(part):
                 self.fail()
                 break
@@ -2151,16 +2254,16 @@ class EcpParser(GeneratedParser):
             return parts
         self.goto(pos)
         return None
-    def _maybe_50(self):
+    def _maybe_56(self):
         """
         (COLON ID)?
         """
         pos = self.mark()
-        part = self._expr_list_51()
+        part = self._expr_list_57()
         if self.match(part): return part
         self.goto(pos)
         return Filler()
-    def _expr_list_51(self):
+    def _expr_list_57(self):
         """
         (COLON ID)
         """
@@ -2275,7 +2378,7 @@ class EcpParser(GeneratedParser):
                 self.fail()
                 break
             parts.append(part)
-            part = self._maybe_52()
+            part = self._maybe_58()
             if not self.match(part):
                 self.fail()
                 break
@@ -2288,16 +2391,16 @@ class EcpParser(GeneratedParser):
         
         return None
         
-    def _maybe_52(self):
+    def _maybe_58(self):
         """
         (AS expr)?
         """
         pos = self.mark()
-        part = self._expr_list_53()
+        part = self._expr_list_59()
         if self.match(part): return part
         self.goto(pos)
         return Filler()
-    def _expr_list_53(self):
+    def _expr_list_59(self):
         """
         (AS expr)
         """
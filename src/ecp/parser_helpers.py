@@ -25,6 +25,7 @@ TOKEN_TO_OP = {
     "NE":      NotEq,
     "GT":      Gt,
     "GE":      GtE,
+    "IN":      In,
     "AND":     And,
     "OR":      Or,
     "NOT":     Not,
@@ -84,7 +85,9 @@ def PyECP_ProcessIndexing(rv, indexes, l):
         if t == "attr":
             rv = Attribute(value=rv, attr=v, ctx=Load(), **l)
         elif t == "subscript":
-            rv = Subscript(value=rv, slice=Index(value=v), ctx=Load(), **l)
+            # grid[i, j] is grid[i][j]
+            for i in v:
+                rv = Subscript(value=rv, slice=Index(value=i), ctx=Load(), **l)
         elif t == "call":
             args, kwargs = v
             rv = Call(func=rv, args=args, keywords=kwargs, **l)
@@ -93,11 +96,24 @@ def PyECP_ProcessIndexing(rv, indexes, l):
 def PyECP_Variable(name: Token, indexes, l):
     return PyECP_ProcessIndexing(Name(id=name.value, ctx=Load(), **l), indexes, l)
 
-def PyECP_Assign(target, value, l):
+def PyECP_Annotation(annotation, l):
+    # annotation: (COLON ID)?
+    # type names are kept as strings so that they are never evaluated
+    if isinstance(annotation, Filler):
+        return None
+    return Constant(value=annotation[1].value, **l)
+
+def PyECP_Assign(target, value, annotation, l):
     # TODO: allow unpacking like a,b = 1,2 (need tuple without bracket support)
     target.ctx = Store()
+    annotation = PyECP_Annotation(annotation, l)
+    if annotation is not None:
+        return AnnAssign(target=target, annotation=annotation, value=value, simple=int(isinstance(target, Name)), **l)
     return Assign(targets=[target], value=value, **l)
 
+def PyECP_Param(name: Token, annotation, l):
+    return arg(arg=name.value, annotation=PyECP_Annotation(annotation, l), **l)
+
 def PyECP_Parameters(p):
     # p: (expr (COMMA expr)* COMMA?)?
     params = []
@@ -131,10 +147,7 @@ def PyECP_Magic(name: str, parameters, l):
         return Continue()
     elif name == "BREAK":
         return Break()
-    elif name == "OUTPUT":
-        name = "print"
-    elif name == "USERINPUT":
-        name = "input"
+    # OUTPUT, USERINPUT and USERINPUT_INT call the functions of the same name from the runtime
 
     return Call(func=Name(id=name, ctx=Load()), args=parameters, keywords=[], **l)
 
@@ -163,19 +176,25 @@ def PyECP_IfStatement(condition, block, other, l):
         other = other[0]
     return If(test=condition, body=block, orelse=other, **l)
 
-def PyECP_SubroutineDef(name: Token, params, block, l):
+def PyECP_SubroutineDef(name: Token, params, cached, block, l):
     # params: (param_definition (COMMA param_definition)* COMMA?)?
+    # cached: (CACHED call?)?
     # TODO: keyword arguments
     parameters = []
     if not isinstance(params, Filler):
         parameters.append(params[0])
         for _, param in params[1]:
             parameters.append(param)
+    decorators = []
+    if not isinstance(cached, Filler):
+        # CACHED(maxsize, eviction) SUBROUTINE: memoized by EcpCached
+        args, kw_args = ([], []) if isinstance(cached[1], Filler) else cached[1][1]
+        decorators.append(Call(func=Name(id="EcpCached", ctx=Load(), **l), args=args, keywords=kw_args, **l))
     return FunctionDef(
         name=name.value, 
         args=arguments(args=parameters, posonlyargs=[], kwonlyargs=[], kw_defaults=[], defaults=[], kwarg=None, vararg=None), 
         body=block, 
-        decorator_list=[], 
+        decorator_list=decorators, 
         returns=None, 
         type_comment=None, 
         **l
@@ -227,14 +246,37 @@ def PyECP_ForIn(variable, iterator, block, l):
         **l
     )
 
-def PyECP_Record(name: Token, values, l):
+def PyECP_Record(name: Token, values, constant, l):
     # values: (variable (COLON ID)?)*
     parameters = [v.id for v, *_ in values]
+    types = {v.id: PyECP_Annotation(t, l) for v, t in values if not isinstance(t, Filler)}
+    if not isinstance(constant, Filler):
+        # CONSTANT RECORD: immutable and backed by a tuple
+        return Assign(
+            targets=[Name(id=name.value, ctx=Store(), **l)],
+            value=Call(
+                func=Name(id='EcpTupleRecord', ctx=Load(), **l),
+                args=[
+                    Constant(value=name.value, **l),
+                    ast.Tuple(elts=[Constant(value=p, **l) for p in parameters], ctx=Load(), **l),
+                    ast.Dict(keys=[Constant(value=p, **l) for p in types], values=list(types.values()), **l)
+                ],
+                keywords=[],
+                **l
+            ),
+            **l
+        )
     return ClassDef(
         name=name.value,
-        bases=[],
+        bases=[Name(id='EcpRecord', ctx=Load(), **l)],
         keywords=[],
         body=[
+            Assign(
+                targets=[Name(id='__slots__', ctx=Store(), **l)],
+                value=ast.Tuple(elts=[Constant(value=p, **l) for p in parameters], ctx=Load(), **l),
+                **l
+            ),
+            *[AnnAssign(target=Name(id=p, ctx=Store(), **l), annotation=t, value=None, simple=1, **l) for p, t in types.items()],
             FunctionDef(
                 name="__init__", 
                 args=arguments(args=[arg(arg='self', annotation=None)]+[arg(arg=p, annotation=None) for p in parameters], posonlyargs=[], kwonlyargs=[], kw_defaults=[], defaults=[], kwarg=None, vararg=None), 
@@ -255,7 +297,7 @@ def PyECP_Record(name: Token, values, l):
                             ctx=Load()
                         )
                     ) for p in parameters
-                ], 
+                ] or [Pass()], 
                 decorator_list=[], 
                 returns=None, 
                 type_comment=None, 
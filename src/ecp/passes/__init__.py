@@ -0,0 +1,70 @@
+"""Optimization passes over the python AST generated from ECP code.
+
+A pass is a function ``(tree: Module, optimizer: Optimizer) -> Module``. PASSES
+lists every pass in the order they run; DEFAULT_PASSES are the ones enabled by
+``ecp(..., optimize=True)`` and ``python -m ecp -O``; the others change
+behaviour for some programs and have to be selected by name.
+
+An Optimizer can be given the Profile of a run of the program (see
+ecp.profiler). Passes use it to decide where a transformation pays off: only
+SUBROUTINEs which were called often are inlined, parameters which always had
+the same type get a specialized body, and loops which rarely iterate are left
+alone. Without a profile they fall back to static rules.
+"""
+from ast import Module
+from typing import *
+from .idioms import recognise_idioms
+from .inline import inline_calls
+from .licm import hoist_invariants
+from .memoize import auto_cache
+from .slots import infer_slots
+from .strings import build_strings
+from .tailcall import eliminate_tail_calls
+from .types import check_types, specialize_parameters, specialize_types
+
+PASSES = {
+    "slots": infer_slots,
+    "typecheck": check_types,
+    "types": specialize_types,
+    "specialize": specialize_parameters,
+    "tailcall": eliminate_tail_calls,
+    "inline": inline_calls,
+    "memoize": auto_cache,
+    "idioms": recognise_idioms,
+    "strings": build_strings,
+    "licm": hoist_invariants,
+}
+
+DEFAULT_PASSES = ["slots", "specialize", "tailcall", "inline", "idioms", "strings", "licm"]
+
+
+class Optimizer:
+    """Runs the selected passes over a module and records what they changed.
+
+    ``options`` are made available to the passes, e.g. size limits. ``profile``
+    is a Profile recorded by running the unoptimized program.
+    """
+    def __init__(self, passes: Iterable[str] = None, profile=None, **options):
+        passes = DEFAULT_PASSES if passes is None else list(passes)
+        for name in passes:
+            if name not in PASSES:
+                raise ValueError(f"unknown optimization pass {name!r}, expected one of: {', '.join(PASSES)}")
+        self.passes = [name for name in PASSES if name in passes]
+        self.options = options
+        self.profile = profile
+        self.report: List[Tuple[str, int, str]] = []
+
+    def run(self, tree: Module) -> Module:
+        if self.profile is not None:
+            from ..profiler import label_nodes
+            label_nodes(tree)
+        for name in self.passes:
+            tree = PASSES[name](tree, self)
+        return tree
+
+    def note(self, name: str, node, message: str):
+        """Record a transformation made (or skipped) by the pass ``name`` at ``node``"""
+        self.report.append((name, getattr(node, "lineno", 0), message))
+
+    def format_report(self) -> str:
+        return "\n".join(f"[{name}] line {lineno}: {message}" for name, lineno, message in self.report)
@@ -0,0 +1,167 @@
+"""Program analysis shared by the optimization passes."""
+import ast
+from ast import *
+from typing import *
+from collections import Counter
+
+# builtins which can read or change variables and attributes by name
+DYNAMIC_FUNCTIONS = {"setattr", "delattr", "vars", "exec", "eval", "compile", "__import__"}
+
+
+def py_snippets(tree: AST) -> Iterator[AST]:
+    """Yield the parsed code of every PY("...") call with a string literal argument"""
+    for node in ast.walk(tree):
+        if is_call_to(node, "PY") and len(node.args) == 1 and isinstance(node.args[0], Constant) and isinstance(node.args[0].value, str):
+            try:
+                yield ast.parse(node.args[0].value)
+            except SyntaxError:
+                pass
+
+
+def walk_all(tree: AST) -> Iterator[AST]:
+    """Walk ``tree`` and the python code of its literal PY() calls"""
+    yield from ast.walk(tree)
+    for snippet in py_snippets(tree):
+        yield from ast.walk(snippet)
+
+
+def dynamic_features(tree: AST) -> Optional[str]:
+    """Return why ``tree`` can not be analysed statically, or None if it can
+
+    Code is dynamic if it runs python code which is not known at compile time or
+    accesses variables and attributes by name.
+    """
+    for node in walk_all(tree):
+        if is_call_to(node, "PY"):
+            if not (len(node.args) == 1 and isinstance(node.args[0], Constant) and isinstance(node.args[0].value, str)):
+                return f"line {node.lineno} calls PY with code built at run time"
+        elif isinstance(node, Call) and isinstance(node.func, Name) and node.func.id in DYNAMIC_FUNCTIONS:
+            return f"line {getattr(node, 'lineno', 0)} calls {node.func.id}"
+        elif isinstance(node, Attribute) and node.attr == "__dict__":
+            return f"line {getattr(node, 'lineno', 0)} uses __dict__"
+    return None
+
+
+def is_call_to(node: AST, name: str) -> bool:
+    return isinstance(node, Call) and isinstance(node.func, Name) and node.func.id == name
+
+
+def assigned_names(tree: AST) -> Set[str]:
+    """Return every name which is bound anywhere in ``tree`` or its literal PY() code"""
+    names = set()
+    for node in walk_all(tree):
+        if isinstance(node, Name) and isinstance(node.ctx, (Store, Del)):
+            names.add(node.id)
+        elif isinstance(node, (FunctionDef, ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, arg):
+            names.add(node.arg)
+        elif isinstance(node, alias):
+            names.add((node.asname or node.name).split(".")[0])
+    return names
+
+
+def binding_counts(tree: AST) -> Counter:
+    """Count how many times each name is bound in ``tree`` or its literal PY() code"""
+    counts = Counter()
+    for node in walk_all(tree):
+        if isinstance(node, Name) and isinstance(node.ctx, (Store, Del)):
+            counts[node.id] += 1
+        elif isinstance(node, (FunctionDef, AsyncFunctionDef, ClassDef)):
+            counts[node.name] += 1
+        elif isinstance(node, arg):
+            counts[node.arg] += 1
+        elif isinstance(node, alias):
+            counts[(node.asname or node.name).split(".")[0]] += 1
+        elif isinstance(node, (Global, Nonlocal)):
+            for name in node.names:
+                counts[name] += 1
+    return counts
+
+
+# builtins whose result only depends on their arguments and which do not change
+# them. Constructors of mutable values (Array, Dictionary...) are not included:
+# a cached result could be changed by its caller.
+PURE_BUILTINS = {
+    "LEN", "Integer", "Int", "Real", "Bool", "String", "POSITION", "SUBSTRING", "SUBSTRING_VIEW",
+    "STRING_TO_INT", "STRING_TO_REAL", "INT_TO_STRING", "REAL_TO_STRING",
+    "CHAR_TO_CODE", "CODE_TO_CHAR", "SQRT", "ISQRT", "GCD", "MODPOW",
+    "MIN", "MAX", "SUM", "BINARY_SEARCH",
+    "len", "int", "float", "str", "bool", "abs", "min", "max", "round", "sum", "range",
+    "tuple", "isinstance", "type", "TypeError", "ValueError",
+}
+
+# builtins which do not change any value of the program (but are not pure)
+EFFECT_FREE_BUILTINS = PURE_BUILTINS | {"print", "input", "OUTPUT", "USERINPUT", "USERINPUT_INT", "READ_INTS", "READ_FIELD", "INPUT", "RANDOM_INT"}
+
+MUTABLE_DISPLAYS = (ast.List, ast.Dict, ast.Set, ListComp, DictComp, SetComp)
+
+
+def _local_names(func: FunctionDef) -> Set[str]:
+    names = {a.arg for a in func.args.posonlyargs + func.args.args + func.args.kwonlyargs}
+    for node in walk(func):
+        if isinstance(node, Name) and isinstance(node.ctx, Store):
+            names.add(node.id)
+    return names
+
+
+def _impurity(func: FunctionDef, pure: Set[str], trusted: Set[str]) -> Optional[str]:
+    """Return why ``func`` is not pure assuming the SUBROUTINEs in ``pure`` are, or None"""
+    local = _local_names(func)
+    for node in walk(func):
+        if node is not func and isinstance(node, (FunctionDef, AsyncFunctionDef, Lambda, ClassDef)):
+            return "defines a nested SUBROUTINE or CLASS"
+        if isinstance(node, (Yield, YieldFrom, Await, Global, Nonlocal)):
+            return f"uses {type(node).__name__.lower()}"
+        if isinstance(node, MUTABLE_DISPLAYS):
+            return f"line {node.lineno} creates a mutable value"
+        if isinstance(node, (Attribute, Subscript)) and isinstance(node.ctx, (Store, Del)):
+            return f"line {node.lineno} changes an {'attribute' if isinstance(node, Attribute) else 'item'}"
+        if isinstance(node, Attribute):
+            return f"line {node.lineno} reads attribute {node.attr}"
+        if isinstance(node, Call) and not isinstance(node.func, Name):
+            return f"line {node.lineno} calls a method"
+        if isinstance(node, Name) and isinstance(node.ctx, Load) and node.id not in local:
+            if node.id not in pure and node.id not in trusted:
+                return f"line {node.lineno} uses {node.id}"
+        if isinstance(node, Call) and isinstance(node.func, Name) and node.func.id in local:
+            return f"line {node.lineno} calls {node.func.id}"
+    return dynamic_features(func) and "is dynamic"
+
+
+def pure_functions(tree: Module) -> Tuple[Set[str], Dict[str, str]]:
+    """Find the top level SUBROUTINEs which only read their parameters and call
+    pure builtins and other pure SUBROUTINEs.
+
+    Returns the names of the pure SUBROUTINEs and, for the others, why they are not.
+    """
+    counts = binding_counts(tree)
+    trusted = {name for name in PURE_BUILTINS if counts[name] == 0}
+    candidates = {}
+    reasons = {}
+    for node in tree.body:
+        if not isinstance(node, FunctionDef):
+            continue
+        if node.decorator_list:
+            reasons[node.name] = "is decorated"
+        elif counts[node.name] != 1:
+            reasons[node.name] = "is rebound"
+        else:
+            candidates[node.name] = node
+    # start by assuming every candidate is pure and remove the ones which are not
+    # until nothing changes, so that (mutually) recursive SUBROUTINEs can be pure
+    pure = set(candidates)
+    changed = True
+    while changed:
+        changed = False
+        for name in sorted(pure):
+            reason = _impurity(candidates[name], pure, trusted)
+            if reason:
+                pure.discard(name)
+                reasons[name] = reason
+                changed = True
+    return pure, reasons
+
+
+def called_names(func: FunctionDef) -> Set[str]:
+    return {node.func.id for node in walk(func) if isinstance(node, Call) and isinstance(node.func, Name)}
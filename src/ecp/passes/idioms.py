@@ -0,0 +1,198 @@
+"""Replace common FOR loop idioms of SUBROUTINEs with builtin functions.
+
+* building an array: ``a := []`` followed by a loop which only does
+  ``a.append(e)`` (possibly inside an IF) becomes a list comprehension,
+  ``list(...)`` when ``e`` is the loop variable, or ``[c] * len(range(...))``
+  when ``e`` is a constant and the loop counts
+* summing: a loop which only does ``total := total + e`` (possibly inside an
+  IF) becomes ``total = sum((e for ...), total)`` when every value is proven
+  to be an Integer, since floats could be rounded differently
+* searching: a loop which only does ``IF c THEN x := e BREAK ENDIF`` becomes
+  ``x = next((e for ... if c), x)``, or ``x = any(True for ... if c)`` when
+  ``x`` was just set to False and ``e`` is True
+
+The loop variable must not be read after the loop (the builtins do not assign
+it) and the loop must not be inside a TRY block, where an error in the middle
+of the loop could be caught and the partly built result used.
+"""
+from ast import *
+from typing import *
+import ast
+from .analysis import assigned_names, dynamic_features
+from .types import _infer, local_types
+
+NAME = "idioms"
+
+IMMUTABLE_CONSTANTS = (int, float, str, bool, type(None))
+
+
+def _reads(node: AST, name: str) -> bool:
+    return any(isinstance(n, Name) and n.id == name for n in walk(node))
+
+
+def _loop_variable_dead(func: FunctionDef, name: str) -> bool:
+    """Is ``name`` only read inside FOR loops which assign it?"""
+    protected = set()
+    for node in walk(func):
+        if isinstance(node, For) and isinstance(node.target, Name) and node.target.id == name:
+            for statement in node.body + node.orelse:
+                protected.update(id(n) for n in walk(statement))
+    return all(
+        id(node) in protected
+        for node in walk(func)
+        if isinstance(node, Name) and node.id == name and isinstance(node.ctx, Load)
+    )
+
+
+def _generator(element: expr, loop: For, condition: Optional[expr]) -> GeneratorExp:
+    return GeneratorExp(elt=element, generators=[
+        comprehension(target=Name(id=loop.target.id, ctx=Store()), iter=loop.iter, ifs=[condition] if condition else [], is_async=0)
+    ])
+
+
+def _filtered(loop: For) -> Tuple[Optional[expr], List[stmt]]:
+    """Split the body of ``loop`` into an optional IF condition and the statements it guards"""
+    if len(loop.body) == 1 and isinstance(loop.body[0], If) and not loop.body[0].orelse:
+        return loop.body[0].test, loop.body[0].body
+    return None, loop.body
+
+
+class _Rewriter:
+    def __init__(self, func: FunctionDef, rebound: Set[str], optimizer):
+        self.func = func
+        self.rebound = rebound
+        self.optimizer = optimizer
+        self.types = local_types(func, rebound, trust_annotations=False)
+
+    def _builtin(self, name: str) -> bool:
+        return name not in self.rebound
+
+    def _append(self, loop: For, previous: Optional[stmt]) -> Optional[stmt]:
+        if not (isinstance(previous, Assign) and len(previous.targets) == 1 and isinstance(previous.targets[0], Name)
+                and isinstance(previous.value, ast.List) and not previous.value.elts):
+            return None
+        array = previous.targets[0].id
+        condition, body = _filtered(loop)
+        if not (len(body) == 1 and isinstance(body[0], Expr) and isinstance(body[0].value, Call)):
+            return None
+        call = body[0].value
+        if not (isinstance(call.func, Attribute) and call.func.attr == "append" and isinstance(call.func.value, Name)
+                and call.func.value.id == array and len(call.args) == 1 and not call.keywords and not isinstance(call.args[0], Starred)):
+            return None
+        element = call.args[0]
+        if _reads(element, array) or _reads(loop.iter, array) or (condition is not None and _reads(condition, array)):
+            return None
+        if condition is None and isinstance(element, Constant) and isinstance(element.value, IMMUTABLE_CONSTANTS) \
+                and isinstance(loop.iter, Call) and isinstance(loop.iter.func, Name) and loop.iter.func.id == "range" \
+                and self._builtin("range") and self._builtin("len"):
+            value = BinOp(
+                left=ast.List(elts=[element], ctx=Load()),
+                op=Mult(),
+                right=Call(func=Name(id="len", ctx=Load()), args=[loop.iter], keywords=[])
+            )
+            self.optimizer.note(NAME, loop, f"{self.func.name}: array {array} built by list multiplication")
+        elif condition is None and isinstance(element, Name) and element.id == loop.target.id and self._builtin("list"):
+            value = Call(func=Name(id="list", ctx=Load()), args=[loop.iter], keywords=[])
+            self.optimizer.note(NAME, loop, f"{self.func.name}: array {array} built by list()")
+        else:
+            generator = _generator(element, loop, condition)
+            value = ListComp(elt=generator.elt, generators=generator.generators)
+            self.optimizer.note(NAME, loop, f"{self.func.name}: array {array} built by a list comprehension")
+        return Assign(targets=[Name(id=array, ctx=Store())], value=value)
+
+    def _sum(self, loop: For, defined: Set[str]) -> Optional[stmt]:
+        condition, body = _filtered(loop)
+        if not (len(body) == 1 and isinstance(body[0], Assign) and len(body[0].targets) == 1 and isinstance(body[0].targets[0], Name)):
+            return None
+        total = body[0].targets[0].id
+        value = body[0].value
+        if not (isinstance(value, BinOp) and isinstance(value.op, Add) and isinstance(value.left, Name) and value.left.id == total):
+            return None
+        element = value.right
+        if _reads(element, total) or _reads(loop.iter, total) or (condition is not None and _reads(condition, total)):
+            return None
+        if total not in defined or not self._builtin("sum") or self.types.get(total) is not int:
+            return None
+        env = dict(self.types)
+        if isinstance(loop.iter, Call) and isinstance(loop.iter.func, Name) and loop.iter.func.id == "range" and self._builtin("range"):
+            env[loop.target.id] = int
+        if _infer(element, env, self.rebound) is not int:
+            return None
+        self.optimizer.note(NAME, loop, f"{self.func.name}: {total} accumulated with sum()")
+        if condition is None and isinstance(element, Name) and element.id == loop.target.id:
+            values = loop.iter
+        else:
+            values = _generator(element, loop, condition)
+        return Assign(
+            targets=[Name(id=total, ctx=Store())],
+            value=Call(func=Name(id="sum", ctx=Load()), args=[values, Name(id=total, ctx=Load())], keywords=[])
+        )
+
+    def _search(self, loop: For, previous: Optional[stmt], defined: Set[str]) -> Optional[stmt]:
+        condition, body = _filtered(loop)
+        if condition is None or not (len(body) == 2 and isinstance(body[1], Break) and isinstance(body[0], Assign)
+                                     and len(body[0].targets) == 1 and isinstance(body[0].targets[0], Name)):
+            return None
+        result = body[0].targets[0].id
+        element = body[0].value
+        if result == loop.target.id or _reads(element, result) or _reads(condition, result) or _reads(loop.iter, result):
+            return None
+        if isinstance(element, Constant) and element.value is True and self._builtin("any") \
+                and isinstance(previous, Assign) and len(previous.targets) == 1 and isinstance(previous.targets[0], Name) \
+                and previous.targets[0].id == result and isinstance(previous.value, Constant) and previous.value.value is False:
+            self.optimizer.note(NAME, loop, f"{self.func.name}: search for {result} with any()")
+            return Assign(
+                targets=[Name(id=result, ctx=Store())],
+                # filtering in the generator only resumes it once, instead of for every value
+                value=Call(func=Name(id="any", ctx=Load()), args=[_generator(Constant(value=True), loop, condition)], keywords=[])
+            )
+        if result not in defined or not self._builtin("next"):
+            return None
+        self.optimizer.note(NAME, loop, f"{self.func.name}: search for {result} with next()")
+        return Assign(
+            targets=[Name(id=result, ctx=Store())],
+            value=Call(func=Name(id="next", ctx=Load()), args=[_generator(element, loop, condition), Name(id=result, ctx=Load())], keywords=[])
+        )
+
+    def _rewrite(self, loop: For, previous: Optional[stmt], defined: Set[str]) -> Tuple[Optional[stmt], bool]:
+        """Return the replacement of ``loop`` and whether it replaces the previous statement too"""
+        if loop.orelse or not isinstance(loop.target, Name) or not _loop_variable_dead(self.func, loop.target.id):
+            return None, False
+        replacement = self._append(loop, previous)
+        if replacement is not None:
+            return replacement, True
+        return self._sum(loop, defined) or self._search(loop, previous, defined), False
+
+    def visit_block(self, statements: List[stmt], defined: Set[str]):
+        defined = set(defined)
+        i = 0
+        while i < len(statements):
+            statement = statements[i]
+            if isinstance(statement, For):
+                replacement, merged = self._rewrite(statement, statements[i - 1] if i > 0 else None, defined)
+                if replacement is not None:
+                    copy_location(replacement, statements[i - 1] if merged else statement)
+                    if merged:
+                        statements[i - 1:i + 1] = [replacement]
+                        i -= 1
+                    else:
+                        statements[i] = replacement
+                    statement = replacement
+            if isinstance(statement, (For, While, If, With)):
+                for field in ("body", "orelse"):
+                    self.visit_block(getattr(statement, field, []), defined)
+            if isinstance(statement, (Assign, AnnAssign)):
+                targets = statement.targets if isinstance(statement, Assign) else [statement.target]
+                defined.update(t.id for t in targets if isinstance(t, Name))
+            i += 1
+
+
+def recognise_idioms(tree: Module, optimizer) -> Module:
+    rebound = assigned_names(tree)
+    for func in [n for n in walk(tree) if isinstance(n, FunctionDef)]:
+        if dynamic_features(func) is not None:
+            continue
+        arguments = func.args.posonlyargs + func.args.args + func.args.kwonlyargs
+        # TRY blocks are not entered
+        _Rewriter(func, rebound, optimizer).visit_block(func.body, {a.arg for a in arguments})
+    return fix_missing_locations(tree)
@@ -0,0 +1,192 @@
+"""Replace calls of small SUBROUTINEs with their bodies.
+
+A SUBROUTINE can be inlined if it is defined at the top level, never rebound,
+not recursive, consists of a single ``RETURN e`` with at most ``inline_size``
+(an option of the Optimizer, default 30) nodes, and the names ``e`` uses besides
+its parameters are only bound at the top level, so they mean the same thing at
+every call site.
+
+With a profile, SUBROUTINEs called fewer than ``HOT_CALLS`` times are not
+inlined and the others may be ``HOT_SIZE_FACTOR`` times larger.
+
+Arguments which are constants, or variables read by ``e``, are substituted for
+the parameters. Other arguments are first evaluated in order into temporary
+variables with ``:=`` so that each of them is still evaluated exactly once and
+before the body.
+"""
+from ast import *
+from typing import *
+import ast
+from copy import deepcopy
+from .analysis import binding_counts, dynamic_features
+
+NAME = "inline"
+
+DEFAULT_SIZE = 30
+MAX_DEPTH = 4 # inlining inside inlined code
+HOT_CALLS = 100
+HOT_SIZE_FACTOR = 3
+
+SCOPES = (FunctionDef, AsyncFunctionDef, Lambda, ClassDef, ListComp, SetComp, DictComp, GeneratorExp)
+
+
+def _size(node: AST) -> int:
+    return sum(1 for n in walk(node) if isinstance(n, (expr, stmt)))
+
+
+def _non_top_level_names(tree: Module) -> Set[str]:
+    """Names bound anywhere except by the top level statements of ``tree``"""
+    names = set()
+    for node in walk(tree):
+        if isinstance(node, (FunctionDef, AsyncFunctionDef, Lambda)):
+            for n in walk(node.args):
+                if isinstance(n, arg):
+                    names.add(n.arg)
+            for statement in (node.body if isinstance(node.body, list) else [node.body]):
+                names.update(n.id for n in walk(statement) if isinstance(n, Name) and isinstance(n.ctx, (Store, Del)))
+                names.update(n.name for n in walk(statement) if isinstance(n, (FunctionDef, ClassDef)))
+        elif isinstance(node, ClassDef):
+            for statement in node.body:
+                names.update(n.id for n in walk(statement) if isinstance(n, Name) and isinstance(n.ctx, (Store, Del)))
+                names.update(n.name for n in walk(statement) if isinstance(n, (FunctionDef, ClassDef)))
+        elif isinstance(node, comprehension):
+            names.update(n.id for n in walk(node.target) if isinstance(n, Name))
+    return names
+
+
+class _Inliner(NodeTransformer):
+    def __init__(self, candidates: Dict[str, FunctionDef], optimizer):
+        self.candidates = candidates
+        self.optimizer = optimizer
+        self.counter = 0
+        self.depth = 0
+        self.scopes = [] # enclosing FunctionDef / ClassDef / comprehension nodes
+        self.inlined = {}
+
+    def _temporary(self, func: str, parameter: str) -> str:
+        self.counter += 1
+        return f"_{func}_{parameter}_{self.counter}"
+
+    def _scoped(self, node):
+        self.scopes.append(node)
+        self.generic_visit(node)
+        self.scopes.pop()
+        return node
+
+    visit_FunctionDef = visit_AsyncFunctionDef = visit_ClassDef = visit_Lambda = _scoped
+    visit_ListComp = visit_SetComp = visit_DictComp = visit_GeneratorExp = _scoped
+
+    def visit_Call(self, node):
+        self.generic_visit(node)
+        if not (isinstance(node.func, Name) and node.func.id in self.candidates) or node.keywords:
+            return node
+        func = self.candidates[node.func.id]
+        parameters = [a.arg for a in func.args.args]
+        if len(node.args) != len(parameters) or any(isinstance(a, Starred) for a in node.args):
+            return node
+        if any(scope is func for scope in self.scopes) or self.depth >= MAX_DEPTH:
+            return node
+        body = deepcopy(func.body[0].value)
+        uses = {p: 0 for p in parameters}
+        for n in walk(body):
+            if isinstance(n, Name) and n.id in uses:
+                uses[n.id] += 1
+
+        substitutions = {}
+        temporaries = []
+        for parameter, argument in zip(parameters, node.args):
+            if isinstance(argument, Constant) or (isinstance(argument, Name) and uses[parameter] > 0):
+                substitutions[parameter] = argument
+            else:
+                temporaries.append((parameter, argument))
+        if temporaries and (self.scopes and not isinstance(self.scopes[-1], FunctionDef)):
+            # := can not bind variables of classes and comprehensions
+            return node
+        names = {}
+        for parameter, argument in temporaries:
+            names[parameter] = self._temporary(func.name, parameter)
+
+        class Substitute(NodeTransformer):
+            def visit_Name(self, n):
+                if n.id in substitutions:
+                    return copy_location(deepcopy(substitutions[n.id]), n)
+                if n.id in names:
+                    return copy_location(Name(id=names[n.id], ctx=Load()), n)
+                return n
+        body = Substitute().visit(body)
+
+        # inline the calls in the substituted body as well
+        self.depth += 1
+        body = self.visit(body)
+        self.depth -= 1
+
+        if temporaries:
+            body = Subscript(
+                value=ast.Tuple(elts=[
+                    NamedExpr(target=Name(id=names[p], ctx=Store()), value=a) for p, a in temporaries
+                ] + [body], ctx=Load()),
+                slice=Index(value=Constant(value=-1)), # Index is only needed before python 3.9
+                ctx=Load()
+            )
+        self.inlined[func.name] = self.inlined.get(func.name, 0) + 1
+        return copy_location(body, node)
+
+
+def inline_calls(tree: Module, optimizer) -> Module:
+    reason = dynamic_features(tree)
+    if reason is not None:
+        optimizer.note(NAME, tree, f"not inlining: {reason}")
+        return tree
+    counts = binding_counts(tree)
+    scoped = _non_top_level_names(tree)
+    size = optimizer.options.get("inline_size", DEFAULT_SIZE)
+    candidates = {}
+    for func in tree.body:
+        if not isinstance(func, FunctionDef) or func.decorator_list or counts[func.name] != 1:
+            continue
+        args = func.args
+        if args.posonlyargs or args.kwonlyargs or args.vararg or args.kwarg or args.defaults:
+            continue
+        if not (len(func.body) == 1 and isinstance(func.body[0], Return) and func.body[0].value is not None):
+            continue
+        value = func.body[0].value
+        parameters = {a.arg for a in args.args}
+        if any(isinstance(n, SCOPES + (NamedExpr, Yield, YieldFrom, Await)) for n in walk(value)):
+            continue
+        free = {n.id for n in walk(value) if isinstance(n, Name)} - parameters
+        if free & scoped:
+            optimizer.note(NAME, func, f"{func.name}: not inlined, uses {', '.join(sorted(free & scoped))} which is bound locally somewhere")
+            continue
+        limit = size
+        calls = optimizer.profile.calls(getattr(func, "_ecp_profile", func.name)) if optimizer.profile is not None else None
+        if calls is not None and calls < HOT_CALLS:
+            optimizer.note(NAME, func, f"{func.name}: not inlined, only called {calls} time{'' if calls == 1 else 's'}")
+            continue
+        if calls is not None:
+            limit = size * HOT_SIZE_FACTOR
+        if _size(value) > limit:
+            optimizer.note(NAME, func, f"{func.name}: not inlined, larger than {limit} nodes")
+            continue
+        candidates[func.name] = func
+
+    # recursive SUBROUTINEs, directly or through other candidates, are not inlined
+    calls = {name: {n.func.id for n in walk(func) if isinstance(n, Call) and isinstance(n.func, Name) and n.func.id in candidates}
+             for name, func in candidates.items()}
+    for name in list(candidates):
+        seen, todo = set(), list(calls[name])
+        while todo:
+            callee = todo.pop()
+            if callee == name:
+                optimizer.note(NAME, candidates.pop(name), f"{name}: not inlined, recursive")
+                break
+            if callee not in seen:
+                seen.add(callee)
+                todo.extend(calls.get(callee, ()))
+    if not candidates:
+        return tree
+
+    inliner = _Inliner(candidates, optimizer)
+    tree = inliner.visit(tree)
+    for name, count in inliner.inlined.items():
+        optimizer.note(NAME, candidates[name], f"{name}: inlined at {count} call site{'s' if count > 1 else ''}")
+    return fix_missing_locations(tree)
@@ -0,0 +1,245 @@
+"""Move loop invariant computations out of the loops of SUBROUTINEs."""
+from ast import *
+from typing import *
+import ast
+from copy import deepcopy
+from .analysis import EFFECT_FREE_BUILTINS, PURE_BUILTINS, assigned_names, dynamic_features, pure_functions, walk_all
+from .types import local_types
+
+NAME = "licm"
+
+_unparse = getattr(ast, "unparse", None) # python 3.9+
+
+
+def _describe(name: str, node: expr) -> str:
+    """``node`` as code for the optimizer report, or its variable without ast.unparse"""
+    return _unparse(node) if _unparse is not None else name
+
+
+MIN_ITERATIONS = 2 # loops which ran fewer iterations per entry in the profile are left alone
+
+SCALARS = (int, float, str, bool)
+CONTAINERS = (list, dict, str)
+
+# builtins whose result does not depend on the items of an array argument:
+# either they only look at its length or they fail for every array
+ITEM_INSENSITIVE = {"LEN", "len", "Int", "Integer", "Real", "SQRT", "ISQRT", "abs", "int", "float"}
+# builtins which can not fail for an argument of the given types
+SAFE_CALLS = {"LEN": CONTAINERS, "len": CONTAINERS}
+
+SCOPES = (FunctionDef, AsyncFunctionDef, ClassDef, Lambda, ListComp, SetComp, DictComp, GeneratorExp)
+
+
+def _loop_nodes(loop: AST) -> Iterator[AST]:
+    """Walk ``loop`` without entering nested scopes"""
+    todo = [loop]
+    while todo:
+        node = todo.pop()
+        yield node
+        todo.extend(n for n in iter_child_nodes(node) if not isinstance(n, (FunctionDef, AsyncFunctionDef, ClassDef, Lambda)))
+
+
+class _Hoister:
+    def __init__(self, tree: Module, optimizer):
+        self.optimizer = optimizer
+        self.rebound = assigned_names(tree)
+        self.pure = {name for name in PURE_BUILTINS if name not in self.rebound}
+        pure_subroutines, _ = pure_functions(tree)
+        self.effect_free = {name for name in EFFECT_FREE_BUILTINS if name not in self.rebound} | pure_subroutines
+        self.stored_attributes = {n.attr for n in walk_all(tree) if isinstance(n, Attribute) and isinstance(n.ctx, (Store, Del))}
+        self.custom_lookup = any(isinstance(n, FunctionDef) and n.name in ("__getattr__", "__getattribute__") for n in walk(tree))
+        self.used = {n.id for n in walk_all(tree) if isinstance(n, Name)} | self.rebound
+        self.counter = 0
+
+    def _temporary(self, base: str) -> str:
+        name = base
+        while name in self.used:
+            self.counter += 1
+            name = f"{base}{self.counter}"
+        self.used.add(name)
+        return name
+
+    # analysis of a loop
+
+    def _effects(self, loop) -> str:
+        """What the loop can change: "none" (only its locals), "items" (also items
+        of arrays) or "world" (anything)"""
+        effects = "none"
+        for node in _loop_nodes(loop):
+            if isinstance(node, Call):
+                if isinstance(node.func, Name) and node.func.id in self.effect_free:
+                    continue
+                return "world"
+            if isinstance(node, Subscript) and isinstance(node.ctx, Store) and isinstance(node.value, Name) \
+                    and self.types.get(node.value.id) is list and not isinstance(node.slice, Slice):
+                effects = "items"
+            elif isinstance(node, (Attribute, Subscript)) and isinstance(node.ctx, (Store, Del)):
+                return "world"
+            elif isinstance(node, (Yield, YieldFrom, Await, Global, Nonlocal)):
+                return "world"
+            elif isinstance(node, (FunctionDef, ClassDef, Lambda)) and node is not loop:
+                return "world"
+        return effects
+
+    def _invariant(self, node, stored: Set[str], effects: str) -> bool:
+        if isinstance(node, Constant):
+            return True
+        if isinstance(node, Name):
+            return isinstance(node.ctx, Load) and node.id not in stored and (effects == "none" or self.types.get(node.id) in SCALARS)
+        if isinstance(node, Call):
+            if not (isinstance(node.func, Name) and node.func.id in self.pure and node.func.id not in stored):
+                return False
+            for a in node.args + [k.value for k in node.keywords]:
+                if isinstance(a, Starred):
+                    return False
+                if effects == "items" and node.func.id in ITEM_INSENSITIVE and isinstance(a, Name) and a.id not in stored:
+                    continue
+                if not self._invariant(a, stored, effects):
+                    return False
+            return True
+        if isinstance(node, Subscript) and effects != "none":
+            return False
+        if isinstance(node, (BinOp, UnaryOp, BoolOp, Compare, IfExp, Subscript, Slice)) \
+                or (isinstance(node, ast.Tuple) and isinstance(node.ctx, Load)):
+            return all(self._invariant(n, stored, effects) for n in iter_child_nodes(node) if not isinstance(n, (operator, unaryop, boolop, cmpop, expr_context)))
+        return False
+
+    def _bound_method(self, node, stored: Set[str]) -> bool:
+        """Can the method ``node.func`` be looked up once for the whole loop?"""
+        if not (isinstance(node, Call) and isinstance(node.func, Attribute) and isinstance(node.func.value, Name)):
+            return False
+        receiver, method = node.func.value.id, node.func.attr
+        if receiver in stored or method.startswith("__"):
+            return False
+        receiver_type = self.types.get(receiver)
+        if receiver_type in CONTAINERS:
+            return hasattr(receiver_type, method)
+        return receiver_type is None and method not in self.stored_attributes and not self.custom_lookup
+
+    def _cannot_fail(self, node, defined: Set[str]) -> bool:
+        if isinstance(node, Attribute):
+            return node.value.id in defined and self.types.get(node.value.id) in CONTAINERS
+        return isinstance(node, Call) and isinstance(node.func, Name) and node.func.id in SAFE_CALLS and len(node.args) == 1 \
+            and not node.keywords and isinstance(node.args[0], Name) and node.args[0].id in defined \
+            and self.types.get(node.args[0].id) in SAFE_CALLS[node.func.id]
+
+    def _candidates(self, loop, stored: Set[str], effects: str) -> List[AST]:
+        """The outermost invariant expressions of ``loop`` which are worth hoisting"""
+        found = []
+        todo = [loop.test] + loop.body if isinstance(loop, While) else list(loop.body)
+        while todo:
+            node = todo.pop(0)
+            if isinstance(node, SCOPES):
+                continue
+            if isinstance(node, expr) and not isinstance(node, (Name, Constant)) and self._invariant(node, stored, effects) \
+                    and any(isinstance(n, Call) for n in walk(node)):
+                found.append(node)
+                continue
+            if self._bound_method(node, stored):
+                found.append(node.func)
+                todo.extend(node.args + [k.value for k in node.keywords])
+                continue
+            todo.extend(iter_child_nodes(node))
+        return found
+
+    # transformation
+
+    def visit_block(self, statements: List[stmt], defined: Set[str]):
+        """Hoist out of the loops in ``statements``; ``defined`` are the variables
+        which are certainly assigned before the first statement runs"""
+        defined = set(defined)
+        i = 0
+        while i < len(statements):
+            statement = statements[i]
+            if isinstance(statement, (While, For)) and not statement.orelse:
+                replacement = self.visit_loop(statement, defined)
+                statements[i:i + 1] = replacement
+                i += len(replacement)
+                continue
+            if not isinstance(statement, (FunctionDef, AsyncFunctionDef, ClassDef)):
+                for field in ("body", "orelse", "finalbody"):
+                    block = getattr(statement, field, None)
+                    if isinstance(block, list):
+                        self.visit_block(block, defined)
+                for handler in getattr(statement, "handlers", []):
+                    self.visit_block(handler.body, defined)
+                for case in getattr(statement, "cases", []):
+                    self.visit_block(case.body, defined)
+            if isinstance(statement, (Assign, AnnAssign)):
+                targets = statement.targets if isinstance(statement, Assign) else [statement.target]
+                defined.update(t.id for t in targets if isinstance(t, Name))
+            i += 1
+
+    def _cold(self, loop) -> bool:
+        counts = self.optimizer.profile.loop(getattr(loop, "_ecp_profile", None)) if self.optimizer.profile is not None else None
+        return counts is not None and counts["iterations"] < MIN_ITERATIONS * max(counts["entries"], 1)
+
+    def visit_loop(self, loop, defined: Set[str]) -> List[stmt]:
+        if self._cold(loop):
+            self.optimizer.note(NAME, loop, f"{self.func.name}: loop not optimized, it rarely iterates")
+            self.visit_block(loop.body, defined)
+            return [loop]
+        stored = {n.id for n in _loop_nodes(loop) if isinstance(n, Name) and isinstance(n.ctx, (Store, Del))}
+        effects = self._effects(loop)
+        candidates = self._candidates(loop, stored, effects)
+        if not candidates:
+            self.visit_block(loop.body, defined)
+            return [loop]
+
+        original = deepcopy(loop)
+        hoisted = {} # ast.dump of the expression -> (temporary, expression)
+        for node in candidates:
+            key = dump(node)
+            if key not in hoisted:
+                if isinstance(node, Attribute):
+                    base = f"_{node.value.id}_{node.attr}"
+                elif isinstance(node, Call) and isinstance(node.func, Name):
+                    base = f"_{node.func.id.lower()}"
+                else:
+                    base = "_invariant"
+                hoisted[key] = (self._temporary(base), node)
+        replaced = {id(node): hoisted[dump(node)][0] for node in candidates}
+
+        class Replace(NodeTransformer):
+            def generic_visit(self, node):
+                if id(node) in replaced:
+                    return copy_location(Name(id=replaced[id(node)], ctx=Load()), node)
+                return super().generic_visit(node)
+        Replace().visit(loop)
+
+        safe, unsafe = [], []
+        for name, node in hoisted.values():
+            assignment = copy_location(Assign(targets=[Name(id=name, ctx=Store())], value=node), loop)
+            (safe if self._cannot_fail(node, defined) else unsafe).append(assignment)
+        names = ", ".join(_describe(name, node) for name, node in hoisted.values())
+        self.optimizer.note(NAME, loop, f"{self.func.name}: hoisted {names} out of the loop ({effects} effects)")
+        self.visit_block(loop.body, defined | {name for name, _ in hoisted.values()})
+
+        if not unsafe:
+            return safe + [loop]
+        # use the optimized loop only if the hoisted values could be computed
+        return safe + [copy_location(Try(
+            body=unsafe,
+            handlers=[ExceptHandler(type=Name(id="Exception", ctx=Load()), name=None, body=[original])],
+            orelse=[loop],
+            finalbody=[]
+        ), loop)]
+
+    def visit_function(self, func: FunctionDef):
+        self.func = func
+        self.types = local_types(func, self.rebound, trust_annotations=False)
+        arguments = func.args.posonlyargs + func.args.args + func.args.kwonlyargs
+        self.visit_block(func.body, {a.arg for a in arguments})
+
+
+def hoist_invariants(tree: Module, optimizer) -> Module:
+    reason = dynamic_features(tree)
+    if reason is not None:
+        optimizer.note(NAME, tree, f"not moving loop invariants: {reason}")
+        return tree
+    if "Exception" in assigned_names(tree):
+        return tree
+    hoister = _Hoister(tree, optimizer)
+    for func in [n for n in walk(tree) if isinstance(n, FunctionDef)]:
+        hoister.visit_function(func)
+    return fix_missing_locations(tree)
@@ -0,0 +1,54 @@
+"""Cache the results of pure recursive SUBROUTINEs automatically.
+
+A SUBROUTINE is pure when it only reads its parameters and calls pure builtins
+and other pure SUBROUTINEs (see ``pure_functions``): calling it again with the
+same arguments gives the same result, so the result can be remembered as if it
+had been declared ``CACHED SUBROUTINE``. Calls with arguments other than
+numbers, Strings, Bools and tuples of them are not cached: a RECORD or CLASS
+instance can change between two calls. Only SUBROUTINEs which (indirectly)
+call themselves are cached; the others rarely see the same arguments twice.
+
+The size of the caches is the ``cache_size`` option of the Optimizer (default
+1024, None for no limit).
+"""
+from ast import *
+from typing import *
+from .analysis import called_names, pure_functions
+
+NAME = "memoize"
+
+DEFAULT_CACHE_SIZE = 1024
+
+
+def _recursive(name: str, calls: Dict[str, Set[str]]) -> bool:
+    seen = set()
+    todo = list(calls.get(name, ()))
+    while todo:
+        callee = todo.pop()
+        if callee == name:
+            return True
+        if callee not in seen:
+            seen.add(callee)
+            todo.extend(calls.get(callee, ()))
+    return False
+
+
+def auto_cache(tree: Module, optimizer) -> Module:
+    pure, reasons = pure_functions(tree)
+    functions = {node.name: node for node in tree.body if isinstance(node, FunctionDef)}
+    calls = {name: called_names(functions[name]) & pure for name in pure}
+    size = optimizer.options.get("cache_size", DEFAULT_CACHE_SIZE)
+    for name, func in functions.items():
+        if name not in pure:
+            optimizer.note(NAME, func, f"{name}: not pure, {reasons[name]}")
+        elif not _recursive(name, calls):
+            optimizer.note(NAME, func, f"{name}: pure but not recursive, not cached")
+        else:
+            func.decorator_list.append(copy_location(
+                Call(func=Name(id="EcpCached", ctx=Load()), args=[Constant(value=size)], keywords=[
+                    keyword(arg="immutable_arguments", value=Constant(value=True))
+                ]),
+                func
+            ))
+            optimizer.note(NAME, func, f"{name}: pure and recursive, cached")
+    return fix_missing_locations(tree)
@@ -0,0 +1,122 @@
+"""Infer ``__slots__`` for ECP CLASS definitions.
+
+The instance attributes of a class are the ``self.<attr> := ...`` targets in its
+SUBROUTINEs. The set is closed, and ``__slots__`` can be generated, when nothing
+else in the program could add another attribute to an instance:
+
+* no attribute outside the set is assigned anywhere except on ``self`` inside a
+  method, unless the assignment is to a variable which only ever holds instances
+  of another class
+* the program does not use setattr, vars, __dict__ or PY() with code built at run time
+* no instance attribute shares its name with a class attribute or method
+
+Otherwise the class keeps its instance ``__dict__``.
+"""
+from ast import *
+from typing import *
+import ast
+from .analysis import dynamic_features, walk_all
+
+NAME = "slots"
+
+
+def _class_names(node: ClassDef) -> Set[str]:
+    names = set()
+    for statement in node.body:
+        if isinstance(statement, (FunctionDef, ClassDef)):
+            names.add(statement.name)
+        elif isinstance(statement, Assign):
+            for target in statement.targets:
+                for n in walk(target):
+                    if isinstance(n, Name):
+                        names.add(n.id)
+        elif isinstance(statement, AnnAssign) and statement.value is not None and isinstance(statement.target, Name):
+            names.add(statement.target.id)
+    return names
+
+
+def _instance_attributes(node: ClassDef) -> Tuple[Optional[List[str]], Set[int]]:
+    """Return the attributes assigned to ``self`` in the methods of ``node`` (None if
+    ``self`` is rebound) and the ids of the Attribute nodes doing so"""
+    attributes = []
+    stores = set()
+    for method in node.body:
+        if not isinstance(method, FunctionDef) or len(method.args.args) == 0:
+            continue
+        self_name = method.args.args[0].arg
+        for n in walk(method):
+            if isinstance(n, Name) and n.id == self_name and isinstance(n.ctx, Store):
+                return None, stores
+            if isinstance(n, Attribute) and isinstance(n.ctx, Store) and isinstance(n.value, Name) and n.value.id == self_name:
+                stores.add(id(n))
+                if n.attr not in attributes:
+                    attributes.append(n.attr)
+    return attributes, stores
+
+
+def _variable_classes(tree: Module, classes: Set[str]) -> Dict[str, Set[str]]:
+    """Map each variable name to the classes it is assigned instances of.
+
+    Names are not separated by scope. "?" stands for any value which is not
+    ``ClassName(...)`` of a class in ``classes``, including parameters and loop variables.
+    """
+    kinds = {}
+    for n in walk(tree):
+        if isinstance(n, Assign) and len(n.targets) == 1 and isinstance(n.targets[0], Name):
+            value = n.value
+            if isinstance(value, Call) and isinstance(value.func, Name) and value.func.id in classes:
+                kinds.setdefault(n.targets[0].id, set()).add(value.func.id)
+            else:
+                kinds.setdefault(n.targets[0].id, set()).add("?")
+        elif isinstance(n, arg):
+            kinds.setdefault(n.arg, set()).add("?")
+    for n in walk(tree):
+        # names bound in any other way: loop variables, imports, unpacking...
+        if isinstance(n, Name) and isinstance(n.ctx, (Store, Del)) and n.id not in kinds:
+            kinds[n.id] = {"?"}
+    return kinds
+
+
+def infer_slots(tree: Module, optimizer) -> Module:
+    classes = [n for n in walk(tree) if isinstance(n, ClassDef) and not n.bases and not n.decorator_list]
+    if not classes:
+        return tree
+    reason = dynamic_features(tree)
+
+    analysed = {id(c): _instance_attributes(c) for c in classes}
+    self_stores = set().union(*(stores for _, stores in analysed.values()))
+    kinds = _variable_classes(tree, {c.name for c in classes})
+    # attributes assigned on anything other than self inside a method, by the class
+    # of the receiver when it is known
+    foreign = set()
+    foreign_by_class = {}
+    for n in walk_all(tree):
+        if isinstance(n, Attribute) and isinstance(n.ctx, (Store, Del)) and id(n) not in self_stores:
+            receiver = kinds.get(n.value.id, {"?"}) if isinstance(n.value, Name) else {"?"}
+            if len(receiver) == 1 and "?" not in receiver:
+                foreign_by_class.setdefault(next(iter(receiver)), set()).add(n.attr)
+            else:
+                foreign.add(n.attr)
+
+    for node in classes:
+        attributes, _ = analysed[id(node)]
+        foreign_attributes = foreign | foreign_by_class.get(node.name, set())
+        if "__slots__" in _class_names(node):
+            continue
+        if reason is not None:
+            optimizer.note(NAME, node, f"CLASS {node.name} keeps __dict__: {reason}")
+        elif attributes is None:
+            optimizer.note(NAME, node, f"CLASS {node.name} keeps __dict__: self is reassigned in a method")
+        elif foreign_attributes - set(attributes):
+            optimizer.note(NAME, node, f"CLASS {node.name} keeps __dict__: attributes {', '.join(sorted(foreign_attributes - set(attributes)))} are assigned outside its methods")
+        elif _class_names(node) & set(attributes):
+            optimizer.note(NAME, node, f"CLASS {node.name} keeps __dict__: {', '.join(sorted(_class_names(node) & set(attributes)))} is both a class and an instance attribute")
+        else:
+            l = {"lineno": node.lineno, "col_offset": node.col_offset, "end_lineno": node.lineno, "end_col_offset": node.col_offset}
+            node.body.insert(0, Assign(
+                targets=[Name(id="__slots__", ctx=Store(), **l)],
+                value=ast.Tuple(elts=[Constant(value=a, **l) for a in attributes], ctx=Load(), **l),
+                **l
+            ))
+            optimizer.note(NAME, node, f"CLASS {node.name} uses __slots__ = {tuple(attributes)!r}")
+    return tree
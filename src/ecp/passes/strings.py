@@ -0,0 +1,200 @@
+"""Build Strings in loops of SUBROUTINEs with a StringBuilder.
+
+``s := s + x`` copies s, so a loop building a String that way takes time
+quadratic in its length. Python only avoids the copy in some cases, and never
+for ``s := s + x + y``, which copies s to add x and copies the result again to
+add y. A loop whose only uses of a local variable s are such accumulations::
+
+    result := ""
+    FOR i := 1 TO n
+        result := result + String(i) + ","
+    ENDFOR
+
+becomes::
+
+    _result_builder = StringBuilder(result)
+    _result_append = _result_builder.append
+    for i in range(1, n + 1):
+        _result_append(String(i))
+        _result_append(",")
+    result = str(_result_builder)
+
+Every value assigned to s otherwise must be proven to be a String, and s must
+be assigned before the loop. Added values which are not proven to be Strings
+are appended as ``"" + x``, which fails for other values like ``s + x`` does.
+Loops inside or containing a TRY block are left alone: an error in the middle
+of the loop could be caught and the unfinished String used.
+"""
+from ast import *
+from typing import *
+import ast
+from .analysis import assigned_names, dynamic_features, walk_all
+from .types import _infer, _scope_nodes, local_types
+
+NAME = "strings"
+
+
+def _added(value: expr, name: str) -> Optional[List[expr]]:
+    """The values added to ``name`` by ``name + a + b...``, or None"""
+    values = []
+    while isinstance(value, BinOp) and isinstance(value.op, Add):
+        values.append(value.right)
+        value = value.left
+    if not (values and isinstance(value, Name) and value.id == name):
+        return None
+    return values[::-1]
+
+
+def _accumulation(statement: stmt, name: str) -> Optional[List[expr]]:
+    if isinstance(statement, Assign) and len(statement.targets) == 1 and isinstance(statement.targets[0], Name) \
+            and statement.targets[0].id == name:
+        values = _added(statement.value, name)
+        if values is not None and not any(_reads(v, name) for v in values):
+            return values
+    return None
+
+
+def _reads(node: AST, name: str) -> bool:
+    return any(isinstance(n, Name) and n.id == name for n in walk_all(node))
+
+
+def _statements(statements: List[stmt]) -> Iterator[stmt]:
+    """Yield ``statements`` and the statements of the IFs and loops among them"""
+    for statement in statements:
+        yield statement
+        if isinstance(statement, (For, While, If)):
+            yield from _statements(statement.body)
+            yield from _statements(statement.orelse)
+
+
+class _Rewriter:
+    def __init__(self, func: FunctionDef, rebound: Set[str], optimizer):
+        self.func = func
+        self.rebound = rebound
+        self.optimizer = optimizer
+        self.types = local_types(func, rebound, trust_annotations=False)
+        self.used = {n.id for n in walk_all(func) if isinstance(n, Name)} | rebound
+        self.strings = {name for name in self._locals() if self._string(name)}
+
+    def _locals(self) -> Set[str]:
+        a = self.func.args
+        names = {n.id for n in _scope_nodes(self.func) if isinstance(n, Name) and isinstance(n.ctx, Store)}
+        names.difference_update(p.arg for p in a.posonlyargs + a.args + a.kwonlyargs + [a.vararg, a.kwarg] if p)
+        for node in walk(self.func):
+            if isinstance(node, (Global, Nonlocal)):
+                names.difference_update(node.names)
+            elif node is not self.func and isinstance(node, (FunctionDef, Lambda, ClassDef)):
+                # captured by a nested SUBROUTINE, which could read it while the loop runs
+                names.difference_update(n.id for n in walk(node) if isinstance(n, Name))
+        return names
+
+    def _string(self, name: str) -> bool:
+        """Is every value assigned to the local variable ``name`` a String?"""
+        assigned = set() # ids of the targets checked with their assignment
+        for node in _scope_nodes(self.func):
+            if isinstance(node, Assign) and len(node.targets) == 1 and isinstance(node.targets[0], Name) and node.targets[0].id == name:
+                if _accumulation(node, name) is None and _infer(node.value, self.types, self.rebound) is not str:
+                    return False
+                assigned.add(id(node.targets[0]))
+        # bound in other ways as well (FOR, unpacking...)
+        return not any(
+            isinstance(node, Name) and node.id == name and not isinstance(node.ctx, Load) and id(node) not in assigned
+            for node in _scope_nodes(self.func)
+        )
+
+    def _temporary(self, base: str) -> str:
+        name, counter = base, 0
+        while name in self.used:
+            counter += 1
+            name = f"{base}{counter}"
+        self.used.add(name)
+        return name
+
+    def _built(self, loop: stmt) -> List[str]:
+        """The String variables which ``loop`` only uses to add values to"""
+        if loop.orelse or any(isinstance(n, (Try, With)) for n in walk(loop)):
+            return []
+        statements = list(_statements(loop.body))
+        names = []
+        for name in sorted(self.strings):
+            accumulations = [s for s in statements if _accumulation(s, name) is not None]
+            if not accumulations:
+                continue
+            reads = sum(isinstance(n, Name) and n.id == name and isinstance(n.ctx, Load) for n in walk_all(loop))
+            writes = sum(isinstance(n, Name) and n.id == name and not isinstance(n.ctx, Load) for n in walk_all(loop))
+            # the only reads and writes are the ones of the accumulations
+            if reads == writes == len(accumulations):
+                names.append(name)
+        return names
+
+    def _rewrite(self, loop: stmt, name: str) -> List[stmt]:
+        builder = self._temporary(f"_{name}_builder")
+        append = self._temporary(f"_{name}_append")
+
+        def appends(statement: stmt) -> List[stmt]:
+            calls = []
+            for value in _accumulation(statement, name):
+                if _infer(value, self.types, self.rebound) is not str:
+                    value = BinOp(left=Constant(value=""), op=Add(), right=value)
+                calls.append(copy_location(Expr(value=Call(func=Name(id=append, ctx=Load()), args=[value], keywords=[])), statement))
+            return calls
+
+        def replace(statements: List[stmt]) -> List[stmt]:
+            result = []
+            for statement in statements:
+                if _accumulation(statement, name) is not None:
+                    result.extend(appends(statement))
+                    continue
+                if isinstance(statement, (For, While, If)):
+                    statement.body = replace(statement.body)
+                    statement.orelse = replace(statement.orelse)
+                result.append(statement)
+            return result
+
+        loop.body = replace(loop.body)
+        before = [
+            Assign(targets=[Name(id=builder, ctx=Store())], value=Call(func=Name(id="StringBuilder", ctx=Load()), args=[Name(id=name, ctx=Load())], keywords=[])),
+            Assign(targets=[Name(id=append, ctx=Store())], value=Attribute(value=Name(id=builder, ctx=Load()), attr="append", ctx=Load())),
+        ]
+        after = Assign(targets=[Name(id=name, ctx=Store())], value=Call(func=Name(id="str", ctx=Load()), args=[Name(id=builder, ctx=Load())], keywords=[]))
+        self.optimizer.note(NAME, loop, f"{self.func.name}: String {name} built with a StringBuilder")
+        return [copy_location(s, loop) for s in before] + [loop, copy_location(after, loop)]
+
+    def visit_block(self, statements: List[stmt], defined: Set[str]):
+        defined = set(defined)
+        i = 0
+        while i < len(statements):
+            statement = statements[i]
+            if isinstance(statement, (For, While)):
+                names = [name for name in self._built(statement) if name in defined]
+                if names:
+                    before, after = [], []
+                    for name in names:
+                        rewritten = self._rewrite(statement, name)
+                        before.extend(rewritten[:2])
+                        after.append(rewritten[-1])
+                    statements[i:i + 1] = before + [statement] + after
+                    i += len(before)
+                # nested loops can build other Strings
+                for field in ("body", "orelse"):
+                    self.visit_block(getattr(statement, field), defined)
+            elif isinstance(statement, If):
+                for field in ("body", "orelse"):
+                    self.visit_block(getattr(statement, field), defined)
+            if isinstance(statement, (Assign, AnnAssign)):
+                targets = statement.targets if isinstance(statement, Assign) else [statement.target]
+                defined.update(t.id for t in targets if isinstance(t, Name))
+            i += 1
+
+
+def build_strings(tree: Module, optimizer) -> Module:
+    rebound = assigned_names(tree)
+    if {"StringBuilder", "str"} & rebound:
+        return tree
+    for func in [n for n in walk(tree) if isinstance(n, FunctionDef)]:
+        if dynamic_features(func) is not None:
+            continue
+        arguments = func.args.posonlyargs + func.args.args + func.args.kwonlyargs
+        # TRY blocks are not entered
+        _Rewriter(func, rebound, optimizer).visit_block(func.body, {a.arg for a in arguments})
+    return fix_missing_locations(tree)
@@ -0,0 +1,191 @@
+"""Turn self-recursive tail calls of SUBROUTINEs into loops."""
+from ast import *
+from typing import *
+import ast
+from .analysis import binding_counts, dynamic_features
+
+NAME = "tailcall"
+
+MATCH = getattr(ast, "Match", ()) # python 3.10+
+
+
+def _functions(body: Iterable[AST]) -> Iterator[FunctionDef]:
+    """Yield the SUBROUTINEs whose name refers to themselves inside their body:
+    the ones at the top level and nested in other SUBROUTINEs, but not methods"""
+    for node in body:
+        if isinstance(node, FunctionDef):
+            yield node
+            yield from _functions(node.body)
+        elif not isinstance(node, ClassDef):
+            yield from _functions(iter_child_nodes(node))
+
+
+def _is_self_call(node: AST, func: FunctionDef) -> bool:
+    return (
+        isinstance(node, Call) and isinstance(node.func, Name) and node.func.id == func.name
+        and not node.keywords and len(node.args) == len(func.args.args)
+        and not any(isinstance(a, Starred) for a in node.args)
+    )
+
+
+def _tail_calls(statements: List[stmt], func: FunctionDef) -> Iterator[Tuple[List[stmt], int]]:
+    """Yield (statement list, index) of each ``return f(...)`` which can become a jump"""
+    for i, statement in enumerate(statements):
+        if isinstance(statement, Return) and _is_self_call(statement.value, func):
+            yield statements, i
+        elif isinstance(statement, If):
+            yield from _tail_calls(statement.body, func)
+            yield from _tail_calls(statement.orelse, func)
+        elif isinstance(statement, MATCH):
+            for case in statement.cases:
+                yield from _tail_calls(case.body, func)
+        # loops, try and with blocks are not entered: continue would jump to
+        # the wrong loop or skip handlers and cleanup
+
+
+def _local_names(func: FunctionDef) -> Set[str]:
+    """Names bound in ``func`` outside comprehensions"""
+    names = set()
+    def visit(node):
+        if isinstance(node, (ListComp, SetComp, DictComp, GeneratorExp)):
+            return
+        if isinstance(node, Name) and not isinstance(node.ctx, Load):
+            names.add(node.id)
+        for child in iter_child_nodes(node):
+            visit(child)
+    visit(func)
+    return names
+
+
+_ALL = None # the variables defined after code which never finishes normally
+
+
+def _defined(statements: List[stmt], defined: Set[str], local: Set[str]) -> Optional[Set[str]]:
+    """The locals defined after ``statements`` when ``defined`` are defined before,
+    _ALL if they never finish, or raise ValueError if a local may be read before
+    it is assigned"""
+    def read(*nodes):
+        for node in nodes:
+            if node is not None and any(isinstance(n, Name) and isinstance(n.ctx, Load) and n.id in local and n.id not in defined for n in walk(node)):
+                raise ValueError
+
+    def bound(target):
+        defined.update(n.id for n in walk(target) if isinstance(n, Name))
+
+    def join(*results):
+        results = [r for r in results if r is not _ALL]
+        return set.intersection(*results) if results else _ALL
+
+    defined = set(defined)
+    for statement in statements:
+        if isinstance(statement, (Return, Raise, Continue, Break)):
+            read(*iter_child_nodes(statement))
+            return _ALL
+        if isinstance(statement, If):
+            read(statement.test)
+            after = join(_defined(statement.body, defined, local), _defined(statement.orelse, defined, local))
+            if after is _ALL:
+                return _ALL
+            defined = after
+        elif isinstance(statement, (For, While)):
+            read(statement.iter if isinstance(statement, For) else statement.test)
+            inside = set(defined)
+            if isinstance(statement, For):
+                inside.update(n.id for n in walk(statement.target) if isinstance(n, Name))
+            # the body may run any number of times, including none
+            _defined(statement.body, inside, local)
+            _defined(statement.orelse, defined, local)
+        elif isinstance(statement, With):
+            for item in statement.items:
+                read(item.context_expr)
+                if item.optional_vars is not None:
+                    bound(item.optional_vars)
+            after = _defined(statement.body, defined, local)
+            if after is _ALL:
+                return _ALL
+            defined = after
+        elif isinstance(statement, Try):
+            # any statement of the body may be the one which raised
+            _defined(statement.body, defined, local)
+            for handler in statement.handlers:
+                inside = set(defined) | ({handler.name} if handler.name else set())
+                _defined(handler.body, inside, local)
+            _defined(statement.orelse, defined, local)
+            after = _defined(statement.finalbody, defined, local)
+            if after is _ALL:
+                return _ALL
+            defined = after
+        elif isinstance(statement, (Assign, AnnAssign)):
+            read(statement.value)
+            for target in statement.targets if isinstance(statement, Assign) else [statement.target]:
+                read(*[n for n in iter_child_nodes(target) if not isinstance(target, (ast.Tuple, ast.List))])
+                bound(target)
+        elif isinstance(statement, AugAssign):
+            read(statement.value, statement.target)
+        elif isinstance(statement, (Expr, Pass, Assert, Global, Nonlocal, Import, ImportFrom)):
+            read(statement)
+            for alias in getattr(statement, "names", []):
+                if isinstance(alias, ast.alias):
+                    defined.add((alias.asname or alias.name).split(".")[0])
+        else: # DEL, MATCH...
+            raise ValueError
+    return defined
+
+
+def _definitely_assigned(func: FunctionDef) -> bool:
+    """Is every local of ``func`` assigned before it is read?
+
+    Locals keep their values from one pass of the loop to the next, so a local
+    which is read before it is assigned could see the value of an earlier call.
+    """
+    local = _local_names(func)
+    try:
+        _defined(func.body, {a.arg for a in func.args.args}, local)
+    except ValueError:
+        return False
+    return True
+
+
+def _eligible(func: FunctionDef) -> bool:
+    args = func.args
+    if args.posonlyargs or args.kwonlyargs or args.vararg or args.kwarg or func.decorator_list:
+        return False
+    for node in walk(func):
+        if node is not func and isinstance(node, (FunctionDef, AsyncFunctionDef, Lambda, ClassDef, Yield, YieldFrom, Await)):
+            return False
+        if isinstance(node, (Global, Nonlocal)) and func.name in node.names:
+            return False
+    return dynamic_features(func) is None and _definitely_assigned(func)
+
+
+def eliminate_tail_calls(tree: Module, optimizer) -> Module:
+    counts = binding_counts(tree)
+    for func in list(_functions(tree.body)):
+        if counts[func.name] != 1:
+            continue
+        calls = list(_tail_calls(func.body, func))
+        if not calls or not _eligible(func):
+            continue
+        parameters = [a.arg for a in func.args.args]
+        # replace from the end so that the indices of earlier calls stay valid
+        for statements, i in reversed(calls):
+            # parameters passed on unchanged do not have to be rebound
+            changed = [(p, value) for p, value in zip(parameters, statements[i].value.args) if not (isinstance(value, Name) and value.id == p)]
+            if len(changed) == 1:
+                rebind = Assign(targets=[Name(id=changed[0][0], ctx=Store())], value=changed[0][1])
+            elif changed:
+                rebind = Assign(
+                    targets=[ast.Tuple(elts=[Name(id=p, ctx=Store()) for p, _ in changed], ctx=Store())],
+                    value=ast.Tuple(elts=[value for _, value in changed], ctx=Load())
+                )
+            else:
+                rebind = None
+            jump = [rebind, Continue()] if rebind is not None else [Continue()]
+            for node in jump:
+                copy_location(node, statements[i])
+            statements[i:i + 1] = jump
+        loop = While(test=Constant(value=True), body=func.body + [Return(value=None)], orelse=[])
+        copy_location(loop, func.body[0])
+        func.body = [loop]
+        optimizer.note(NAME, func, f"{func.name}: {len(calls)} tail call{'s' if len(calls) > 1 else ''} turned into a loop")
+    return fix_missing_locations(tree)
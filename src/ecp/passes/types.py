@@ -0,0 +1,373 @@
+"""Passes using the type annotations of ECP programs (``n: Integer``).
+
+``types`` infers the types of local variables from the values assigned to them
+and from the annotations of the parameters, which are only trusted behind a
+``type(p) is T`` guard. Conversions which are proven to do nothing (``Int(n)``
+of an Integer) are removed.
+
+``typecheck`` validates annotated parameters with isinstance when a SUBROUTINE
+is entered, so that wrong annotations are reported instead of trusted.
+
+``specialize`` uses a profile instead of annotations: when every call of a
+SUBROUTINE passed a parameter of the same type, the body is specialized for
+that type as ``types`` would and guarded with ``type(p) is T``, keeping the
+original body for other calls.
+"""
+from ast import *
+from typing import *
+import ast
+from copy import deepcopy
+from .analysis import assigned_names, dynamic_features
+
+ANY = None
+UNSET = "unset" # no binding of the variable has been seen yet
+
+# annotations which prove the type of a value. Real is not one of them because
+# Integers are accepted wherever a Real is expected.
+TYPE_NAMES = {
+    "Integer": int,
+    "Int": int,
+    "String": str,
+    "Bool": bool,
+    "Array": list,
+    "Dictionary": dict,
+}
+
+# builtins returning a value of a known type
+RESULT_TYPES = {
+    "Int": int, "Integer": int, "STRING_TO_INT": int, "LEN": int, "ISQRT": int, "CHAR_TO_CODE": int, "POSITION": int,
+    "GCD": int, "MODPOW": int, "BINARY_SEARCH": int,
+    "Real": float, "STRING_TO_REAL": float, "SQRT": float,
+    "String": str, "INT_TO_STRING": str, "REAL_TO_STRING": str, "CODE_TO_CHAR": str,
+    "Bool": bool,
+}
+
+# conversions which return their argument unchanged when it already has the type
+IDENTITY_CONVERSIONS = {
+    "Int": int, "Integer": int, "STRING_TO_INT": int,
+    "Real": float, "STRING_TO_REAL": float,
+    "String": str, "INT_TO_STRING": str, "REAL_TO_STRING": str,
+    "Bool": bool,
+}
+
+ARITHMETIC = (Add, Sub, Mult, FloorDiv, Mod)
+
+
+def _scope_nodes(func: FunctionDef) -> Iterator[AST]:
+    """Walk the body of ``func`` without entering nested SUBROUTINEs and classes"""
+    todo = list(func.body)
+    while todo:
+        node = todo.pop()
+        yield node
+        if not isinstance(node, (FunctionDef, ClassDef)):
+            todo.extend(iter_child_nodes(node))
+
+
+def _infer(node: AST, env: dict, rebound: Set[str]):
+    if isinstance(node, Constant):
+        return type(node.value) if type(node.value) in (int, float, str, bool) else ANY
+    if isinstance(node, Name):
+        return env.get(node.id, ANY)
+    if isinstance(node, BinOp):
+        left, right = _infer(node.left, env, rebound), _infer(node.right, env, rebound)
+        if UNSET in (left, right):
+            return UNSET
+        if isinstance(node.op, Div) and {left, right} <= {int, float}:
+            return float
+        if isinstance(node.op, ARITHMETIC) and left is int and right is int:
+            return int
+        if isinstance(node.op, ARITHMETIC) and {left, right} in ({float}, {int, float}):
+            return float
+        if isinstance(node.op, Add) and left is str and right is str:
+            return str
+        return ANY
+    if isinstance(node, UnaryOp):
+        if isinstance(node.op, Not):
+            return bool
+        operand = _infer(node.operand, env, rebound)
+        return operand if operand in (int, float, UNSET) else ANY
+    if isinstance(node, Compare):
+        return bool
+    if isinstance(node, Call) and isinstance(node.func, Name) and node.func.id in RESULT_TYPES and node.func.id not in rebound:
+        return RESULT_TYPES[node.func.id]
+    if isinstance(node, Subscript) and _infer(node.value, env, rebound) is str:
+        return str
+    if isinstance(node, ast.List):
+        return list
+    if isinstance(node, ast.Dict):
+        return dict
+    return ANY
+
+
+def _join(a, b):
+    if a == UNSET:
+        return b
+    if b == UNSET or a == b:
+        return a
+    return ANY
+
+
+def local_types(func: FunctionDef, rebound: Set[str], trust_annotations: bool = True, parameters: Dict[str, type] = None) -> Dict[str, type]:
+    """Return the type of each local variable of ``func`` which has a single known type
+
+    Unless ``trust_annotations``, the types of annotated variables are inferred
+    from the values assigned to them and parameters have no known type.
+    ``parameters`` gives the types the parameters are passed with when they are
+    known otherwise; values assigned to them later are inferred.
+    """
+    parameters = parameters or {}
+    declared = {} # name -> annotated type (trusted)
+    bindings = {} # name -> expressions assigned to it
+    for a in func.args.posonlyargs + func.args.args:
+        if a.arg in parameters:
+            bindings[a.arg] = []
+        elif isinstance(a.annotation, Constant) and trust_annotations:
+            declared[a.arg] = TYPE_NAMES.get(a.annotation.value, ANY)
+        else:
+            declared[a.arg] = ANY
+    if func.args.vararg:
+        declared[func.args.vararg.arg] = ANY
+    if func.args.kwarg:
+        declared[func.args.kwarg.arg] = ANY
+
+    handled = set() # ids of the Name targets handled by their statement
+    for node in _scope_nodes(func):
+        if isinstance(node, AnnAssign) and isinstance(node.target, Name) and not trust_annotations:
+            if node.value is None:
+                declared[node.target.id] = ANY
+            else:
+                bindings.setdefault(node.target.id, []).append(node.value)
+            handled.add(id(node.target))
+        elif isinstance(node, AnnAssign) and isinstance(node.target, Name):
+            t = TYPE_NAMES.get(node.annotation.value, ANY) if isinstance(node.annotation, Constant) else ANY
+            declared[node.target.id] = _join(declared.get(node.target.id, UNSET), t)
+            handled.add(id(node.target))
+        elif isinstance(node, Assign) and len(node.targets) == 1 and isinstance(node.targets[0], Name):
+            bindings.setdefault(node.targets[0].id, []).append(node.value)
+            handled.add(id(node.targets[0]))
+        elif isinstance(node, For) and isinstance(node.target, Name):
+            iterator = node.iter
+            if isinstance(iterator, Call) and isinstance(iterator.func, Name) and iterator.func.id == "range" and "range" not in rebound:
+                bindings.setdefault(node.target.id, []).append(Constant(value=0))
+            else:
+                declared[node.target.id] = ANY
+            handled.add(id(node.target))
+        elif isinstance(node, Name) and isinstance(node.ctx, (Store, Del)) and id(node) not in handled:
+            declared[node.id] = ANY
+        elif isinstance(node, (FunctionDef, ClassDef)):
+            declared[node.name] = ANY
+
+    # names bound in other ways as well (unpacking, nested SUBROUTINEs...) are unknown
+    for name, t in list(declared.items()):
+        if t is ANY:
+            bindings.pop(name, None)
+
+    env = {name: UNSET for name in bindings}
+    env.update(declared)
+    changed = True
+    while changed:
+        changed = False
+        for name, values in bindings.items():
+            if name in declared:
+                continue
+            t = parameters.get(name, UNSET)
+            for value in values:
+                t = _join(t, _infer(value, env, rebound))
+            if t != env[name]:
+                env[name] = t
+                changed = True
+    return {name: t for name, t in env.items() if t not in (ANY, UNSET)}
+
+
+class _Specializer(NodeTransformer):
+    def __init__(self, func: FunctionDef, env: dict, rebound: Set[str], optimizer, name: str = "types"):
+        self.func = func
+        self.env = env
+        self.rebound = rebound
+        self.optimizer = optimizer
+        self.name = name
+
+    def visit_FunctionDef(self, node):
+        return node # nested SUBROUTINEs are specialized on their own
+
+    def visit_ClassDef(self, node):
+        return node
+
+    def visit_Call(self, node):
+        self.generic_visit(node)
+        if not (isinstance(node.func, Name) and len(node.args) == 1 and not node.keywords) or node.func.id in self.rebound:
+            return node
+        name = node.func.id
+        argument = node.args[0]
+        if name in IDENTITY_CONVERSIONS and _infer(argument, self.env, self.rebound) is IDENTITY_CONVERSIONS[name]:
+            self.optimizer.note(self.name, node, f"{self.func.name}: removed {name}() of a value which is already {IDENTITY_CONVERSIONS[name].__name__}")
+            return argument
+        return node
+
+
+def _annotated_parameters(func: FunctionDef, rebound: Set[str]) -> Dict[str, type]:
+    """The parameters of ``func`` annotated with a type which can be guarded, and that type"""
+    known = {}
+    for a in func.args.posonlyargs + func.args.args:
+        t = TYPE_NAMES.get(a.annotation.value) if isinstance(a.annotation, Constant) else None
+        if t is not None and t.__name__ not in rebound:
+            known[a.arg] = t
+    return known
+
+
+def specialize_types(tree: Module, optimizer) -> Module:
+    rebound = assigned_names(tree)
+    for func in [n for n in walk(tree) if isinstance(n, FunctionDef)]:
+        if dynamic_features(func) is not None:
+            continue
+        known = _annotated_parameters(func, rebound)
+        if "type" in rebound or any(isinstance(n, (FunctionDef, ClassDef)) for n in _scope_nodes(func)):
+            known = {}
+        # annotations are not checked, so the parameters are only trusted behind a guard
+        if known and _guard_specialized(func, known, rebound, optimizer, "types"):
+            continue
+        env = local_types(func, rebound, trust_annotations=False)
+        specializer = _Specializer(func, env, rebound, optimizer)
+        func.body = [specializer.visit(statement) for statement in func.body]
+    return fix_missing_locations(tree)
+
+
+class _Silent:
+    """Stands in for the Optimizer while trying out specializations"""
+    @staticmethod
+    def note(name, node, message):
+        pass
+
+
+# types of profiled arguments (by name) which the specialized body can be guarded with
+PROFILED_TYPES = {"int": int, "str": str, "bool": bool, "list": list, "dict": dict}
+
+
+def _profiled_parameters(func: FunctionDef, profile, rebound: Set[str]) -> Dict[str, type]:
+    """The unannotated parameters of ``func`` which always had the same type, and that type"""
+    observed = profile.argument_types(getattr(func, "_ecp_profile", func.name))
+    assigned = {n.id for n in _scope_nodes(func) if isinstance(n, Name) and isinstance(n.ctx, (Store, Del))}
+    known = {}
+    for a in func.args.posonlyargs + func.args.args:
+        types = observed.get(a.arg, {})
+        if a.annotation is None and a.arg not in assigned and len(types) == 1:
+            t = PROFILED_TYPES.get(next(iter(types)))
+            if t is not None and t.__name__ not in rebound:
+                known[a.arg] = t
+    return known
+
+
+def _guard_specialized(func: FunctionDef, known: Dict[str, type], rebound: Set[str], optimizer, name: str) -> bool:
+    """Specialize ``func`` for the parameter types ``known``, guarded with
+    ``type(p) is T`` and keeping the original body for other calls. False if the
+    specialized body would be the same."""
+    def specialize(known, note):
+        env = local_types(func, rebound, trust_annotations=False, parameters=known)
+        specializer = _Specializer(func, env, rebound, optimizer if note else _Silent, name)
+        return [specializer.visit(deepcopy(statement)) for statement in func.body]
+
+    target = [dump(s) for s in specialize(known, False)]
+    if target == [dump(s) for s in func.body]:
+        return False
+    # only guard the parameters the specialized body depends on
+    for p in list(known):
+        fewer = {q: t for q, t in known.items() if q != p}
+        if [dump(s) for s in specialize(fewer, False)] == target:
+            del known[p]
+    specialized = specialize(known, True)
+    guard = BoolOp(op=And(), values=[
+        Compare(
+            left=Call(func=Name(id="type", ctx=Load()), args=[Name(id=p, ctx=Load())], keywords=[]),
+            ops=[Is()],
+            comparators=[Name(id=t.__name__, ctx=Load())]
+        )
+        for p, t in known.items()
+    ])
+    if len(guard.values) == 1:
+        guard = guard.values[0]
+    func.body = [copy_location(If(test=guard, body=specialized, orelse=func.body), func.body[0])]
+    return True
+
+
+def specialize_parameters(tree: Module, optimizer) -> Module:
+    profile = optimizer.profile
+    if profile is None:
+        return tree
+    rebound = assigned_names(tree)
+    if "type" in rebound:
+        return tree
+    for func in [n for n in walk(tree) if isinstance(n, FunctionDef)]:
+        if dynamic_features(func) is not None or not profile.calls(getattr(func, "_ecp_profile", func.name)):
+            continue
+        if any(isinstance(n, (FunctionDef, ClassDef)) for n in _scope_nodes(func)):
+            continue # would be defined twice
+        known = _profiled_parameters(func, profile, rebound)
+        if not known:
+            continue
+        if _guard_specialized(func, known, rebound, optimizer, "specialize"):
+            types = ", ".join(f"{p}: {t.__name__}" for p, t in known.items())
+            optimizer.note("specialize", func, f"{func.name}: specialized for {types}")
+    return fix_missing_locations(tree)
+
+
+# isinstance checks for the types which can be validated
+CHECKS = {
+    "Integer": ["int"],
+    "Int": ["int"],
+    "Real": ["int", "float"],
+    "String": ["str"],
+    "Bool": ["bool"],
+    "Array": ["list"],
+    "Dictionary": ["dict"],
+}
+
+
+def _defined_types(tree: Module) -> Set[str]:
+    """Names of the CLASSes and RECORDs defined at the top level of ``tree``"""
+    names = set()
+    for node in tree.body:
+        if isinstance(node, ClassDef):
+            names.add(node.name)
+        elif isinstance(node, Assign) and isinstance(node.value, Call) and isinstance(node.value.func, Name) \
+                and node.value.func.id == "EcpTupleRecord" and isinstance(node.targets[0], Name):
+            names.add(node.targets[0].id)
+    return names
+
+
+def check_types(tree: Module, optimizer) -> Module:
+    rebound = assigned_names(tree)
+    defined = _defined_types(tree)
+    for func in [n for n in walk(tree) if isinstance(n, FunctionDef)]:
+        checks = []
+        for a in func.args.posonlyargs + func.args.args:
+            if not isinstance(a.annotation, Constant):
+                continue
+            type_name = a.annotation.value
+            if type_name in CHECKS and not rebound & set(CHECKS[type_name]):
+                names = CHECKS[type_name]
+                expected = Name(id=names[0], ctx=Load()) if len(names) == 1 else ast.Tuple(elts=[Name(id=n, ctx=Load()) for n in names], ctx=Load())
+            elif type_name in defined:
+                expected = Name(id=type_name, ctx=Load())
+            else:
+                continue
+            if rebound & {"isinstance", "type", "TypeError"}:
+                continue
+            checks.append(If(
+                test=UnaryOp(op=Not(), operand=Call(func=Name(id="isinstance", ctx=Load()), args=[Name(id=a.arg, ctx=Load()), expected], keywords=[])),
+                body=[Raise(exc=Call(
+                    func=Name(id="TypeError", ctx=Load()),
+                    args=[BinOp(
+                        left=Constant(value=f"{func.name}() argument {a.arg} must be {type_name}, got "),
+                        op=Add(),
+                        right=Attribute(value=Call(func=Name(id="type", ctx=Load()), args=[Name(id=a.arg, ctx=Load())], keywords=[]), attr="__name__", ctx=Load())
+                    )],
+                    keywords=[]
+                ), cause=None)],
+                orelse=[]
+            ))
+        if checks:
+            for check in checks:
+                copy_location(check, func.body[0])
+            func.body[0:0] = checks
+            optimizer.note("typecheck", func, f"{func.name}: checking {len(checks)} annotated parameter{'s' if len(checks) > 1 else ''} on entry")
+    return fix_missing_locations(tree)
@@ -0,0 +1,238 @@
+"""Dictionaries stored in a file, for lookup tables larger than memory.
+
+``PersistentDictionary(path)`` is used like a Dictionary::
+
+    table := PersistentDictionary("words.db")
+    table["apple"] := 3
+    OUTPUT table["apple"], "apple" IN table, LEN(table)
+    FOR word IN table
+        OUTPUT word, table[word]
+    ENDFOR
+    CLOSE(table)
+
+The entries are kept in an SQLite database (the ``sqlite3`` module of python),
+in the order they were added like a Dictionary keeps them, and are still there
+when the program runs again. Keys must be Integers, Reals, Strings or Bools;
+like in a Dictionary 1, 1.0 and True are the same key, and keys are returned as
+they were first stored (except Bools, which are stored as Integers). Values
+can be anything python can pickle: numbers, Strings, Arrays, Dictionaries...
+
+The ``cache_size`` entries used most recently are kept in memory, so reading
+them again does not read the file. Changed entries are written back in
+batches of ``batch_size``, each in one transaction, and the rest by ``flush``
+or when the PersistentDictionary is CLOSEd; a dictionary which is not closed
+is completed when python exits. Values in memory can be changed in place (e.g.
+``table[key].append(x)``): Arrays and other values which can change are
+compared with what was stored when they leave the cache and on CLOSE.
+
+``update`` adds many entries in one transaction without going through the
+cache, and ``items`` and ``values`` read the entries in large pages. Keys added
+while a FOR loop goes through the dictionary may be visited by the loop.
+"""
+import pickle
+import sqlite3
+from collections import OrderedDict
+from collections.abc import Mapping, MutableMapping
+from weakref import finalize
+
+__all__ = ["PersistentDictionary"]
+
+KEY_TYPES = (int, float, str, bool)
+# values which can not change, so need not be compared with what was stored
+IMMUTABLE = (int, float, str, bool, bytes, type(None))
+PAGE_SIZE = 1000 # entries read at a time when iterating
+
+
+class _Storage:
+    """The database and the entries in memory of a PersistentDictionary, kept
+    apart so that the finalizer which completes it does not keep it alive"""
+
+    def __init__(self, path):
+        self.db = sqlite3.connect(path, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.execute("PRAGMA synchronous = NORMAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS entries (key UNIQUE NOT NULL, value BLOB NOT NULL)")
+        self.cache = OrderedDict() # key: [value, pickle stored for it, or None if changed]
+        self.changed = set() # keys of the cache whose values are not stored
+        self.pending = {} # key: pickle to store, or None to delete
+
+    def write(self):
+        """Store the changed entries and the pending writes in one transaction"""
+        if not self.changed and not self.pending:
+            return
+        for key in self.changed:
+            entry = self.cache[key]
+            entry[1] = self.pending[key] = pickle.dumps(entry[0])
+        self.changed.clear()
+        stored = [(key, value) for key, value in self.pending.items() if value is not None]
+        deleted = [(key,) for key, value in self.pending.items() if value is None]
+        with self.db:
+            self.db.execute("BEGIN")
+            self.db.executemany("DELETE FROM entries WHERE key = ?", deleted)
+            self.db.executemany(
+                "INSERT INTO entries (key, value) VALUES (?, ?) ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                stored,
+            )
+        self.pending.clear()
+
+    def written(self, key, entry) -> bool:
+        """Is the value of ``entry`` the one stored for it?"""
+        return key not in self.changed and (isinstance(entry[0], IMMUTABLE) or pickle.dumps(entry[0]) == entry[1])
+
+    def flush(self):
+        for key, entry in self.cache.items():
+            if not self.written(key, entry):
+                self.changed.add(key)
+        self.write()
+
+    def close(self):
+        if self.db is not None:
+            self.flush()
+            self.db.close()
+            self.db = None
+
+
+class PersistentDictionary(MutableMapping):
+    """Dictionary kept in the SQLite database file ``path``"""
+
+    def __init__(self, path, items=(), cache_size: int = 10000, batch_size: int = 1000):
+        self.path = path
+        self.cache_size = cache_size
+        self.batch_size = batch_size
+        self._storage = storage = _Storage(path)
+        self._cache, self._changed, self._pending = storage.cache, storage.changed, storage.pending
+        self._write = storage.write
+        finalize(self, storage.close)
+        self.update(items)
+
+    @property
+    def _db(self):
+        return self._storage.db
+
+    @staticmethod
+    def _check(key):
+        if not isinstance(key, KEY_TYPES):
+            raise TypeError(f"keys of a PersistentDictionary must be Integers, Reals, Strings or Bools, not {type(key).__name__}")
+
+    # writing
+
+    def _cached(self, key, entry):
+        self._cache[key] = entry
+        while len(self._cache) > self.cache_size:
+            old, old_entry = self._cache.popitem(last=False)
+            if not self._storage.written(old, old_entry):
+                self._changed.discard(old)
+                self._pending[old] = pickle.dumps(old_entry[0])
+        if len(self._changed) + len(self._pending) >= self.batch_size:
+            self._write()
+
+    def flush(self):
+        """Store every change, including the values in memory which were changed in place"""
+        self._storage.flush()
+
+    def close(self):
+        self._storage.close()
+
+    def __setitem__(self, key, value):
+        self._check(key)
+        self._pending.pop(key, None)
+        self._cache.pop(key, None)
+        self._changed.add(key)
+        self._cached(key, [value, None])
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self._cache.pop(key, None)
+        self._changed.discard(key)
+        self._pending[key] = None
+        if len(self._changed) + len(self._pending) >= self.batch_size:
+            self._write()
+
+    def update(self, other=(), **kwargs):
+        """Add many entries at once, in one transaction"""
+        self._write()
+        pairs = other.items() if isinstance(other, Mapping) else other
+
+        def rows(pairs):
+            for key, value in pairs:
+                self._check(key)
+                self._cache.pop(key, None) # the cached value is out of date
+                yield key, pickle.dumps(value)
+        with self._db:
+            self._db.execute("BEGIN")
+            for pairs in (pairs, kwargs.items()):
+                self._db.executemany(
+                    "INSERT INTO entries (key, value) VALUES (?, ?) ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                    rows(pairs),
+                )
+
+    def clear(self):
+        self._cache.clear()
+        self._changed.clear()
+        self._pending.clear()
+        self._db.execute("DELETE FROM entries")
+
+    # reading
+
+    def __getitem__(self, key):
+        entry = self._cache.get(key)
+        if entry is not None:
+            self._cache.move_to_end(key)
+            return entry[0]
+        if key in self._pending:
+            stored = self._pending[key]
+        else:
+            self._check(key)
+            row = self._db.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            stored = row and row[0]
+        if stored is None:
+            raise KeyError(key)
+        value = pickle.loads(stored)
+        self._cached(key, [value, stored])
+        return value
+
+    def __contains__(self, key):
+        if key in self._cache:
+            return True
+        if key in self._pending:
+            return self._pending[key] is not None
+        if not isinstance(key, KEY_TYPES):
+            return False
+        return self._db.execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone() is not None
+
+    def __len__(self):
+        self._write()
+        return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def _pages(self, columns: str):
+        """The rows of the entries in the order they were added, a page at a time"""
+        last = 0
+        while True:
+            self._write()
+            page = self._db.execute(
+                f"SELECT rowid, {columns} FROM entries WHERE rowid > ? ORDER BY rowid LIMIT ?", (last, PAGE_SIZE)
+            ).fetchall()
+            if not page:
+                return
+            last = page[-1][0]
+            yield page
+
+    def __iter__(self):
+        for page in self._pages("key"):
+            for _, key in page:
+                yield key
+
+    def items(self):
+        """The keys and values, read a page at a time without filling the cache"""
+        for page in self._pages("key, value"):
+            for _, key, stored in page:
+                entry = self._cache.get(key)
+                yield key, entry[0] if entry is not None else pickle.loads(stored)
+
+    def values(self):
+        for _, value in self.items():
+            yield value
+
+    def __repr__(self):
+        return f"PersistentDictionary({self.path!r}, {len(self)} entries)"
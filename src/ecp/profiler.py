@@ -0,0 +1,182 @@
+"""Execution profiles of ECP programs for profile guided optimization.
+
+``python -m ecp --record-profile`` runs a program with counters inserted into
+its SUBROUTINEs and loops and writes what they counted to a JSON file:
+
+* for each SUBROUTINE (by qualified name, e.g. ``Shape.area``) how often it was
+  called and the types of the arguments each parameter received
+* for each loop how often it was entered and how many iterations it ran in
+  total. Loops are named after the SUBROUTINE they are in (``<module>`` for the
+  top level) and their position in it: ``isPrime#1`` is the first loop of
+  isPrime.
+
+Keys are sorted and the file is indented so that profiles can be checked in
+and diffed. ``--use-profile`` loads it into ``Optimizer(profile=...)``.
+"""
+from ast import *
+from typing import *
+import ast
+import json
+import os
+
+VERSION = 1
+PROFILE_NAME = "_ECP_PROFILE"
+
+
+class Profile:
+    def __init__(self, subroutines: dict = None, loops: dict = None):
+        self.subroutines = subroutines or {}
+        self.loops = loops or {}
+
+    # recording, called by the instrumented program
+
+    def register(self, name: str, parameters: List[str], line: int):
+        self.subroutines.setdefault(name, {"calls": 0, "line": line, "arguments": {p: {} for p in parameters}})
+
+    def register_loop(self, name: str, line: int):
+        self.loops.setdefault(name, {"entries": 0, "iterations": 0, "line": line})
+
+    def call(self, name: str, *args):
+        entry = self.subroutines[name]
+        entry["calls"] += 1
+        for types, value in zip(entry["arguments"].values(), args):
+            t = type(value).__name__
+            types[t] = types.get(t, 0) + 1
+
+    def enter(self, name: str):
+        self.loops[name]["entries"] += 1
+
+    def iteration(self, name: str):
+        self.loops[name]["iterations"] += 1
+
+    # reading, used by the optimization passes
+
+    def calls(self, name: str) -> Optional[int]:
+        """How often the SUBROUTINE ``name`` was called, None if it is not in the profile"""
+        entry = self.subroutines.get(name)
+        return None if entry is None else entry["calls"]
+
+    def total_calls(self) -> int:
+        return sum(entry["calls"] for entry in self.subroutines.values())
+
+    def argument_types(self, name: str) -> Dict[str, Dict[str, int]]:
+        entry = self.subroutines.get(name)
+        return {} if entry is None else entry["arguments"]
+
+    def loop(self, name: str) -> Optional[dict]:
+        return self.loops.get(name)
+
+    # storage
+
+    def dumps(self) -> str:
+        return json.dumps({"version": VERSION, "subroutines": self.subroutines, "loops": self.loops}, indent=2, sort_keys=True) + "\n"
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.dumps())
+
+    @classmethod
+    def load(cls, path: str) -> "Profile":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != VERSION:
+            raise ValueError(f"{path}: unsupported profile version {data.get('version')!r}, expected {VERSION}")
+        return cls(data["subroutines"], data["loops"])
+
+
+def default_path(program: str) -> str:
+    """The profile file kept next to ``program``: primes.ecp -> primes.profile.json"""
+    base, _ = os.path.splitext(program)
+    return base + ".profile.json"
+
+
+def _scopes(tree: Module) -> Iterator[Tuple[str, AST]]:
+    """Yield the qualified name and node of the module and every SUBROUTINE in it"""
+    yield "<module>", tree
+    todo = [("", node) for node in tree.body]
+    while todo:
+        prefix, node = todo.pop(0)
+        if isinstance(node, (FunctionDef, AsyncFunctionDef)):
+            yield prefix + node.name, node
+            todo.extend((f"{prefix}{node.name}.", n) for n in node.body)
+        elif isinstance(node, ClassDef):
+            todo.extend((f"{prefix}{node.name}.", n) for n in node.body)
+        else:
+            todo.extend((prefix, n) for n in iter_child_nodes(node))
+
+
+def _scope_loops(scope: AST) -> List[AST]:
+    """The loops of ``scope`` in source order, without the ones of nested SUBROUTINEs"""
+    loops = []
+    def visit(node):
+        for child in iter_child_nodes(node):
+            if isinstance(child, (FunctionDef, AsyncFunctionDef, ClassDef, Lambda)):
+                continue
+            if isinstance(child, (For, While)):
+                loops.append(child)
+            visit(child)
+    visit(scope)
+    return loops
+
+
+def label_nodes(tree: Module) -> Module:
+    """Give every loop and SUBROUTINE of ``tree`` its profile name as ``_ecp_profile``
+
+    The labels are kept when passes move or copy the nodes, so the profile can be
+    matched with the tree after other passes changed it.
+    """
+    for name, scope in _scopes(tree):
+        if scope is not tree:
+            scope._ecp_profile = name
+        for i, loop in enumerate(_scope_loops(scope), 1):
+            loop._ecp_profile = f"{name}#{i}"
+    return tree
+
+
+def _profile_call(method: str, *args) -> Expr:
+    return Expr(value=Call(
+        func=Attribute(value=Name(id=PROFILE_NAME, ctx=Load()), attr=method, ctx=Load()),
+        args=list(args),
+        keywords=[]
+    ))
+
+
+class _Instrumenter(NodeTransformer):
+    def __init__(self, profile: Profile):
+        self.profile = profile
+
+    def _loop(self, node):
+        self.generic_visit(node)
+        name = getattr(node, "_ecp_profile", None)
+        if name is None:
+            return node
+        self.profile.register_loop(name, getattr(node, "lineno", 0))
+        node.body.insert(0, copy_location(_profile_call("iteration", Constant(value=name)), node))
+        return [copy_location(_profile_call("enter", Constant(value=name)), node), node]
+
+    visit_For = visit_While = _loop
+
+    def visit_FunctionDef(self, node):
+        self.generic_visit(node)
+        name = getattr(node, "_ecp_profile", None)
+        if name is None:
+            return node
+        a = node.args
+        parameters = [p.arg for p in a.posonlyargs + a.args + a.kwonlyargs]
+        self.profile.register(name, parameters, getattr(node, "lineno", 0))
+        node.body.insert(0, copy_location(
+            _profile_call("call", Constant(value=name), *[Name(id=p, ctx=Load()) for p in parameters]),
+            node
+        ))
+        return node
+
+
+def instrument(tree: Module, profile: Profile) -> Module:
+    """Insert the counters recording into ``profile`` into ``tree``.
+
+    The program has to run with ``profile`` as ``_ECP_PROFILE``.
+    """
+    label_nodes(tree)
+    tree = _Instrumenter(profile).visit(tree)
+    return fix_missing_locations(tree)
+
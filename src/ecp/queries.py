@@ -0,0 +1,232 @@
+"""Queries over Arrays of RECORDs, answered from indexes.
+
+Looking a record up by one of its fields is usually a FOR loop over the whole
+Array. These builtins do it instead:
+
+* FIND_BY(cars, "make", "Ford") returns the first record whose make is "Ford",
+  or None.
+* WHERE(cars, "make", "Ford") returns an Array of every such record, and
+  WHERE(cars, "price", "<", 2000) compares with ``=``, ``!=``, ``<``, ``<=``,
+  ``>`` or ``>=``. WHERE(cars, test) keeps the records for which the SUBROUTINE
+  test returns True.
+* ORDER_BY(cars, "price") returns a sorted copy, stable like SORT_BY.
+* GROUP_BY(cars, "make") returns a Dictionary from each make to an Array of its
+  records.
+
+A field can also be a list of field names, compared as a list of values. The
+results keep the order of the Array. For a RecordArray they are RecordArrays
+and rows.
+
+The first query on a field builds an index over it: a Dictionary from each
+value to the positions holding it (for ``=``, FIND_BY and GROUP_BY) or the
+positions sorted by the field (for comparisons and ORDER_BY). Later queries
+use it, so a lookup takes O(1) and a comparison O(log n) plus the records
+returned. Setting an indexed field of a record of that RECORD type (e.g.
+``car.price := 10``) makes the indexes over it out of date, and the next query
+builds them again.
+
+For a RecordArray the indexes are dropped when it changes. For an Array,
+queries check that it holds the same records as when the index was built.
+This check is a comparison of two lists done in C, which is much faster than
+a loop in ECP but still touches every position. Indexes are kept for the
+INDEXED_ARRAYS Arrays queried most recently. Other Arrays (e.g. of
+Dictionaries, or of several types of records) are searched without an index.
+"""
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from itertools import compress
+from operator import eq, ne
+from types import MemberDescriptorType
+from typing import *
+from .columns import RecordArray
+from .stdlib import _key
+
+__all__ = ["WHERE", "ORDER_BY", "GROUP_BY", "FIND_BY"]
+
+INDEXED_ARRAYS = 8 # number of Arrays whose indexes are kept
+
+
+def _watch(record: type, field: str) -> Optional[dict]:
+    """Count the changes of ``field`` of the records of ``record``, in the
+    Dictionary returned. None for CONSTANT RECORDs, which can not change.
+
+    Only setting fields is slowed down: reading them still uses the slots.
+    """
+    if hasattr(record, "_fields"):
+        return None
+    if not isinstance(record.__dict__.get(field), MemberDescriptorType):
+        raise AttributeError(f"{record.__name__} has no field {field!r}")
+    changes = record.__dict__.get("_ecp_changes")
+    if changes is None:
+        changes = {}
+        set = object.__setattr__
+
+        def __setattr__(self, name, value):
+            if name in changes:
+                changes[name] += 1
+            set(self, name, value)
+        record._ecp_changes = changes
+        record.__setattr__ = __setattr__
+    changes.setdefault(field, 0)
+    return changes
+
+
+def _names(field) -> tuple:
+    return (field,) if isinstance(field, str) else tuple(field)
+
+
+def _value(field, value):
+    """``value`` as it is compared with the key of ``field``"""
+    return value if isinstance(field, str) else tuple(value)
+
+
+class _Indexes:
+    """The indexes built over the records of one Array or RecordArray"""
+
+    def __init__(self, array, cached: bool = True):
+        self.array = array
+        self.columns = isinstance(array, RecordArray)
+        # the records the positions of the indexes refer to
+        self.records = array if self.columns else list(array)
+        self.cached = cached
+        self.built = {}
+
+    def keys(self, field) -> Sequence:
+        """The key of ``field`` of every record"""
+        if self.columns:
+            columns = [self.array._column(name) for name in _names(field)]
+            return columns[0] if isinstance(field, str) else list(zip(*columns))
+        keys = [list(map(_key(name, self.records), self.records)) for name in _names(field)]
+        return keys[0] if isinstance(field, str) else list(zip(*keys))
+
+    def _index(self, kind: str, field, build: Callable):
+        names = _names(field)
+        if not self.cached:
+            return build(self.keys(field))
+        changes = ()
+        if not self.columns:
+            counts = [_watch(type(self.records[0]), name) for name in names]
+            changes = tuple(c[name] for c, name in zip(counts, names) if c is not None)
+        key = (kind, names)
+        if key in self.built and self.built[key][0] == changes:
+            return self.built[key][1]
+        index = build(self.keys(field))
+        self.built[key] = (changes, index)
+        return index
+
+    def groups(self, field) -> Dict[Any, List[int]]:
+        """Dictionary from each value of ``field`` to the positions holding it"""
+        def build(keys):
+            groups = {}
+            for i, key in enumerate(keys):
+                positions = groups.get(key)
+                if positions is None:
+                    groups[key] = [i]
+                else:
+                    positions.append(i)
+            return groups
+        return self._index("hash", field, build)
+
+    def order(self, field, reverse: bool = False) -> Tuple[list, List[int]]:
+        """The positions sorted by ``field``, and their keys in that order"""
+        def build(keys):
+            order = sorted(range(len(keys)), key=keys.__getitem__, reverse=reverse)
+            return [keys[i] for i in order], order
+        return self._index("reversed" if reverse else "sorted", field, build)
+
+    def take(self, positions: List[int]):
+        if self.columns:
+            return self.array._take(positions)
+        return [self.array[i] for i in positions]
+
+
+_cache = OrderedDict() # id of an Array: its _Indexes
+
+
+def _indexes(array) -> _Indexes:
+    if isinstance(array, RecordArray):
+        if array._indexes is None:
+            array._indexes = _Indexes(array)
+        return array._indexes
+    indexes = _cache.get(id(array))
+    # same records in the same places: equal records of a RECORD type have the same fields
+    if indexes is not None and indexes.array is array and indexes.records == array:
+        _cache.move_to_end(id(array))
+        return indexes
+    _cache.pop(id(array), None)
+    record = type(array[0]) if len(array) else None
+    if record is None or type(array) is not list or not hasattr(record, "_fields") and not hasattr(record, "_ecp_values") \
+            or not all(type(r) is record for r in array):
+        return _Indexes(array, cached=False)
+    indexes = _cache[id(array)] = _Indexes(array)
+    if len(_cache) > INDEXED_ARRAYS:
+        _cache.popitem(last=False)
+    return indexes
+
+
+def _equal(indexes: _Indexes, field, value) -> List[int]:
+    value = _value(field, value)
+    try:
+        return indexes.groups(field).get(value, [])
+    except TypeError: # values which can not be put in a Dictionary, e.g. Arrays
+        return list(compress(range(len(indexes.records)), map(eq, indexes.keys(field), [value] * len(indexes.records))))
+
+
+# positions of the sorted keys which compare to a value with an operator
+_RANGES = {
+    "<": lambda keys, value: (0, bisect_left(keys, value)),
+    "<=": lambda keys, value: (0, bisect_right(keys, value)),
+    ">": lambda keys, value: (bisect_right(keys, value), len(keys)),
+    ">=": lambda keys, value: (bisect_left(keys, value), len(keys)),
+}
+
+
+def WHERE(array, field, *condition):
+    """The records whose ``field`` equals a value, or compares to it with an
+    operator (e.g. WHERE(cars, "price", "<", 2000)). WHERE(array, test) keeps the
+    records for which the SUBROUTINE ``test`` returns True."""
+    indexes = _indexes(array)
+    if callable(field) and not condition:
+        return indexes.take(list(compress(range(len(indexes.records)), map(field, indexes.records))))
+    if len(condition) == 1:
+        return indexes.take(_equal(indexes, field, condition[0]))
+    if len(condition) != 2:
+        raise TypeError("WHERE takes a field and a value, or a field, an operator and a value")
+    operator, value = condition
+    value = _value(field, value)
+    if operator == "=":
+        return indexes.take(_equal(indexes, field, value))
+    if operator == "!=":
+        keys = indexes.keys(field)
+        return indexes.take(list(compress(range(len(keys)), map(ne, keys, [value] * len(keys)))))
+    if operator not in _RANGES:
+        raise ValueError(f"unknown operator {operator!r}, expected one of =, !=, <, <=, >, >=")
+    keys, order = indexes.order(field)
+    start, stop = _RANGES[operator](keys, value)
+    return indexes.take(sorted(order[start:stop]))
+
+
+def FIND_BY(array, field, value):
+    """The first record whose ``field`` equals ``value``, or None"""
+    indexes = _indexes(array)
+    positions = _equal(indexes, field, value)
+    if not positions:
+        return None
+    return array[positions[0]]
+
+
+def ORDER_BY(array, field, reverse: bool = False):
+    """Copy of ``array`` sorted by ``field``, keeping the order of equal records"""
+    indexes = _indexes(array)
+    keys, order = indexes.order(field, reverse)
+    return indexes.take(order)
+
+
+def GROUP_BY(array, field) -> dict:
+    """Dictionary from each value of ``field`` to an Array of the records with it"""
+    indexes = _indexes(array)
+    try:
+        groups = indexes.groups(field)
+    except TypeError:
+        raise TypeError("GROUP_BY needs values which can be keys of a Dictionary") from None
+    return {key: indexes.take(positions) for key, positions in groups.items()}
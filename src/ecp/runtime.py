@@ -0,0 +1,890 @@
+"""The environment ECP programs run in: builtins available to every program.
+
+This module must not import the parser so that precompiled programs can run without it.
+"""
+from codecs import getincrementaldecoder
+from collections import deque, namedtuple
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache, partial, total_ordering, update_wrapper
+from io import BufferedIOBase, RawIOBase
+from math import sqrt
+from operator import attrgetter
+from os import PathLike
+from random import randint
+from types import CodeType, MethodType
+from typing import Optional
+from weakref import finalize
+import atexit
+import os
+import re
+import sys
+from importlib import import_module
+from .stdlib import *
+
+# builtins of the modules which are only imported once a program uses them
+# (PersistentDictionary loads sqlite3 and pickle): name -> module
+LAZY_BUILTINS = {
+    **dict.fromkeys(["NumberRow", "ARRAY2D", "ARRAYND", "TO_ARRAY", "FILL", "COPY", "COLUMN", "MATRIX_MULTIPLY"], "arrays"),
+    **dict.fromkeys(["RecordArray", "RecordRow"], "columns"),
+    **dict.fromkeys(["WHERE", "ORDER_BY", "GROUP_BY", "FIND_BY"], "queries"),
+    "PersistentDictionary": "persistent",
+}
+
+def __getattr__(name):
+    module = LAZY_BUILTINS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = globals()[name] = getattr(import_module(f".{module}", __package__), name)
+    return value
+
+def load_builtins(code, scope: dict):
+    """Add the lazily imported builtins which ``code`` (and the functions it
+    defines) refers to to ``scope``, the globals it runs in"""
+    todo = [code]
+    while todo:
+        code = todo.pop()
+        for name in LAZY_BUILTINS.keys() & code.co_names:
+            if name not in scope:
+                scope[name] = globals()[name] if name in globals() else __getattr__(name)
+        todo.extend(c for c in code.co_consts if isinstance(c, CodeType))
+
+
+class Namespace:
+    def __init__(self, **kwargs) -> None:
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+    def __getattr__(self, name):
+        # the lazily imported builtins, which every program can use
+        if name in LAZY_BUILTINS:
+            return getattr(sys.modules[__name__], name)
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+
+class EcpRecord:
+    """Base class of RECORD types.
+
+    Records keep their fields in ``__slots__`` and compare, hash and print by value.
+    """
+    __slots__ = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # _ecp_values(record) returns the tuple of field values
+        fields = cls.__slots__
+        if len(fields) == 0:
+            values = lambda record: ()
+        elif len(fields) == 1:
+            get = attrgetter(fields[0])
+            values = lambda record: (get(record),)
+        else:
+            values = attrgetter(*fields)
+        cls._ecp_values = staticmethod(values)
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._ecp_values(self) == other._ecp_values(other)
+
+    def __hash__(self):
+        return hash(self._ecp_values(self))
+
+    def __repr__(self):
+        values = ", ".join(f"{f}={v!r}" for f, v in zip(self.__slots__, self._ecp_values(self)))
+        return f"{type(self).__name__}({values})"
+
+def EcpTupleRecord(name: str, fields: tuple, types: dict = None):
+    """Create the type of a CONSTANT RECORD: an immutable record stored as a tuple"""
+    record = namedtuple(name, fields)
+    record.__annotations__ = dict(types or {})
+    return record
+
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize", "uncached"])
+
+EVICTION_POLICIES = ("LRU", "FIFO")
+
+_KWARGS = object() # separates positional and keyword arguments in cache keys
+
+def _fifo_cache(function, maxsize: int):
+    """Like functools.lru_cache, but drops the result computed first when full"""
+    results = {}
+    hits = misses = 0
+
+    def cached(*args, **kwargs):
+        nonlocal hits, misses
+        # typed like lru_cache(typed=True): 1, 1.0 and True are different arguments
+        key = args + tuple(map(type, args))
+        if kwargs:
+            key += (_KWARGS,) + tuple(kwargs.items()) + tuple(map(type, kwargs.values()))
+        try:
+            result = results[key]
+        except KeyError:
+            pass
+        else:
+            hits += 1
+            return result
+        misses += 1
+        result = function(*args, **kwargs)
+        if len(results) >= maxsize:
+            if maxsize == 0:
+                return result
+            del results[next(iter(results))]
+        results[key] = result
+        return result
+
+    def cache_clear():
+        nonlocal hits, misses
+        results.clear()
+        hits = misses = 0
+
+    cached.cache_info = lambda: (hits, misses, maxsize, len(results))
+    cached.cache_clear = cache_clear
+    return cached
+
+_SCALARS = (int, float, str, bool, type(None))
+
+def _immutable(value) -> bool:
+    """Is ``value`` a number, String, Bool, None or a tuple of them?"""
+    return type(value) in _SCALARS or isinstance(value, tuple) and all(map(_immutable, value))
+
+class _CachedSubroutine:
+    """A SUBROUTINE which remembers its results for the arguments it was called with.
+
+    Calls with arguments which can not be hashed (arrays, dictionaries...) are
+    not cached and counted as ``uncached``, as are calls with any argument which
+    is not ``_immutable`` if ``immutable_arguments`` is set.
+    """
+    def __init__(self, function, maxsize, eviction, immutable_arguments=False):
+        update_wrapper(self, function)
+        self._function = function
+        self._immutable_arguments = immutable_arguments
+        if eviction == "LRU" or maxsize is None:
+            self._cached = lru_cache(maxsize, typed=True)(function)
+        else:
+            self._cached = _fifo_cache(function, maxsize)
+        self.uncached = 0
+
+    def __call__(self, *args, **kwargs):
+        if self._immutable_arguments and not (all(map(_immutable, args)) and all(map(_immutable, kwargs.values()))):
+            self.uncached += 1
+            return self._function(*args, **kwargs)
+        try:
+            return self._cached(*args, **kwargs)
+        except TypeError:
+            try:
+                hash((args, tuple(kwargs.values())))
+            except TypeError:
+                # unhashable arguments: the cache could not be used
+                self.uncached += 1
+                return self._function(*args, **kwargs)
+            raise
+
+    def __get__(self, instance, owner=None):
+        # CACHED SUBROUTINEs of a CLASS are methods
+        return self if instance is None else MethodType(self, instance)
+
+    def cache_info(self) -> CacheInfo:
+        return CacheInfo(*self._cached.cache_info(), self.uncached)
+
+    def cache_clear(self):
+        self._cached.cache_clear()
+        self.uncached = 0
+
+    def __repr__(self):
+        return f"<cached subroutine {self.__name__}>"
+
+def EcpCached(maxsize: int = 128, eviction: str = "LRU", immutable_arguments: bool = False):
+    """Decorator of ``CACHED(maxsize, eviction) SUBROUTINE``.
+
+    ``maxsize`` is the number of results kept (None for no limit); when it is
+    reached the ``eviction`` policy picks the result which is dropped: the least
+    recently used one ("LRU") or the first one computed ("FIFO").
+    """
+    if maxsize is not None and (not isinstance(maxsize, int) or maxsize < 0):
+        raise ValueError(f"CACHED size must be a positive Integer or None, not {maxsize!r}")
+    if eviction not in EVICTION_POLICIES:
+        raise ValueError(f"CACHED eviction must be one of {', '.join(EVICTION_POLICIES)}, not {eviction!r}")
+    return partial(_CachedSubroutine, maxsize=maxsize, eviction=eviction, immutable_arguments=immutable_arguments)
+
+def CACHE_INFO(subroutine) -> CacheInfo:
+    """Hit and miss statistics of a CACHED SUBROUTINE"""
+    return subroutine.cache_info()
+
+
+DEFAULT_OUTPUT_BUFFER = 1 << 16 # characters
+
+# formats of the OUTPUT of several values, "%s" formats with str like print does
+_OUTPUT_FORMATS = [" ".join(["%s"] * n) for n in range(9)]
+
+class EcpOutput:
+    """The writer behind OUTPUT: prints its values like print, but buffered.
+
+    Output is collected and written to ``stream`` (sys.stdout at the time of
+    writing if None; text or binary) once ``buffer_size`` characters are waiting,
+    ``interval`` seconds after an OUTPUT which is still waiting (None: never; a
+    timer thread writes it), when the program asks for input or ends. A
+    buffer_size of 0 writes every OUTPUT immediately, as does writing to a
+    terminal.
+
+    ``write`` is the OUTPUT function; calling the EcpOutput does the same.
+    """
+    def __init__(self, stream=None, buffer_size: int = DEFAULT_OUTPUT_BUFFER, interval: Optional[float] = None, encoding: str = "utf-8"):
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self.interval = interval
+        self.encoding = encoding
+        if interval is None:
+            self.lock = nullcontext()
+        else:
+            from threading import RLock
+            self.lock = RLock() # held while the output is changed or written
+        self.write, self.flush = self._writer()
+
+    def _writer(self):
+        # the state is kept in closures, which are faster to call than methods.
+        # They do not refer to self, so that a finalizer can flush an EcpOutput
+        # which is no longer used.
+        output, buffer_size, encoding, interval = self.stream, self.buffer_size, self.encoding, self.interval
+        lines = []
+        append = lines.append
+        size = 0
+        limit = 0 # the first OUTPUT finds out whether the stream is a terminal
+
+        def flush():
+            nonlocal size, limit
+            if not lines:
+                return
+            stream = sys.stdout if output is None else output
+            append("")
+            data = "\n".join(lines)
+            lines.clear()
+            size = 0
+            if isinstance(stream, (RawIOBase, BufferedIOBase)):
+                stream.write(data.encode(encoding))
+            else:
+                stream.write(data)
+            stream.flush()
+            isatty = getattr(stream, "isatty", None)
+            limit = 0 if isatty is not None and isatty() else buffer_size
+
+        def write(*values):
+            nonlocal size
+            if len(values) == 1:
+                value = values[0]
+                text = value if type(value) is str else str(value)
+            elif len(values) < len(_OUTPUT_FORMATS):
+                text = _OUTPUT_FORMATS[len(values)] % values
+            else:
+                text = " ".join([str(value) for value in values])
+            append(text)
+            size += len(text) + 1
+            if size >= limit:
+                flush()
+
+        if interval is None:
+            return write, flush
+
+        from threading import Timer
+        lock = self.lock
+        timer = None
+
+        def flush_later():
+            nonlocal timer
+            with lock:
+                timer = None
+                flush()
+
+        def timed_write(*values):
+            nonlocal timer
+            with lock:
+                write(*values)
+                if lines and timer is None:
+                    timer = Timer(interval, flush_later)
+                    timer.daemon = True
+                    timer.start()
+
+        def locked_flush():
+            with lock:
+                flush()
+
+        return timed_write, locked_flush
+
+    def __call__(self, *values):
+        self.write(*values)
+
+    @contextmanager
+    def ordered_stdout(self):
+        """Write the pending OUTPUT before anything else is written to sys.stdout
+        (print in PY code or python modules) in the with block"""
+        stdout = sys.stdout
+        if self.stream is not None or isinstance(stdout, _OrderedStdout) and stdout.output is self:
+            yield
+            return
+        ordered = sys.stdout = _OrderedStdout(stdout, self)
+        try:
+            yield
+        finally:
+            if sys.stdout is ordered:
+                sys.stdout = stdout
+
+    def close(self):
+        """Write the pending output and close the stream"""
+        self.flush()
+        if self.stream is not None:
+            self.stream.close()
+
+    def __repr__(self):
+        return f"<ECP output buffer_size={self.buffer_size} interval={self.interval}>"
+
+
+class _OrderedStdout:
+    """Stands in for sys.stdout while the OUTPUT of ``output`` is waiting to be written to it"""
+    def __init__(self, stream, output: EcpOutput):
+        self.stream = stream
+        self.output = output
+
+    def write(self, text: str) -> int:
+        with self.output.lock:
+            self.output.flush()
+            return self.stream.write(text)
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+INPUT_BLOCK = 1 << 16 # bytes read from stdin at once
+
+_FIELD = re.compile(r"\S+")
+
+class EcpInput:
+    """The reader behind USERINPUT and the other input builtins.
+
+    ``source`` is the input of the program: a list of lines, the whole input as
+    str or bytes, a text or binary file, or None for sys.stdin at the time of
+    the first read. Binary streams are read in blocks of INPUT_BLOCK and text
+    streams a line at a time, and the input is served as lines (``input``) or
+    whitespace separated fields (``read_int``, ``read_ints``, ``read_field``),
+    which can span lines.
+
+    Pending OUTPUT of ``output`` is written before each read.
+    """
+    def __init__(self, source=None, output: "EcpOutput" = None, encoding: str = "utf-8"):
+        self.source = source
+        self.output = output
+        self.encoding = encoding
+        self._text = ""
+        self._pos = 0
+        self._read = None # returns the next block of text, "" at the end
+        # blocks are whole lines, so the fields in the text are never cut off
+        self._lines = not isinstance(source, (RawIOBase, BufferedIOBase))
+        self._stdin = self._tty = None # the stdin last checked by _interactive, and whether it is a terminal
+        if isinstance(source, (list, tuple)):
+            self._text = "".join(f"{line}\n" for line in source)
+        elif isinstance(source, (bytes, bytearray, memoryview)):
+            self._text = bytes(source).decode(encoding)
+        elif isinstance(source, str):
+            self._text = source
+        elif source is not None:
+            self._read = self._reader(source)
+        if self._read is None and source is not None:
+            self._read = lambda: ""
+
+    def _reader(self, stream):
+        if not isinstance(stream, (RawIOBase, BufferedIOBase)):
+            # text streams (sys.stdin) are read a line at a time through the text
+            # layer, so that input() in PY code gets the lines which follow
+            return stream.readline
+        read = getattr(stream, "read1", stream.read) # read1 does not wait for a whole block from pipes
+        decode = getincrementaldecoder(self.encoding)().decode
+        def read_block():
+            data = read(INPUT_BLOCK)
+            return decode(data, final=not data)
+        return read_block
+
+    def _interactive(self) -> bool:
+        """Is the program reading the lines of a terminal on stdin?"""
+        if self.source is not None:
+            return False
+        stdin = sys.stdin
+        if stdin is not self._stdin: # isatty is a system call, so it is asked once per stream
+            isatty = getattr(stdin, "isatty", None)
+            self._stdin, self._tty = stdin, isatty is not None and isatty()
+        return self._tty
+
+    def _next(self) -> str:
+        """Read the next block of input, "" at the end of the input"""
+        if self._read is None:
+            self._read = self._reader(sys.stdin)
+        if self.output is not None:
+            self.output.flush()
+        return self._read()
+
+    def _fill(self) -> bool:
+        """Add the next block of input to the text, False at the end of the input"""
+        block = self._next()
+        if not block:
+            self._read = lambda: ""
+            return False
+        self._text = self._text[self._pos:] + block
+        self._pos = 0
+        return True
+
+    def input(self, prompt: str = "") -> str:
+        """The next line of input without its line break, like input()"""
+        if self.output is not None:
+            self.output.flush()
+        if self._pos == len(self._text) and self._interactive():
+            return input(prompt) # keeps line editing
+        if prompt:
+            sys.stdout.write(prompt)
+            sys.stdout.flush()
+        if self._pos == len(self._text) and self._lines:
+            line = self._next()
+            if not line:
+                raise EOFError("no more input")
+            if line[-1:] == "\n":
+                line = line[:-1]
+            return line[:-1] if line[-1:] == "\r" else line
+        while True:
+            end = self._text.find("\n", self._pos)
+            if end >= 0:
+                line = self._text[self._pos:end]
+                self._pos = end + 1
+                return line[:-1] if line.endswith("\r") else line
+            if not self._fill():
+                if self._pos == len(self._text):
+                    raise EOFError("no more input")
+                line = self._text[self._pos:]
+                self._pos = len(self._text)
+                return line
+
+    def read_field(self) -> str:
+        """The next whitespace separated field of input"""
+        while True:
+            match = _FIELD.search(self._text, self._pos)
+            # a field at the end of a block of bytes can continue in the next one
+            if match is not None and (match.end() < len(self._text) or self._lines):
+                self._pos = match.end()
+                return match.group()
+            if not self._fill():
+                if match is None:
+                    self._pos = len(self._text)
+                    raise EOFError("no more input")
+                self._pos = match.end()
+                return match.group()
+
+    def read_int(self) -> int:
+        """The next field of input as an Integer"""
+        if self._pos == len(self._text) and self._lines:
+            line = self._next()
+            try:
+                return int(line) # a line holding one Integer
+            except ValueError:
+                self._text, self._pos = line, 0
+        return int(self.read_field())
+
+    def read_ints(self, n: int) -> list:
+        """The next ``n`` fields of input as an array of Integers"""
+        if n < 64:
+            return [self.read_int() for _ in range(n)]
+        values = []
+        while len(values) < n:
+            # split the fields of the block which are certainly complete at once
+            text, wanted = self._text, n - len(values)
+            end = len(text)
+            if not self._lines:
+                while end > self._pos and not text[end - 1].isspace():
+                    end -= 1
+            fields = text[self._pos:end].split(None, wanted) if end > self._pos else []
+            if len(fields) > wanted:
+                self._pos = end - len(fields.pop())
+            else:
+                self._pos = end
+            values.extend(map(int, fields))
+            if len(values) < n and self._lines and self._pos == len(self._text):
+                # a line at a time, without building up the text
+                line = self._next()
+                while line:
+                    fields = line.split()
+                    if len(values) + len(fields) > n:
+                        self._text, self._pos = line, 0
+                        break
+                    values.extend(map(int, fields))
+                    if len(values) == n:
+                        break
+                    line = self._next()
+                else:
+                    self._read = lambda: ""
+                    values.append(self.read_int()) # EOFError
+                continue
+            if len(values) < n and not self._fill():
+                values.append(self.read_int()) # the last field, or EOFError
+        return values
+
+
+# STRINGS
+
+class StringBuilder:
+    """A String built from pieces in time linear in its length.
+
+    ``s := s + x`` copies s every time, so building a String of n pieces that way
+    takes time quadratic in n. ``append`` only adds the String x to a list; the
+    pieces are joined when the String is needed (str(), OUTPUT, LEN...) and kept
+    as a single piece until the next append. The ``strings`` optimization pass
+    rewrites loops building a String with ``s := s + x`` to use a StringBuilder.
+    """
+    __slots__ = ("_parts", "append")
+
+    def __init__(self, string: str = ""):
+        self._parts = [string if type(string) is str else str(string)]
+        self.append = self._parts.append
+
+    def extend(self, strings):
+        self._parts.extend(strings)
+
+    def clear(self):
+        self._parts[:] = [""]
+
+    def view(self, start: int = 0, stop: int = None) -> "StringView":
+        return StringView(str(self), start, stop)
+
+    def __str__(self) -> str:
+        parts = self._parts
+        if len(parts) != 1:
+            parts[:] = ["".join(parts)]
+        return parts[0]
+
+    def __len__(self) -> int:
+        return len(str(self))
+
+    def __repr__(self):
+        return f"StringBuilder({str(self)!r})"
+
+
+@total_ordering
+class StringView:
+    """Part of a String which is not copied out of it.
+
+    Searching a view (POSITION, IN, find, startswith), comparing it with a String
+    and taking characters or smaller views out of it work on the String it was
+    taken from. The part is only copied when a String is needed, e.g. when the
+    view is concatenated or OUTPUT, and the copy is kept. Views can not be
+    changed; a view of a StringBuilder keeps the String built so far when more
+    is appended.
+    """
+    __slots__ = ("_string", "_start", "_stop", "_value")
+
+    def __init__(self, string, start: int = 0, stop: int = None):
+        if isinstance(string, StringView):
+            offset = string._start
+            start, stop, _ = slice(start, stop).indices(len(string))
+            string, start, stop = string._string, offset + start, offset + max(start, stop)
+        else:
+            string = string if type(string) is str else str(string)
+            start, stop, _ = slice(start, stop).indices(len(string))
+            stop = max(start, stop)
+        self._string = string
+        self._start = start
+        self._stop = stop
+        self._value = string if start == 0 and stop == len(string) else None
+
+    def __str__(self) -> str:
+        if self._value is None:
+            self._value = self._string[self._start:self._stop]
+        return self._value
+
+    def __repr__(self):
+        return f"StringView({str(self)!r})"
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self._stop - self._start)
+            if step == 1:
+                return StringView(self._string, self._start + start, self._start + max(start, stop))
+            return str(self)[key]
+        if key < 0:
+            key += self._stop - self._start
+        if not 0 <= key < self._stop - self._start:
+            raise IndexError("string index out of range")
+        return self._string[self._start + key]
+
+    def __iter__(self):
+        return map(self._string.__getitem__, range(self._start, self._stop))
+
+    def find(self, sub: str) -> int:
+        i = self._string.find(sub if type(sub) is str else str(sub), self._start, self._stop)
+        return i if i == -1 else i - self._start
+
+    def __contains__(self, sub) -> bool:
+        return self.find(sub) != -1
+
+    def startswith(self, prefix: str) -> bool:
+        return self._string.startswith(prefix, self._start, self._stop)
+
+    def endswith(self, suffix: str) -> bool:
+        return self._string.endswith(suffix, self._start, self._stop)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, StringView):
+            other = str(other)
+        elif type(other) is not str:
+            return NotImplemented
+        return len(other) == self._stop - self._start and self._string.startswith(other, self._start, self._stop)
+
+    def __lt__(self, other) -> bool:
+        if isinstance(other, (str, StringView)):
+            return str(self) < str(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def __add__(self, other) -> str:
+        return str(self) + (str(other) if isinstance(other, StringView) else other)
+
+    def __radd__(self, other) -> str:
+        return other + str(self)
+
+    def __bool__(self) -> bool:
+        return self._stop > self._start
+
+
+# COLLECTIONS
+
+class QUEUE(deque):
+    """First in, first out. enqueue and dequeue take constant time, unlike
+    removing the first value of an Array with pop(0). QUEUE(values, maxlen)
+    starts with ``values``; a full queue drops its oldest value on enqueue."""
+    __slots__ = ()
+    enqueue = deque.append
+    dequeue = deque.popleft
+
+    def peek(self):
+        return self[0]
+
+    def isEmpty(self) -> bool:
+        return not self
+
+    def isFull(self) -> bool:
+        return self.maxlen is not None and len(self) == self.maxlen
+
+    def size(self) -> int:
+        return len(self)
+
+
+class STACK(deque):
+    """Last in, first out, with push, pop and peek at the top."""
+    __slots__ = ()
+    push = deque.append
+
+    def peek(self):
+        return self[-1]
+
+    isEmpty = QUEUE.isEmpty
+    isFull = QUEUE.isFull
+    size = QUEUE.size
+
+
+class SET(set):
+    """Values without duplicates. ``x IN s`` takes constant time instead of
+    searching an Array. SET(values) removes the duplicates of ``values``."""
+    __slots__ = ()
+
+    def isEmpty(self) -> bool:
+        return not self
+
+    size = QUEUE.size
+
+
+# ECP BUILTINS
+
+# used by programs which are not run by ecp()
+_STANDARD_OUTPUT = EcpOutput()
+_STANDARD_INPUT = EcpInput(output=_STANDARD_OUTPUT)
+atexit.register(_STANDARD_OUTPUT.flush)
+OUTPUT = _MAGIC_OUTPUT = _STANDARD_OUTPUT.write
+USERINPUT = INPUT = _MAGIC_USERINPUT = _STANDARD_INPUT.input
+USERINPUT_INT = _STANDARD_INPUT.read_int
+READ_INTS = _STANDARD_INPUT.read_ints
+READ_FIELD = _STANDARD_INPUT.read_field
+LEN = len
+Integer = int
+Int = int
+Real = float
+Bool = bool
+String = str
+Array = list
+Dictionary = dict
+
+def POSITION(string: str, to_match: str) -> int:
+    try:
+        return string.find(to_match)
+    except (AttributeError, TypeError):
+        if isinstance(to_match, StringView):
+            return POSITION(string, str(to_match))
+        # Arrays have no find
+        try:
+            return string.index(to_match)
+        except:
+            return -1
+
+def SUBSTRING(start: int, end: int, string: str):
+    return string[start:end+1]
+
+def SUBSTRING_VIEW(start: int, end: int, string: str) -> StringView:
+    """SUBSTRING without copying the characters, see StringView"""
+    return StringView(string, start, end + 1)
+
+STRING_TO_INT = int
+STRING_TO_REAL = float
+INT_TO_STRING = REAL_TO_STRING = str
+CHAR_TO_CODE = ord
+CODE_TO_CHAR = chr
+RANDOM_INT = randint
+SQRT = sqrt
+
+@lru_cache(maxsize=256)
+def _compile_py(source: str):
+    return compile(source, "<PY>", "exec")
+
+def PY(code, globals=None, locals=None):
+    """Run python code like exec, in the scope PY is called from"""
+    if isinstance(code, str):
+        code = _compile_py(code)
+    if globals is None:
+        frame = sys._getframe(1)
+        globals = frame.f_globals
+        if locals is None:
+            locals = frame.f_locals
+    load_builtins(code, globals)
+    exec(code, globals, locals)
+
+
+# FILES
+
+MMAP_THRESHOLD = 1 << 20 # bytes, READ_ALL maps larger files instead of reading them
+
+def _open_text(source, newline=None):
+    """Open ``source`` (a path, or a file which is used as it is) for reading text"""
+    if isinstance(source, (str, bytes, PathLike)):
+        return open(source, encoding="utf-8", newline=newline)
+    return nullcontext(source)
+
+def OPEN_READ(path):
+    """Open a text file for READ_LINE, READ_LINES, READ_ALL and READ_CSV"""
+    return open(path, encoding="utf-8")
+
+def OPEN_WRITE(path, append: bool = False) -> EcpOutput:
+    """Open a file for WRITE_LINE, which writes in large blocks. CLOSE it to write the rest"""
+    file = open(path, "ab" if append else "wb")
+    writer = EcpOutput(file)
+    # files which are not closed are completed once the program no longer
+    # uses them, or when python exits
+    finalize(writer, _complete, writer.flush, file)
+    return writer
+
+def _complete(flush, file):
+    flush()
+    file.close()
+
+def WRITE_LINE(file: EcpOutput, *values):
+    """Write the values to ``file`` like OUTPUT writes them"""
+    file.write(*values)
+
+def CLOSE(file):
+    file.close()
+
+def READ_LINE(file):
+    """The next line of an opened file without its line break, None at the end of the file"""
+    line = file.readline()
+    if not line:
+        return None
+    return line[:-1] if line[-1] == "\n" else line
+
+def READ_LINES(source):
+    """The lines of a file without their line breaks, read while a FOR loop goes through them
+
+    Only one block of the file is in memory at a time. A file opened from a path
+    is closed at the end.
+    """
+    with _open_text(source) as f:
+        rest = ""
+        # splitting whole blocks is faster than reading line by line
+        for block in iter(partial(f.read, INPUT_BLOCK), ""):
+            lines = (rest + block).split("\n")
+            rest = lines.pop()
+            yield from lines
+        if rest:
+            yield rest
+
+def READ_ALL(source) -> str:
+    """The whole text of a file, as one String
+
+    The text has to fit in memory: READ_LINES goes through a large file a block
+    at a time instead. Large files are decoded directly from a memory map of the
+    file, so their bytes are not read into a buffer as well.
+    """
+    if not isinstance(source, (str, bytes, PathLike)):
+        return source.read()
+    with open(source, "rb") as f:
+        if os.fstat(f.fileno()).st_size < MMAP_THRESHOLD:
+            text = f.read().decode("utf-8")
+        else:
+            import mmap
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                text = str(m, "utf-8")
+    if "\r" in text: # universal newlines, as when reading the file as text
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+def _csv_bool(value: str) -> bool:
+    if value in ("True", "true", "1"):
+        return True
+    if value in ("False", "false", "0", ""):
+        return False
+    raise ValueError(f"invalid Bool: {value!r}")
+
+# conversions of CSV fields into the types of RECORD fields
+CSV_TYPES = {"Integer": int, "Int": int, "Real": float, "String": str, "Bool": _csv_bool}
+
+def READ_CSV(source, record=None, header: bool = True, delimiter: str = ","):
+    """The rows of a CSV file, read while a FOR loop goes through them
+
+    Without ``record`` each row is an array of strings. With a RECORD type each
+    row becomes a record; its fields are matched with the columns of the header
+    by name (or taken in order if there is no header) and converted to the
+    types the RECORD declares.
+    """
+    import csv
+    with _open_text(source, newline="") as f:
+        rows = csv.reader(f, delimiter=delimiter)
+        names = next(rows, None) if header else None
+        if record is None:
+            yield from rows
+            return
+        fields = record._fields if hasattr(record, "_fields") else record.__slots__
+        if names is None:
+            columns = list(range(len(fields)))
+        else:
+            missing = [field for field in fields if field not in names]
+            if missing:
+                raise ValueError(f"{record.__name__} fields missing from the CSV header: {', '.join(missing)}")
+            columns = [names.index(field) for field in fields]
+        types = getattr(record, "__annotations__", {})
+        conversions = [CSV_TYPES.get(types.get(field), str) for field in fields]
+        if columns == list(range(len(fields))) and all(c is str for c in conversions):
+            for row in rows:
+                yield record(*row[:len(fields)])
+        else:
+            converters = list(zip(columns, conversions))
+            for row in rows:
+                yield record(*[convert(row[i]) for i, convert in converters])
+
@@ -0,0 +1,163 @@
+"""Fork-server for running ECP programs with a pre-initialised interpreter.
+
+The server imports the ECP compiler once and then forks a copy of itself for
+every connection, so each program runs in its own process without paying for
+interpreter start-up. Requests and responses are JSON objects, one per line,
+sent over a Unix domain socket.
+
+Request:
+    {"source": "OUTPUT 1", "name": "main.ecp", "stdin": ""}
+    {"file": "/path/to/main.ecp"}
+
+Responses (streamed):
+    {"event": "output", "data": "1\\n"}
+    {"event": "error", "data": "Traceback ..."}
+    {"event": "exit", "status": 0}
+"""
+import io
+import json
+import os
+import signal
+import socket
+import sys
+import tempfile
+from typing import *
+
+OUTPUT_INTERVAL = 0.1 # seconds between output events of a running program
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), f"ecp-{os.getuid() if hasattr(os, 'getuid') else 0}.sock")
+
+
+class _EventWriter(io.TextIOBase):
+    """Text stream which forwards everything written to it as ``event`` messages.
+
+    Output is sent once a line is complete (or on flush) so that the client
+    receives it incrementally while the program is still running.
+    """
+    def __init__(self, send: Callable[[dict], None], event: str):
+        self._send = send
+        self._event = event
+        self._pending = []
+
+    def writable(self):
+        return True
+
+    def write(self, s: str) -> int:
+        self._pending.append(s)
+        if "\n" in s:
+            self.flush()
+        return len(s)
+
+    def flush(self):
+        if self._pending:
+            self._send({"event": self._event, "data": "".join(self._pending)})
+            self._pending = []
+
+
+def _handle(conn: socket.socket):
+    """Run the single request received on ``conn``. Called in the forked child."""
+    from .runtime import EcpOutput
+    from .topython import ecp
+
+    f = conn.makefile("rwb")
+
+    def send(message: dict):
+        f.write(json.dumps(message).encode("utf-8") + b"\n")
+        f.flush()
+
+    status = 0
+    try:
+        request = json.loads(f.readline())
+        source = request.get("source")
+        file = request.get("file")
+        name = request.get("name") or (os.path.basename(file) if file else "<remote>")
+        if file:
+            sys.path.insert(0, os.path.dirname(os.path.abspath(file)))
+
+        sys.stdin = io.StringIO(request.get("stdin") or "")
+        sys.stdout = _EventWriter(send, "output")
+        sys.stderr = _EventWriter(send, "error")
+        try:
+            # batch OUTPUT into fewer events while still streaming it
+            ecp(source, file=file, name=name, scope={}, output=EcpOutput(interval=OUTPUT_INTERVAL))
+        except SystemExit as e:
+            status = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except BaseException:
+            from traceback import format_exc # only needed when the program fails
+            sys.stderr.write(format_exc())
+            status = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+    except (ValueError, AttributeError) as e:
+        send({"event": "error", "data": f"invalid request: {e}\n"})
+        status = 2
+    send({"event": "exit", "status": status})
+    f.close()
+
+
+def serve(path: str = DEFAULT_SOCKET, *, backlog: int = 64):
+    """Listen on the unix socket ``path`` and run one ECP program per connection.
+
+    The parent process never runs user code. Each accepted connection is
+    handled by a forked child, which inherits the already imported compiler.
+    """
+    if not hasattr(os, "fork") or not hasattr(socket, "AF_UNIX"):
+        raise OSError("ecp serve requires a platform with os.fork and unix sockets")
+
+    # pre-import everything a request needs so that forked children start warm
+    from . import topython
+
+    if os.path.exists(path):
+        os.unlink(path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    os.chmod(path, 0o600)
+    server.listen(backlog)
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN) # children are reaped automatically
+
+    try:
+        while True:
+            conn, _ = server.accept()
+            pid = os.fork()
+            if pid == 0:
+                server.close()
+                signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                try:
+                    _handle(conn)
+                finally:
+                    os._exit(0)
+            conn.close()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+def request(source: str = None, *, file: str = None, name: str = None, stdin: str = None, path: str = DEFAULT_SOCKET) -> Iterator[dict]:
+    """Send a program to the server at ``path`` and yield its response events as they arrive."""
+    message = {"source": source, "file": file and os.path.abspath(file), "name": name, "stdin": stdin}
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.connect(path)
+        f = conn.makefile("rwb")
+        f.write(json.dumps(message).encode("utf-8") + b"\n")
+        f.flush()
+        for line in f:
+            event = json.loads(line)
+            yield event
+            if event["event"] == "exit":
+                break
+
+
+def run(source: str = None, *, file: str = None, name: str = None, stdin: str = None, path: str = DEFAULT_SOCKET) -> int:
+    """Run a program on the server, copying its output to stdout/stderr. Returns the exit status."""
+    status = 1
+    for event in request(source, file=file, name=name, stdin=stdin, path=path):
+        if event["event"] == "output":
+            sys.stdout.write(event["data"])
+        elif event["event"] == "error":
+            sys.stderr.write(event["data"])
+        elif event["event"] == "exit":
+            status = event["status"]
+    return status
@@ -0,0 +1,101 @@
+"""Algorithms every ECP program can use, running at the speed of python's C code.
+
+Hand written bubble sorts, linear searches and heaps run one interpreted
+statement per step; these builtins do the same in a single call:
+
+* SORT(array) and SORT_BY(array, key) sort with Timsort. The key of SORT_BY is a
+  SUBROUTINE, or the name of a RECORD field (or Dictionary key) to sort by; a
+  list of names sorts by several fields.
+* BINARY_SEARCH(array, value) returns the position of value in a sorted array,
+  or -1 like POSITION does. INSERT_SORTED(array, value) keeps it sorted.
+* HEAP_PUSH(heap, value) and HEAP_POP(heap) use an Array as a binary heap, where
+  HEAP_POP returns the smallest value.
+* ISQRT, GCD and MODPOW compute with Integers exactly, without floats.
+* MIN, MAX and SUM of an Array, or MIN and MAX of several values.
+
+Like the other builtins they are imported into ``ecp.runtime``.
+"""
+from bisect import bisect_left, bisect_right, insort_right
+from heapq import heappop, heappush
+from math import gcd, isqrt
+from operator import attrgetter, itemgetter
+import sys
+
+__all__ = [
+    "SORT", "SORT_BY", "BINARY_SEARCH", "INSERT_SORTED", "HEAP_PUSH", "HEAP_POP",
+    "ISQRT", "GCD", "MODPOW", "MIN", "MAX", "SUM",
+]
+
+
+def _key(key, array):
+    """A key function for ``key``: a function, or field names of the values of ``array``"""
+    if key is None or callable(key):
+        return key
+    names = [key] if isinstance(key, str) else list(key)
+    if array and isinstance(array[0], dict):
+        return itemgetter(*names)
+    return attrgetter(*names)
+
+
+def SORT(array, reverse: bool = False):
+    """Sort an Array in place and return it. Other values are returned as a sorted Array."""
+    if type(array) is list:
+        array.sort(reverse=reverse)
+        return array
+    return sorted(array, reverse=reverse)
+
+
+def SORT_BY(array, key, reverse: bool = False):
+    """SORT by ``key``: a SUBROUTINE, a field name or a list of field names"""
+    key = _key(key, array)
+    if type(array) is list:
+        array.sort(key=key, reverse=reverse)
+        return array
+    return sorted(array, key=key, reverse=reverse)
+
+
+if sys.version_info >= (3, 10):
+    _bisect_left = bisect_left
+    _insort_right = insort_right
+else: # bisect takes no key before python 3.10, so search a list of the keys
+    def _bisect_left(array, value, key=None):
+        return bisect_left(array if key is None else list(map(key, array)), value)
+
+    def _insort_right(array, value, key=None):
+        if key is None:
+            insort_right(array, value)
+        else:
+            array.insert(bisect_right(list(map(key, array)), key(value)), value)
+
+
+def BINARY_SEARCH(array, value, key=None) -> int:
+    """Position of ``value`` in the sorted ``array``, -1 if it is not in it.
+
+    With a ``key`` the array is sorted by it and ``value`` is a key to look for,
+    e.g. ``BINARY_SEARCH(people, 42, "age")``.
+    """
+    key = _key(key, array)
+    if key is None:
+        i = bisect_left(array, value)
+        return i if i < len(array) and array[i] == value else -1
+    i = _bisect_left(array, value, key=key)
+    return i if i < len(array) and key(array[i]) == value else -1
+
+
+def INSERT_SORTED(array, value, key=None):
+    """Insert ``value`` into the sorted ``array`` after the values equal to it"""
+    _insort_right(array, value, key=_key(key, array if array else [value]))
+
+
+HEAP_PUSH = heappush
+HEAP_POP = heappop
+ISQRT = isqrt
+GCD = gcd
+
+def MODPOW(base: int, exponent: int, modulus: int) -> int:
+    """base ** exponent MOD modulus without computing the power"""
+    return pow(base, exponent, modulus)
+
+MIN = min
+MAX = max
+SUM = sum
@@ -2,19 +2,14 @@
 from parsergen import *
 from parsergen.parser import ParseError
 from .lexer import *
-from .tracker import Tracer
 import sys, os
-try:
-    import astor
-except ImportError:
-    print("astor module not found - will not be able to convert ECP to python source code")
-    astor = None
-from math import sqrt
-from random import randint
+from textwrap import indent
 from ast import *
 import ast
 from ecp.parser import EcpParser
 from parsergen.parser_utils import *
+from .runtime import *
+from .runtime import _MAGIC_OUTPUT, _MAGIC_USERINPUT
 _List = ast.List
 _Dict = ast.Dict
 
@@ -87,12 +82,6 @@ def _dump(node, annotate_fields=True, include_attributes=False, *, indent=None):
     return _format(node)[0]
 
 
-class Namespace:
-    def __init__(self, **kwargs) -> None:
-        for k, v in kwargs.items():
-            setattr(self, k, v)
-
-
 def fix_line_and_column(node):
     for child in walk(node):
         if 'lineno' in child._attributes:
@@ -113,6 +102,90 @@ def fix_line_and_column(node):
     
     return fix_missing_locations(node)
 
+def _py_literal(node) -> Optional[str]:
+    """The code of a ``PY("...")`` statement with a string literal, or None"""
+    if isinstance(node, Expr) and isinstance(node.value, Call) and isinstance(node.value.func, Name) and node.value.func.id == "PY" \
+            and len(node.value.args) == 1 and not node.value.keywords \
+            and isinstance(node.value.args[0], Constant) and isinstance(node.value.args[0].value, str):
+        return node.value.args[0].value
+    return None
+
+# statements and patterns which bind names; the MATCH patterns exist on python 3.10+
+_BINDING = (Import, ImportFrom, FunctionDef, AsyncFunctionDef, ClassDef, Global, Nonlocal) \
+    + tuple(getattr(ast, name) for name in ("MatchAs", "MatchStar", "MatchMapping") if hasattr(ast, name))
+
+def _binds_names(tree: AST) -> bool:
+    for node in walk(tree):
+        if isinstance(node, Name) and isinstance(node.ctx, (Store, Del)):
+            return True
+        if isinstance(node, _BINDING):
+            return True
+        if isinstance(node, ExceptHandler) and node.name:
+            return True
+    return False
+
+# how code is compiled to check that it can run in a class body or a SUBROUTINE
+_SCOPE_HEADERS = {"class": "class _:\n", "function": "def _():\n"}
+
+class _PyInliner(NodeTransformer):
+    """Replace ``PY("...")`` statements with the python code they run"""
+    def __init__(self):
+        self.functions = 0
+        self.scope = "module"
+
+    def _function(self, node):
+        self.functions += 1
+        scope, self.scope = self.scope, "function"
+        self.generic_visit(node)
+        self.functions -= 1
+        self.scope = scope
+        return node
+
+    visit_FunctionDef = visit_AsyncFunctionDef = visit_Lambda = _function
+
+    def visit_ClassDef(self, node):
+        functions, self.functions = self.functions, 0 # like the module, a class body keeps what exec binds
+        scope, self.scope = self.scope, "class"
+        self.generic_visit(node)
+        self.functions = functions
+        self.scope = scope
+        return node
+
+    def _compiles_here(self, source: str) -> bool:
+        """Can ``source`` be compiled in the current scope? (e.g. import * only can at the top level)"""
+        if self.scope == "module":
+            return True
+        try:
+            compile(_SCOPE_HEADERS[self.scope] + indent(source, " ") + "\n pass", "<PY>", "exec")
+        except (SyntaxError, ValueError):
+            return False
+        return True
+
+    def visit_Expr(self, node):
+        source = _py_literal(node)
+        if source is None:
+            return node
+        try:
+            compile(source, "<PY>", "exec")
+            snippet = parse(source)
+        except (SyntaxError, ValueError):
+            return node
+        if self.functions and _binds_names(snippet): # exec can not change the locals of a SUBROUTINE
+            return node
+        if any(isinstance(n, ImportFrom) and n.module == "__future__" for n in snippet.body):
+            return node
+        if not self._compiles_here(source):
+            return node
+        increment_lineno(snippet, node.lineno - 1)
+        return snippet.body or copy_location(Pass(), node)
+
+def inline_py(tree: AST) -> AST:
+    """Compile the string literals of PY() statements once, with the program"""
+    if "PY" in {n.id for n in walk(tree) if isinstance(n, Name) and isinstance(n.ctx, (Store, Del))} \
+            or any(isinstance(n, (FunctionDef, ClassDef)) and n.name == "PY" for n in walk(tree)):
+        return tree # not the builtin
+    return _PyInliner().visit(tree)
+
 def parse_ecp(text: str, mode="exec"):
     lex_result = EcpLexer().lex_string(text)
     tokens = TokenStream(lex_result)
@@ -121,7 +194,7 @@ def parse_ecp(text: str, mode="exec"):
     error = p.error()
     if rv is None and error is not None:
         raise error
-    rv = fix_line_and_column(rv)
+    rv = inline_py(fix_line_and_column(rv))
     if mode == "single":
         rv = Interactive(body=rv.body)
     return rv
@@ -140,15 +213,88 @@ def get_more(text: str) -> bool:
         return True
     
 
-def to_py_source(text: Union[str, Module]):
+def run_optimizer(tree: Module, optimize) -> Module:
+    """Run the optimization passes selected by ``optimize`` over ``tree``
+
+    ``optimize`` is True for the default passes, a list of pass names or an Optimizer.
+    """
+    from .passes import Optimizer
+    if not isinstance(optimize, Optimizer):
+        optimize = Optimizer(None if optimize is True else optimize)
+    return optimize.run(tree)
+
+def to_py_source(text: Union[str, Module], optimize=None):
     code = text
     if isinstance(text, str):
         code = parse_ecp(text)
-    if astor is not None:
-        return BUILTIN_IMPORT + astor.to_source(code)
-    raise Exception("astor module not found - cannot convert ecp to python source code")
+    if optimize:
+        code = run_optimizer(code, optimize)
+    try:
+        import astor
+    except ImportError:
+        raise Exception("astor module not found - cannot convert ecp to python source code")
+    lazy = sorted({n.id for n in walk(code) if isinstance(n, Name)} & LAZY_BUILTINS.keys())
+    imports = f"from ecp.runtime import {', '.join(lazy)}\n" if lazy else ""
+    return BUILTIN_IMPORT + imports + astor.to_source(code)
+
+class _LazySubroutine:
+    """Stand-in for a top level SUBROUTINE which compiles it the first time it is called"""
+    def __init__(self, node: FunctionDef, scope: dict, filename: str):
+        self.__name__ = self.__qualname__ = node.name
+        self._node = node
+        self._scope = scope
+        self._filename = filename
+        self._function = None
+    
+    def _compile(self):
+        name = self._node.name
+        previous = self._scope.get(name)
+        code = compile(Module(body=[self._node], type_ignores=[]), self._filename, "exec")
+        load_builtins(code, self._scope)
+        exec(code, self._scope)
+        self._function = self._scope[name]
+        if previous is not self: # name has been rebound since the stub was created
+            self._scope[name] = previous
+        self._node = None
+        return self._function
+    
+    def __call__(self, *args, **kwargs):
+        return (self._function or self._compile())(*args, **kwargs)
+    
+    def __repr__(self):
+        return f"<lazy subroutine {self.__name__}>"
+
+def make_lazy(tree: Module, scope: dict, filename: str) -> Module:
+    """Replace the top level SUBROUTINEs of ``tree`` with stubs which compile them on first call"""
+    nodes = []
+    body = []
+    for node in tree.body:
+        if isinstance(node, FunctionDef):
+            l = {"lineno": node.lineno, "col_offset": node.col_offset, "end_lineno": node.lineno, "end_col_offset": node.col_offset}
+            body.append(Assign(
+                targets=[Name(id=node.name, ctx=Store(), **l)],
+                value=Call(func=Name(id='_ECP_LAZY', ctx=Load(), **l), args=[Constant(value=len(nodes), **l)], keywords=[], **l),
+                **l
+            ))
+            nodes.append(node)
+        else:
+            body.append(node)
+    scope["_ECP_LAZY"] = lambda i: _LazySubroutine(nodes[i], scope, filename)
+    return Module(body=body, type_ignores=tree.type_ignores)
 
-def ecp(text: str=None, *, file: str=None, name="<unkown>", showAST=False, scope=None, trace=None, tracecompact=False, mode="exec"):
+def ecp(text: str=None, *, file: str=None, name="<unkown>", showAST=False, scope=None, trace=None, tracecompact=False, mode="exec", lazy=False, optimize=None, profile=None, output=None, input=None):
+    """Run an ECP program and return its variables.
+
+    ``profile`` is a Profile recording how the program runs (see ecp.profiler);
+    the program is not optimized then, since the profile describes it as written.
+    ``output`` is the EcpOutput OUTPUT writes to, by default a new one buffering
+    sys.stdout; its output is flushed before anything else is written to
+    sys.stdout and when the program ends. ``input`` is what USERINPUT reads: an
+    EcpInput or its source (a list of lines, str, bytes or a file), by default
+    sys.stdin.
+    """
+    if profile is not None and optimize:
+        raise ValueError("a profile can only be recorded without optimizing")
     if text is None:
         with open(file, encoding="utf-8") as f:
             text = f.read()
@@ -158,15 +304,43 @@ def ecp(text: str=None, *, file: str=None, name="<unkown>", showAST=False, scope
         scope = vars(scope)
     if trace is None:
         trace = []
+    if output is None:
+        output = EcpOutput()
     scope.update(globals())
+    scope["OUTPUT"] = output.write
+    if not isinstance(input, EcpInput):
+        input = EcpInput(input, output)
+    scope["USERINPUT"] = scope["INPUT"] = input.input
+    scope["USERINPUT_INT"] = input.read_int
+    scope["READ_INTS"] = input.read_ints
+    scope["READ_FIELD"] = input.read_field
+    scope["_ECP_COMPILE_OPTIONS"] = {"lazy": lazy, "optimize": optimize, "output": output, "input": input}
     r = parse_ecp(text, mode=mode)
+    if optimize:
+        r = run_optimizer(r, optimize)
+    if profile is not None:
+        from .profiler import PROFILE_NAME, instrument
+        r = instrument(r, profile)
+        scope[PROFILE_NAME] = profile
     if showAST:
         print(_dump(r, include_attributes=True, indent=2))
+    if lazy and mode == "exec":
+        r = make_lazy(r, scope, name)
+    code = compile(parse(r, mode=mode), name, mode)
+    load_builtins(code, scope)
     if len(trace) > 0:
-        with Tracer(trace, compact=tracecompact):
-            exec(compile(parse(r, mode=mode), name, mode), scope)
+        from .tracker import Tracer
+        with Tracer(trace, compact=tracecompact), output.ordered_stdout():
+            try:
+                exec(code, scope)
+            finally:
+                output.flush()
     else:
-        exec(compile(parse(r, mode=mode), name, mode), scope)
+        with output.ordered_stdout():
+            try:
+                exec(code, scope)
+            finally:
+                output.flush()
 
     return Namespace(**scope)
 
@@ -174,41 +348,7 @@ def _ECP_IMPORT(location: str, target: str, scope=None):
     m = None
     for p in sys.path:
         if os.path.exists(p + location + ".ecp"):
-            s = ecp(file=p + location + ".ecp", scope=globals())
+            s = ecp(file=p + location + ".ecp", scope=globals(), **scope.get("_ECP_COMPILE_OPTIONS", {}))
             scope[target] = s
             return
     raise ImportError(name=location, path=p + location + ".ecp")
-
-
-# ECP BUILTINS
-
-_MAGIC_OUTPUT = print
-_MAGIC_USERINPUT = input
-INPUT = input
-LEN = len
-Integer = int
-Int = int
-Real = float
-Bool = bool
-String = str
-Array = list
-Dictionary = dict
-
-def POSITION(string: str, to_match: str) -> int:
-    try:
-        return string.index(to_match)
-    except:
-        return -1
-
-def SUBSTRING(start: int, end: int, string: str):
-    return string[start:end+1]
-
-STRING_TO_INT = int
-STRING_TO_REAL = float
-INT_TO_STRING = REAL_TO_STRING = str
-CHAR_TO_CODE = ord
-CODE_TO_CHAR = chr
-RANDOM_INT = randint
-SQRT = sqrt
-
-PY = exec
\ No newline at end of file
@@ -1,4 +1,3 @@
-from tabulate import tabulate
 from typing import *
 from collections.abc import Callable
 import sys
@@ -35,6 +34,7 @@ class Tracker:
             data[self.line] = deepcopy(value)
     
     def displayTraceTable(self, variables: List[str] = None, tablefmt="github") -> str:
+        from tabulate import tabulate
         headers = variables or self.variables        
         maxLine = max(max(vals.keys()) for vals in self.values.values())
         
@@ -68,5 +68,5 @@ class Tracer(Tracker):
         return self
     
     def __exit__(self, *args):
-        print(self.displayTraceTable())
-        sys.settrace(None)
\ No newline at end of file
+        sys.settrace(None)
+        print(self.displayTraceTable())
\ No newline at end of file
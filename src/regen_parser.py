@@ -1,4 +1,5 @@
 from parsergen.parsergen import Generator
+from ecp.lexer import EcpLexer, build_lexer_table
 
 HEADER = """from .parser_helpers import *
 
@@ -10,4 +11,11 @@ with open("ecp/grammar.gram") as f:
 result = Generator().generate(grammar)
 
 with open("ecp/parser.py", "w") as f:
-    f.write(HEADER + result)
\ No newline at end of file
+    f.write(HEADER + result)
+
+pattern, tokens = build_lexer_table(EcpLexer)
+
+with open("ecp/lexer_table.py", "w", encoding="utf-8") as f:
+    f.write("# Code @generated by regen_parser.py from EcpLexer; do not edit!\n")
+    f.write(f"PATTERN = {pattern!r}\n")
+    f.write(f"TOKENS = {tokens!r}\n")
@@ -1,11 +1,45 @@
 import os
+from contextlib import redirect_stdout
+from io import BytesIO, StringIO
 from ecp.lexer import *
 from ecp.topython import *
+from ecp.passes import Optimizer
+from ecp.profiler import Profile, default_path
+from ecp import lexer_table
+from ecp.lexer import build_lexer_table
 import sys
 completed = 0
 total = 0
 failed = 0
 _failed = []
+# compile options which must not change the output of any example
+VARIANTS = {
+    "lazy": {"lazy": True},
+    "optimize": {"optimize": True},
+    "types": {"optimize": ["types"]},
+    "memoize": {"optimize": ["tailcall", "memoize"]},
+    "idioms": {"optimize": ["idioms"]},
+    "strings": {"optimize": ["strings"]},
+}
+
+# lines read by the examples which read input; a binary stream of the same
+# lines is read in blocks of INPUT_BLOCK, so fields can be cut between blocks
+INPUTS = {
+    "input_test.ecp": ["Ada", "3 10", "-20 30 rest", "20000",
+                       " ".join(str(100000 + 37 * i) for i in range(20000)) + " end", "last line"],
+}
+
+def run(data, name, **options):
+    output = StringIO()
+    options.setdefault("input", list(INPUTS.get(name, [])))
+    with redirect_stdout(output):
+        ecp(data, name=name, scope={}, **options)
+    return output.getvalue()
+
+# the checked-in lexer table must be regenerated (regen_parser.py) whenever EcpLexer changes
+if build_lexer_table(EcpLexer) != (lexer_table.PATTERN, lexer_table.TOKENS):
+    raise Exception("ecp/lexer_table.py is out of date, run regen_parser.py")
+
 print(os.getcwd())
 for (dirpath, dirnames, filenames) in os.walk("../examples"):
     total = len(filenames)
@@ -18,11 +52,24 @@ for (dirpath, dirnames, filenames) in os.walk("../examples"):
         try:
             loc = os.path.dirname(os.path.abspath(path))
             sys.path.insert(0, loc)
-            ecp(data, name=f, scope=globals())
+            expected = run(data, f)
+            print(expected, end="")
+            for variant, options in VARIANTS.items():
+                if run(data, f, **options) != expected:
+                    raise Exception(f"output differs with {variant}")
+            if f in INPUTS:
+                stream = BytesIO("".join(f"{line}\n" for line in INPUTS[f]).encode())
+                if run(data, f, input=stream) != expected:
+                    raise Exception("output differs when reading a binary stream")
+            if run(data, f, profile=Profile()) != expected:
+                raise Exception("output differs while recording a profile")
+            if os.path.exists(default_path(path)):
+                if run(data, f, optimize=Optimizer(profile=Profile.load(default_path(path)))) != expected:
+                    raise Exception("output differs with its profile")
         except Exception as e:
             failed += 1
             _failed.append(f)
-            print(f"[!] An error occured in {f}")
+            print(f"[!] An error occured in {f}: {e}")
         finally:
             completed += 1
             del sys.path[0]
@@ -35,4 +82,4 @@ if failed > 0:
     print("tests which failed:")
     for t in _failed:
         print("\t", t)
-    raise Exception("Some examples failed.")
\ No newline at end of file
+    raise Exception("Some examples failed.")